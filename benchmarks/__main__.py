@@ -0,0 +1,112 @@
+"""Run the benchmarks of the request to query pipeline
+
+    python -m benchmarks --rows 10000 --compare benchmarks/baseline.json
+    python -m benchmarks --rows 10000 --save benchmarks/baseline.json
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import timeit
+from typing import List, Tuple
+
+import sqlalchemy
+
+from benchmarks.cases import get_cases
+from benchmarks.data import create_app, create_database
+
+
+def measure(run, repeat: int, min_time: float) -> dict:
+    """Time the function, running it enough times per repeat to last at least the minimum time"""
+    timer = timeit.Timer(run)
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2
+    timings = [timing / number for timing in timer.repeat(repeat, number)]
+    return {"median": statistics.median(timings), "min": min(timings), "number": number}
+
+
+def run_benchmarks(rows: int, repeat: int, min_time: float, only=None, data_dir=None) -> dict:
+    session = create_database(rows, data_dir)
+    app = create_app()
+    results = {}
+    for case in get_cases(app, session):
+        if only and case.name not in only:
+            continue
+        result = measure(case.run, repeat, min_time)
+        if case.sql is not None:
+            result["sql"] = case.sql()
+        results[f"{case.name}[{rows}]" if case.database else case.name] = result
+        session.remove()
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> Tuple[List[str], List[str]]:
+    """Get the report lines of every benchmark, and the names of the ones slower than the baseline by the threshold"""
+    regressions = []
+    lines = [f"{'benchmark':<28} {'median':>12} {'baseline':>12} {'change':>8}  status"]
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            lines.append(f"{name:<28} {_format(result['median']):>12} {'-':>12} {'-':>8}  new")
+            continue
+        change = result["median"] / previous["median"] - 1
+        status = "ok"
+        if change > threshold:
+            status = "REGRESSION"
+            regressions.append(name)
+        if result.get("sql") != previous.get("sql"):
+            status += ", SQL changed"
+        lines.append(
+            f"{name:<28} {_format(result['median']):>12} {_format(previous['median']):>12} {change:>+8.1%}  {status}"
+        )
+    return lines, regressions
+
+
+def _format(seconds: float) -> str:
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f} us"
+    return f"{seconds * 1e3:.2f} ms"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000], help="rows of the synthetic tables")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.05, help="minimum seconds of a single repeat")
+    parser.add_argument("--only", nargs="+", help="names of the benchmarks to run")
+    parser.add_argument("--data-dir", help="directory the synthetic databases are kept in")
+    parser.add_argument("--save", help="store the results as a baseline")
+    parser.add_argument("--compare", help="compare the results with a stored baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown before reporting a regression")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for rows in args.rows:
+        results.update(run_benchmarks(rows, args.repeat, args.min_time, args.only, args.data_dir))
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)["results"]
+    lines, regressions = compare(results, baseline, args.threshold)
+    print("\n".join(lines))
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump({
+                "python": platform.python_version(),
+                "sqlalchemy": sqlalchemy.__version__,
+                "results": results,
+            }, file, indent=2, sort_keys=True)
+            file.write("\n")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+from typing import Callable, List, NamedTuple, Optional
+
+from sqlalchemy.dialects import postgresql, sqlite
+from werkzeug.datastructures import MultiDict
+
+from flask_query_builder.counting import count_statement
+from flask_query_builder.parsing import parse_args
+from flask_query_builder.querying import QueryBuilder, AllowedFilter, get_filter_map
+
+from benchmarks.data import User
+
+
+class Case(NamedTuple):
+    """A benchmarked step of the request to query pipeline
+
+    The run function is timed, and the sql function gives the statement the case executes, like the count
+    or the page statement, so a change in the shape of the generated SQL is reported next to the timings.
+    """
+    name: str
+    run: Callable
+    sql: Optional[Callable] = None
+    database: bool = False
+
+
+FILTERS = ["first_name", "last_name", "username", AllowedFilter.partial("name", "last_name"), AllowedFilter.comparison("age")]
+SORTS = ["first_name", "last_name", "age", "id"]
+
+
+def get_cases(app, session) -> List[Case]:
+    many_args = MultiDict([(f"filter[field{index}]", "a,b,c,d") for index in range(50)] + [("sort", "-a,b,c")])
+    in_list = ",".join(f"user{index}" for index in range(1, 2001, 2))
+
+    def make_builder():
+        return QueryBuilder(User, session=session()).allowed_filters(FILTERS).allowed_sorts(SORTS)
+
+    def builder(query_string):
+        with app.test_request_context(query_string):
+            return make_builder()
+
+    def request(query_string, execute, get_statement=lambda builder: builder._statement):
+        def run():
+            with app.test_request_context(query_string):
+                return execute(make_builder())
+
+        def sql():
+            with app.test_request_context(query_string):
+                return str(get_statement(make_builder()).compile(dialect=sqlite.dialect()))
+
+        return run, sql
+
+    def count_sql(builder):
+        return count_statement(builder._get_count_statement(), User)
+
+    def page_sql(builder):
+        return builder._get_page_statement(*builder._get_page_arguments(None, None))
+
+    def first_page_cursor():
+        with app.test_request_context("/?sort=-age,first_name&page[size]=50"):
+            page = QueryBuilder(User, session=session()).allowed_sorts(SORTS).paginate_cursor()
+            return page.next_cursor
+
+    cursor = first_page_cursor()
+    statement = builder("/?filter[first_name]=First1,First2&filter[age][gte]=30&sort=-age").statement
+    dialect = postgresql.dialect()
+    return [
+        Case("parse_many_args", lambda: parse_args(many_args)),
+        Case("filter_map", lambda: get_filter_map(FILTERS * 10)),
+        Case("build_statement", lambda: builder("/?filter[first_name]=First1&filter[age][gte]=30&sort=-age,first_name")),
+        Case("compile_statement", lambda: statement.compile(dialect=dialect)),
+        Case("exact", *request("/?filter[first_name]=First7&sort=id", QueryBuilder.all), database=True),
+        Case("partial", *request("/?filter[name]=t4999&sort=id", QueryBuilder.all), database=True),
+        Case("in_list", *request(f"/?filter[username]={in_list}", QueryBuilder.all), database=True),
+        Case("multi_sort", *request("/?filter[first_name]=First7&sort=-age,last_name,id", QueryBuilder.all), database=True),
+        Case("count", *request("/?filter[age][between]=20,30", QueryBuilder.count, count_sql), database=True),
+        Case(
+            "paginate_first",
+            *request("/?sort=-age,first_name&page[size]=50", QueryBuilder.paginate_cursor, page_sql),
+            database=True,
+        ),
+        Case(
+            "paginate_next",
+            *request(
+                f"/?sort=-age,first_name&page[size]=50&page[after]={cursor}", QueryBuilder.paginate_cursor, page_sql
+            ),
+            database=True,
+        ),
+    ]
@@ -0,0 +1,58 @@
+import os
+import tempfile
+
+import flask
+import sqlalchemy as sqa
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import declarative_base, scoped_session, sessionmaker
+
+BaseModel = declarative_base()
+
+
+class User(BaseModel):
+    __tablename__ = "users"
+    id = sqa.Column(sqa.Integer, primary_key=True)
+    first_name = sqa.Column(sqa.String(50), index=True)
+    last_name = sqa.Column(sqa.String(50))
+    username = sqa.Column(sqa.String(50), unique=True)
+    age = sqa.Column(sqa.Integer)
+    birth_date = sqa.Column(sqa.DateTime)
+
+
+def create_database(rows: int, data_dir: str = None):
+    """Create a session on an SQLite database with a users table of the given number of rows
+
+    The database is kept in the data directory and reused by later runs with the same number of rows.
+    """
+    data_dir = data_dir or tempfile.gettempdir()
+    path = os.path.join(data_dir, f"flask_query_builder_benchmark_{rows}.db")
+    engine = create_engine(f"sqlite:///{path}")
+    if not os.path.exists(path) or _count(engine) != rows:
+        BaseModel.metadata.drop_all(engine)
+        BaseModel.metadata.create_all(engine)
+        with engine.begin() as connection:
+            connection.execute(text(
+                "WITH RECURSIVE sequence(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM sequence WHERE n < :rows) "
+                "INSERT INTO users (id, first_name, last_name, username, age, birth_date) "
+                "SELECT n, 'First' || (n % 1000), 'Last' || (n % 5000), 'user' || n, n % 90, "
+                "datetime('1950-01-01', '+' || (n % 20000) || ' days') FROM sequence"
+            ), {"rows": rows})
+            connection.execute(text("ANALYZE"))
+
+    session = scoped_session(sessionmaker(bind=engine))
+    User.query = session.query_property()
+    return session
+
+
+def create_app():
+    app = flask.Flask(__name__)
+    app.config["QUERY_BUILDER_MAX_FILTER_VALUES"] = 100_000
+    return app
+
+
+def _count(engine) -> int:
+    try:
+        with engine.connect() as connection:
+            return connection.execute(text("SELECT count(*) FROM users")).scalar()
+    except sqa.exc.OperationalError:
+        return -1
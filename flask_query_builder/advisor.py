@@ -0,0 +1,232 @@
+import re
+import warnings
+from typing import List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import exc, inspect, text
+from sqlalchemy.schema import Column, CreateIndex, Index
+from sqlalchemy.sql import visitors
+
+from flask_query_builder.filters import (
+    ExactFilter,
+    ComparisonFilter,
+    PartialFilter,
+    StartsWithFilter,
+    SimilarFilter,
+    FullTextFilter,
+)
+from flask_query_builder.sorts import ExpressionSort, FieldSort
+
+COLUMN_FILTERS = (ExactFilter, ComparisonFilter)
+LOWER_FILTERS = (PartialFilter, StartsWithFilter, SimilarFilter)
+
+
+class IndexRecommendation(NamedTuple):
+    """An index that would support a filter or sort allowed on a specification"""
+    table: str
+    elements: Tuple[str, ...]
+    reason: str
+    using: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        parts = [re.sub(r"\W+", "_", element).strip("_") for element in self.elements]
+        return "_".join(["ix", self.table] + parts)
+
+    def get_index(self, table) -> Index:
+        """Get the index on the table of the model"""
+        elements = [table.c[element] if element in table.c else text(element) for element in self.elements]
+        if self.using is not None:
+            return Index(self.name, *elements, _table=table, postgresql_using=self.using)
+        return Index(self.name, *elements, _table=table)
+
+    def to_sql(self, table, dialect) -> str:
+        """Get the CREATE INDEX statement of the index for a dialect"""
+        return str(CreateIndex(self.get_index(table)).compile(dialect=dialect)).strip()
+
+    def to_alembic(self) -> str:
+        """Get the Alembic operation creating the index"""
+        elements = ", ".join(
+            repr(element) if re.fullmatch(r"\w+", element) else f"sa.text({element!r})" for element in self.elements
+        )
+        using = f", postgresql_using={self.using!r}" if self.using is not None else ""
+        return f"op.create_index({self.name!r}, {self.table!r}, [{elements}]{using})"
+
+
+def recommend_indexes(specs, bind) -> List[IndexRecommendation]:
+    """Get the indexes missing for the filters and sorts allowed on the specifications
+
+    Every filtered or sorted column should lead an index, partial and prefix filters need an index on `lower(column)`,
+    and an exact filter on a column that is not unique combined with a field sort is served best by a composite index.
+    Indexes already present in the database, found through reflection, are left out.
+    """
+    recommendations = {}
+    existing = {}
+    for spec in specs:
+        table = spec.model.__table__
+        if table.name not in existing:
+            existing[table.name] = get_existing_indexes(bind, table.name)
+        for recommendation in get_spec_indexes(spec, bind.dialect.name):
+            if not _is_covered(recommendation.elements, existing[table.name]):
+                recommendations.setdefault((recommendation.table, recommendation.elements), recommendation)
+
+    # an index on a single column is covered by a composite index leading with it
+    composite = [elements for _, elements in recommendations if len(elements) > 1]
+    return sorted(
+        (
+            recommendation for recommendation in recommendations.values()
+            if len(recommendation.elements) > 1 or not _is_covered(recommendation.elements, composite)
+        ),
+        key=lambda recommendation: (recommendation.table, recommendation.elements),
+    )
+
+
+def get_spec_indexes(spec, dialect_name: str = None) -> List[IndexRecommendation]:
+    """Get every index supporting the filters and sorts allowed on a specification"""
+    table = spec.model.__table__.name
+    indexes = []
+    equality_columns = []
+    for allowed_filter in spec.filters.values():
+        column = _get_column(spec.model, allowed_filter.internal_name or allowed_filter.name)
+        if column is None:
+            continue
+        filter_class = allowed_filter.filter_class
+        reason = f"filter '{allowed_filter.name}'"
+        if isinstance(filter_class, COLUMN_FILTERS):
+            indexes.append(IndexRecommendation(table, (column.name,), reason))
+            if isinstance(filter_class, ExactFilter) and not (column.primary_key or column.unique):
+                equality_columns.append(column.name)
+        elif isinstance(filter_class, LOWER_FILTERS):
+            indexes.append(_get_search_index(table, column, filter_class, reason, dialect_name))
+        elif isinstance(filter_class, FullTextFilter) and filter_class.config is not None:
+            expression = f"to_tsvector('{filter_class.config}', {column.name})"
+            indexes.append(IndexRecommendation(table, (expression,), reason, "gin"))
+
+    for allowed_sort in spec.sorts.values():
+        if isinstance(allowed_sort.sort_class, ExpressionSort):
+            element = _get_expression_element(spec.model, allowed_sort.sort_class.get_expression(spec.model))
+            if element is not None:
+                indexes.append(IndexRecommendation(table, (element,), f"sort '{allowed_sort.name}'"))
+            continue
+        if not isinstance(allowed_sort.sort_class, FieldSort):
+            continue
+        column = _get_column(spec.model, allowed_sort.internal_name or allowed_sort.name)
+        if column is None:
+            continue
+        indexes.append(IndexRecommendation(table, (column.name,), f"sort '{allowed_sort.name}'"))
+        for filter_column in equality_columns:
+            if filter_column != column.name:
+                indexes.append(IndexRecommendation(
+                    table, (filter_column, column.name), f"filter on '{filter_column}' with sort '{allowed_sort.name}'"
+                ))
+    return indexes
+
+
+def _get_search_index(table: str, column, filter_class, reason: str, dialect_name: str = None) -> IndexRecommendation:
+    """Get the index matching the SQL of a partial, prefix or similar filter
+
+    On PostgreSQL partial and similar filters compare the column itself with `ILIKE` and `%`, which a trigram index
+    on the column serves, and a prefix filter compares `lower(column)` with `LIKE`, which needs the `text_pattern_ops`
+    operator class unless the database uses the C collation. Other databases compare `lower(column)`.
+    """
+    if dialect_name != "postgresql":
+        return IndexRecommendation(table, (f"lower({column.name})",), reason)
+    if isinstance(filter_class, StartsWithFilter):
+        return IndexRecommendation(table, (f"lower({column.name}) text_pattern_ops",), reason)
+    return IndexRecommendation(table, (f"{column.name} gin_trgm_ops",), reason, "gin")
+
+
+def get_existing_indexes(bind, table_name: str) -> List[Tuple[str, ...]]:
+    """Get the normalized elements of the indexes, unique constraints and primary key of a table"""
+    inspector = inspect(bind)
+    with warnings.catch_warnings():
+        # expression indexes are read from the schema below on SQLite
+        warnings.simplefilter("ignore", exc.SAWarning)
+        indexes = inspector.get_indexes(table_name)
+        unique_constraints = inspector.get_unique_constraints(table_name)
+        primary_key = inspector.get_pk_constraint(table_name)["constrained_columns"]
+
+    existing = [_get_index_elements(index) for index in indexes]
+    existing.extend(tuple(constraint["column_names"]) for constraint in unique_constraints)
+    if primary_key:
+        existing.append(tuple(primary_key))
+    if bind.dialect.name == "sqlite":
+        existing.extend(_get_sqlite_expression_indexes(bind, table_name))
+    return existing
+
+
+def _get_index_elements(index) -> Tuple[str, ...]:
+    """Get the normalized elements of a reflected index, with the operator class of each element on PostgreSQL"""
+    operator_classes = index.get("dialect_options", {}).get("postgresql_ops", {})
+    return tuple(
+        _normalize(f"{element} {operator_classes[element]}" if element in operator_classes else element)
+        for element in (index.get("expressions") or index["column_names"]) if element
+    )
+
+
+def _get_sqlite_expression_indexes(bind, table_name: str) -> List[Tuple[str, ...]]:
+    with bind.connect() as connection:
+        rows = connection.execute(
+            text("SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = :table AND sql IS NOT NULL"),
+            {"table": table_name},
+        ).scalars().all()
+    indexes = []
+    for sql in rows:
+        start = sql.find("(", sql.upper().find(" ON "))
+        elements = _split_elements(sql[start + 1:sql.rfind(")")])
+        if any("(" in element for element in elements):
+            indexes.append(tuple(_normalize(element) for element in elements))
+    return indexes
+
+
+def _split_elements(value: str) -> List[str]:
+    """Split the elements of an index on the commas outside of parentheses"""
+    elements = []
+    depth = 0
+    current = ""
+    for character in value:
+        if character == "," and depth == 0:
+            elements.append(current)
+            current = ""
+            continue
+        depth += character == "("
+        depth -= character == ")"
+        current += character
+    elements.append(current)
+    return elements
+
+
+def _normalize(element: str) -> str:
+    """Normalize an index element so a reflected index can be compared with a recommended one
+
+    The operator class of an element is kept, so an index without it does not cover a trigram or pattern index.
+    """
+    element = re.sub(r"\s+(asc|desc)\s*$", "", element.lower().strip())
+    element = re.sub(r"\s+(\w+_ops)$", r" \1", element)
+    element = re.sub(r"[\"`]|::\w+", "", element)
+    element = re.sub(r"\s+(?!\w+_ops$)", "", element)
+    return re.sub(r"(?<=[(,])\((\w+)\)", r"\1", element)
+
+
+def _is_covered(elements, existing) -> bool:
+    """Check if an existing index leads with the elements"""
+    normalized = tuple(_normalize(element) for element in elements)
+    return any(tuple(index[:len(normalized)]) == normalized for index in existing)
+
+
+def _get_expression_element(model, expression) -> Optional[str]:
+    """Get an expression on the columns of the table of the model as an index element, like `lower(last_name)`"""
+    table = model.__table__
+    columns = [element for element in visitors.iterate(expression) if isinstance(element, Column)]
+    if not columns or any(column.table is not table for column in columns):
+        return None
+    sql = str(expression.compile(compile_kwargs={"literal_binds": True}))
+    return sql.replace(f"{table.name}.", "")
+
+
+def _get_column(model, name: str):
+    """Get the table column of a mapped attribute, or None for relationships and SQL expressions"""
+    attribute = getattr(model, name, None)
+    columns = getattr(getattr(attribute, "property", None), "columns", None)
+    if not columns or not hasattr(columns[0], "table"):
+        return None
+    return columns[0]
@@ -0,0 +1,122 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from flask_query_builder.budget import CostBudget
+from flask_query_builder.counting import count_statement, estimate_rows
+from flask_query_builder.facets import get_facet_counts
+from flask_query_builder.pagination import CursorPage
+from flask_query_builder.querying import BaseModel, QueryBuilder
+from flask_query_builder.routing import ReplicaRouter
+from flask_query_builder.statements import StatementCacheStats
+
+
+class AsyncQueryBuilder(QueryBuilder):
+    """A QueryBuilder building a `select()` statement that is executed on an AsyncSession
+
+    The same allowed filters, sorts, includes and fields are used as with the QueryBuilder,
+    only fetching the results is awaited. Relationships are not lazy loaded by an AsyncSession,
+    so any relationship used by the view should be allowed as an include.
+    """
+
+    def __init__(
+            self,
+            model: BaseModel,
+            session: AsyncSession,
+            statement=None,
+            raise_exceptions=True,
+            statement_cache_stats: StatementCacheStats = None,
+            router: ReplicaRouter = None,
+            execution_options: dict = None,
+            budget: CostBudget = None,
+    ):
+        super().__init__(
+            model,
+            statement,
+            raise_exceptions,
+            statement_cache_stats,
+            session=session,
+            router=router,
+            execution_options=execution_options,
+            budget=budget,
+        )
+
+    @classmethod
+    def from_spec(cls, spec, session: AsyncSession, statement=None):
+        """Start a statement from a QuerySpec, applying its filters and sorts on the request
+
+        The result cache of the specification is not used by the async builder.
+        """
+        builder = cls(
+            spec.model,
+            session,
+            statement,
+            spec.raise_exceptions,
+            spec.statement_cache_stats,
+            spec.router,
+            spec.execution_options,
+            spec.budget,
+        )
+        return builder._apply_spec(spec)
+
+    async def _get_async_bind_arguments(self):
+        """Get the bind the statements are executed on, choosing it inside the session where replicas can be checked"""
+        if self._bind_arguments is None:
+            await self.session.run_sync(lambda session: self._get_bind_arguments())
+        return self._bind_arguments or None
+
+    async def all(self) -> list:
+        """Get the results of the statement"""
+        result = await self.session.scalars(self._statement, bind_arguments=await self._get_async_bind_arguments())
+        return result.unique().all()
+
+    async def execute(self):
+        """Execute the statement, returning the Result of the session"""
+        return await self.session.execute(self._statement, bind_arguments=await self._get_async_bind_arguments())
+
+    async def scalars(self):
+        """Execute the statement, returning the ScalarResult of the model instances"""
+        return await self.session.scalars(self._statement, bind_arguments=await self._get_async_bind_arguments())
+
+    async def yield_per(self, count: int):
+        """Stream the statement, fetching the model instances in batches of the given count while iterating"""
+        return await self.session.stream_scalars(
+            self._statement.execution_options(yield_per=count), bind_arguments=await self._get_async_bind_arguments()
+        )
+
+    async def count(self, estimate_threshold: int = None) -> int:
+        """Count the results of the applied filters, leaving out any sorts, includes and fields
+
+        When an estimate threshold is given the row estimate of the database planner is used first,
+        and the exact count is only performed when the estimate is below the threshold.
+        """
+        statement = self._get_count_statement()
+        bind_arguments = await self._get_async_bind_arguments()
+        if estimate_threshold is not None:
+            estimate = await self.session.run_sync(estimate_rows, statement, self.model, bind_arguments)
+            if estimate is not None and estimate >= estimate_threshold:
+                return estimate
+        return await self.session.scalar(count_statement(statement, self.model), bind_arguments=bind_arguments)
+
+    async def facets(self) -> dict:
+        """Count the results of the applied filters per value of every facet applied on the request"""
+        statement = self._get_facet_statement()
+        if statement is None:
+            return {}
+        result = await self.session.execute(statement, bind_arguments=await self._get_async_bind_arguments())
+        return get_facet_counts([allowed_facet.name for allowed_facet in self._applied_facets], result.all())
+
+    async def paginate_cursor(self, size: int = None, max_size: int = None) -> CursorPage:
+        """Get a page of results by seeking past the cursor applied on the request"""
+        bind_arguments = await self._get_async_bind_arguments()
+        columns, page_size, cursor, reverse = self._get_page_arguments(size, max_size)
+        statement = self._get_page_statement(columns, page_size, cursor, reverse)
+        result = await self.session.scalars(statement, bind_arguments=bind_arguments)
+        return self._get_page(columns, result.unique().all(), page_size, cursor, reverse)
+
+    @property
+    def query(self):
+        """An AsyncSession has no legacy query object"""
+        raise TypeError("An AsyncSession has no legacy query, use `statement` instead")
+
+    def stream(self, *args, **kwargs):
+        """Streaming responses are served from synchronous views only"""
+        raise TypeError("Streaming is not supported on an AsyncSession, use `yield_per` instead")
@@ -0,0 +1,112 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy.orm import Session, loading
+
+from flask_query_builder.counting import count_statement
+from flask_query_builder.routing import has_writes, track_writes
+
+MAX_WORKERS = 8
+
+
+class BatchResult(NamedTuple):
+    """The results of a builder executed in a batch, with the count of its filters when asked for"""
+    items: list
+    count: Optional[int]
+    duration: float
+
+
+def execute_batch(builders, counts=False, max_workers: int = MAX_WORKERS, session_factory=None) -> List[BatchResult]:
+    """Execute the statements of several builders concurrently, getting their results in the same order
+
+    Sessions are not thread-safe, so every statement is executed on a session of its own, and on a connection
+    of its own from the pool, created by `session_factory()` or bound to the engine of the builder by default.
+    The rows are merged back into the session of every builder once they are all fetched.
+    A builder whose session has changes that are not committed yet is executed on that session instead,
+    so it reads its own changes and they are not overwritten by the merged rows.
+    The result cache of the builders is not used.
+    """
+    track_writes()
+    builders = list(builders)
+    statements = [_get_statements(builder, counts) for builder in builders]
+    pooled = [index for index, builder in enumerate(builders) if not has_writes(builder.session)]
+    binds = {index: builders[index]._get_bind() for index in pooled if session_factory is None}
+
+    def run(index):
+        session = session_factory() if session_factory is not None else Session(bind=binds[index])
+        with session:
+            return _execute(session, *statements[index])
+
+    executed = {}
+    if pooled:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(pooled))) as executor:
+            executed = dict(zip(pooled, executor.map(run, pooled)))
+
+    return [
+        _merge(builder.session, statements[index][0], *executed[index]) if index in executed
+        else _read(*_execute(builder.session, *statements[index]))
+        for index, builder in enumerate(builders)
+    ]
+
+
+async def gather_batch(builders, counts=False, session_factory=None) -> List[BatchResult]:
+    """Execute the statements of several async builders concurrently with `asyncio.gather`
+
+    An AsyncSession cannot run statements concurrently, so every statement is executed on an AsyncSession
+    of its own created by `session_factory()`, or bound to the engine of the builder by default.
+    Without a `session_factory` the statements are executed on the replica or primary chosen by the router
+    of the builder, as with `execute_batch`. A builder whose session has changes that are not committed yet
+    is executed on that session once the others are gathered, as with `execute_batch`.
+    """
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    track_writes()
+    builders = list(builders)
+
+    async def run(builder):
+        statement, count = _get_statements(builder, counts)
+        bind_arguments = await builder._get_async_bind_arguments() if session_factory is None else None
+        session = session_factory() if session_factory is not None else AsyncSession(builder.session.bind)
+        async with session:
+            frozen, total, duration = await _execute_async(session, statement, count, bind_arguments)
+            return _merge(builder.session.sync_session, statement, frozen, total, duration)
+
+    pooled = [builder for builder in builders if not has_writes(builder.session.sync_session)]
+    results = dict(zip(map(id, pooled), await asyncio.gather(*(run(builder) for builder in pooled))))
+    for builder in builders:
+        if id(builder) not in results:
+            results[id(builder)] = _read(*await _execute_async(builder.session, *_get_statements(builder, counts)))
+    return [results[id(builder)] for builder in builders]
+
+
+def _get_statements(builder, counts: bool):
+    """Get the statement of a builder, and the statement counting it when asked for"""
+    count = count_statement(builder._get_count_statement(), builder.model) if counts else None
+    return builder._statement, count
+
+
+def _execute(session, statement, count):
+    started = time.perf_counter()
+    frozen = session.execute(statement).unique().freeze()
+    total = session.scalar(count) if count is not None else None
+    return frozen, total, time.perf_counter() - started
+
+
+async def _execute_async(session, statement, count, bind_arguments=None):
+    started = time.perf_counter()
+    frozen = (await session.execute(statement, bind_arguments=bind_arguments)).unique().freeze()
+    total = await session.scalar(count, bind_arguments=bind_arguments) if count is not None else None
+    return frozen, total, time.perf_counter() - started
+
+
+def _read(frozen, total, duration) -> BatchResult:
+    """Get the rows fetched on the session of the builder itself, which are already in the session"""
+    return BatchResult(frozen().scalars().all(), total, duration)
+
+
+def _merge(session, statement, frozen, total, duration) -> BatchResult:
+    """Merge the fetched rows into the session of the builder without loading them again"""
+    items = loading.merge_frozen_result(session, statement, frozen, load=False)().scalars().all()
+    return BatchResult(items, total, duration)
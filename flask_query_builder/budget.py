@@ -0,0 +1,207 @@
+import time
+from threading import Lock
+
+from sqlalchemy import UniqueConstraint, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+from flask_query_builder.filters import PartialFilter, SimilarFilter
+from flask_query_builder.joins import get_path_attribute
+from flask_query_builder.sorts import FieldSort
+
+TIMEOUT_OPTION = "query_builder_statement_timeout"
+PREVIOUS_TIMEOUT = "query_builder_previous_statement_timeout"
+ACTIVE_TIMEOUT = "query_builder_active_statement_timeout"
+
+# Filters matching a leading wildcard, which cannot be served by a plain index
+WILDCARD_FILTERS = (PartialFilter, SimilarFilter)
+
+_listening = False
+_listening_lock = Lock()
+
+
+class CostBudget:
+    """A budget for the cost of the filters, sorts and includes applied on a request
+
+    Every applied filter costs `filter_cost`, with `value_cost` for each of its values and `wildcard_cost`
+    for each value matched with a leading wildcard. Every sort costs `sort_cost`, or `unindexed_sort_cost`
+    when the sorted column does not lead an index, and every include costs `include_cost`.
+    A request costing more than `max_cost` is rejected, or with `degrade` its sorts and includes are left out
+    once the budget is spent. Filters are never left out, as that would return rows the client filtered out.
+    With a `statement_timeout` in seconds every statement of the builder is cancelled by the database when it runs longer.
+    """
+
+    def __init__(
+            self,
+            max_cost: float = 100,
+            filter_cost: float = 1,
+            value_cost: float = 0.01,
+            wildcard_cost: float = 10,
+            sort_cost: float = 1,
+            unindexed_sort_cost: float = 10,
+            include_cost: float = 5,
+            degrade=False,
+            statement_timeout: float = None,
+    ):
+        self.max_cost = max_cost
+        self.filter_cost = filter_cost
+        self.value_cost = value_cost
+        self.wildcard_cost = wildcard_cost
+        self.sort_cost = sort_cost
+        self.unindexed_sort_cost = unindexed_sort_cost
+        self.include_cost = include_cost
+        self.degrade = degrade
+        self.statement_timeout = statement_timeout
+
+    def get_filter_cost(self, allowed_filter, values) -> float:
+        """Get the cost of a filter applied with the values"""
+        cost = self.filter_cost + self.value_cost * len(values)
+        if isinstance(allowed_filter.filter_class, WILDCARD_FILTERS):
+            cost += self.wildcard_cost * len(values)
+        return cost
+
+    def get_sort_cost(self, model, allowed_sort) -> float:
+        """Get the cost of a sort, which is higher when the database has to sort without an index"""
+        if not isinstance(allowed_sort.sort_class, FieldSort):
+            return self.sort_cost
+        try:
+            attribute = get_path_attribute(model, allowed_sort.internal_name or allowed_sort.name)
+        except ValueError:
+            return self.sort_cost
+        return self.sort_cost if is_indexed(attribute) else self.unindexed_sort_cost
+
+    def get_include_cost(self, allowed_include) -> float:
+        return self.include_cost
+
+
+def is_indexed(attribute) -> bool:
+    """Check if the column of a mapped attribute leads an index of its table"""
+    columns = getattr(getattr(attribute, "property", None), "columns", None)
+    if not columns or not hasattr(columns[0], "table"):
+        return False
+    column = columns[0]
+    if column.primary_key or column.index or column.unique:
+        return True
+    indexes = list(column.table.indexes)
+    indexes.extend(constraint for constraint in column.table.constraints if isinstance(constraint, UniqueConstraint))
+    return any(next(iter(index.columns), None) is column for index in indexes)
+
+
+def limit_statement(statement, timeout: float):
+    """Cancel every execution of the statement running longer than the timeout in seconds
+
+    The timeout is kept until the next statement without it or the end of the transaction, so the rows fetched
+    afterwards from a server-side cursor are limited as well. PostgreSQL sets `statement_timeout` for the
+    transaction, and SQLite interrupts the statement from a progress handler. Other databases do not enforce it.
+    """
+    _listen()
+    return statement.execution_options(**{TIMEOUT_OPTION: timeout})
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timeout = context.execution_options.get(TIMEOUT_OPTION) if context is not None else None
+    if timeout is None:
+        _lift_timeout(conn)
+    elif conn.dialect.name == "postgresql":
+        timeout = str(int(timeout * 1000))
+        # Statements limited the same way one after another set the timeout only once
+        if conn.info.get(ACTIVE_TIMEOUT) != timeout:
+            previous = _set_timeout(conn, timeout)
+            conn.info.setdefault(PREVIOUS_TIMEOUT, previous)
+            conn.info[ACTIVE_TIMEOUT] = timeout
+    elif conn.dialect.driver == "pysqlite":
+        deadline = time.monotonic() + timeout
+        conn.connection.dbapi_connection.set_progress_handler(lambda: time.monotonic() > deadline, 1000)
+        conn.info[ACTIVE_TIMEOUT] = timeout
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Without a transaction the timeout is set for the session, which would outlive the statement
+    if conn.dialect.name == "postgresql" and not _is_local(conn):
+        _lift_timeout(conn)
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is None or ACTIVE_TIMEOUT not in conn.info:
+        return
+    if exception_context.is_disconnect:
+        _forget_timeout(conn.info)
+    elif conn.dialect.name == "postgresql" and _is_local(conn):
+        # A failed statement aborts the transaction, and its rollback restores the timeout set for the transaction
+        _forget_timeout(conn.info)
+    else:
+        _lift_timeout(conn)
+
+
+def _end_transaction(conn, *args) -> None:
+    """Forget the timeout at the end of a transaction, which restores the timeout set for it on PostgreSQL"""
+    if ACTIVE_TIMEOUT in conn.info:
+        _forget_timeout(conn.info)
+        _clear_progress_handler(conn)
+
+
+def _reset(dbapi_connection, connection_record, **kw) -> None:
+    """Forget the timeout of a connection returned to the pool, which is rolled back"""
+    if ACTIVE_TIMEOUT in connection_record.info:
+        _forget_timeout(connection_record.info)
+        if hasattr(dbapi_connection, "set_progress_handler"):
+            dbapi_connection.set_progress_handler(None, 1000)
+
+
+def _lift_timeout(conn) -> None:
+    """Restore the timeout of the connection from before the limited statements"""
+    if ACTIVE_TIMEOUT not in conn.info:
+        return
+    previous = _forget_timeout(conn.info)
+    if previous is not None:
+        _set_timeout(conn, previous)
+    _clear_progress_handler(conn)
+
+
+def _forget_timeout(info: dict) -> str:
+    info.pop(ACTIVE_TIMEOUT, None)
+    return info.pop(PREVIOUS_TIMEOUT, None)
+
+
+def _set_timeout(conn, timeout: str) -> str:
+    """Set the timeout of PostgreSQL from a cursor of its own, getting the previous timeout back
+
+    The timeout is set for the transaction, or for the session when there is no transaction with autocommit.
+    A cursor of its own leaves the cursor of the statement untouched, which can be a server-side cursor.
+    """
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        timeout = timeout.replace("'", "''")
+        cursor.execute(
+            "SELECT current_setting('statement_timeout'), "
+            f"set_config('statement_timeout', '{timeout}', {_is_local(conn)})"
+        )
+        return cursor.fetchone()[0]
+    finally:
+        cursor.close()
+
+
+def _is_local(conn) -> bool:
+    """Check if a setting can be made for the current transaction, which is not the case with autocommit"""
+    return not getattr(conn.connection.dbapi_connection, "autocommit", False)
+
+
+def _clear_progress_handler(conn) -> None:
+    if conn.dialect.driver == "pysqlite":
+        conn.connection.dbapi_connection.set_progress_handler(None, 1000)
+
+
+def _listen() -> None:
+    """Start enforcing the timeouts, only once the first statement has been given one"""
+    global _listening
+    with _listening_lock:
+        if not _listening:
+            event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+            event.listen(Engine, "handle_error", _handle_error)
+            event.listen(Engine, "commit", _end_transaction)
+            event.listen(Engine, "rollback", _end_transaction)
+            event.listen(Engine, "rollback_savepoint", _end_transaction)
+            event.listen(Pool, "reset", _reset, named=True)
+            _listening = True
@@ -0,0 +1,218 @@
+import copy
+import hashlib
+import json
+import pickle
+import time
+from abc import abstractmethod
+from collections import OrderedDict
+from threading import Lock
+
+from sqlalchemy import Table, event, inspect
+from sqlalchemy.orm import loading
+from sqlalchemy.sql.util import find_tables
+
+DIRTY_TABLES = "query_builder_dirty_tables"
+MAX_STATEMENTS = 1024
+
+
+class CacheBackend:
+    """Base class for the storage of cached results"""
+
+    @abstractmethod
+    def get(self, key: str):
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value, ttl: int) -> None:
+        pass
+
+    @abstractmethod
+    def incr(self, key: str) -> int:
+        pass
+
+    @abstractmethod
+    def get_counter(self, key: str) -> int:
+        pass
+
+
+class LRUCache(CacheBackend):
+    """An in-process cache evicting the least recently used entries once full, and entries older than their ttl"""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._lock = Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def get_counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisCache(CacheBackend):
+    """A cache stored in Redis, or any client providing the get, set, incr methods of a Redis client
+
+    Results are stored with the serializer, which needs `dumps` and `loads` functions like the pickle module.
+    """
+
+    def __init__(self, client, prefix: str = "query_builder:", serializer=pickle):
+        self.client = client
+        self.prefix = prefix
+        self.serializer = serializer
+
+    def get(self, key: str):
+        value = self.client.get(self.prefix + key)
+        if value is None:
+            return None
+        return self.serializer.loads(value)
+
+    def set(self, key: str, value, ttl: int) -> None:
+        self.client.set(self.prefix + key, self.serializer.dumps(value), ex=ttl)
+
+    def incr(self, key: str) -> int:
+        return int(self.client.incr(self.prefix + key))
+
+    def get_counter(self, key: str) -> int:
+        return int(self.client.get(self.prefix + key) or 0)
+
+
+class ResultCache:
+    """Caches the results of built queries, keyed on the executed statement and its bound parameters
+
+    Every table has a version which is part of the key, so bumping the version when a table changes
+    invalidates all cached results read from it.
+    """
+
+    def __init__(self, backend: CacheBackend = None, ttl: int = 60):
+        self.backend = backend if backend is not None else LRUCache()
+        self.ttl = ttl
+        self._statements = {}
+
+    def get_key(self, tables, statement, namespace: str = None, kind: str = "all") -> str:
+        """Get the cache key of a statement, from its SQL and the values of its bound parameters"""
+        payload = json.dumps({
+            "kind": kind,
+            "namespace": namespace,
+            "tables": {table: self.backend.get_counter(self._version_key(table)) for table in sorted(tables)},
+            "statement": self._get_statement_key(statement),
+        }, separators=(",", ":"))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _get_statement_key(self, statement) -> str:
+        """Get the SQL and the parameter values of a statement, compiling each shape of statement only once"""
+        cache_key = statement._generate_cache_key()
+        if cache_key is None:
+            compiled = statement.compile()
+            return repr((str(compiled), sorted(compiled.params.items())))
+        if len(self._statements) >= MAX_STATEMENTS:
+            self._statements.clear()
+        return cache_key.to_offline_string(self._statements, statement, {})
+
+    def all(self, key: str, session, statement, bind_arguments: dict = None) -> list:
+        """Get the results of the statement from the cache, executing and storing them on a miss
+
+        A session with changes that are not committed yet reads from the database, so the changes are neither
+        overwritten by cached results nor stored for other sessions.
+        """
+        if has_changes(session):
+            return session.scalars(statement, bind_arguments=bind_arguments).unique().all()
+        frozen = self.backend.get(key)
+        if frozen is None:
+            frozen = _detach(session.execute(statement, bind_arguments=bind_arguments).unique().freeze())
+            self.backend.set(key, frozen, self.ttl)
+        return loading.merge_frozen_result(session, statement, frozen, load=False)().scalars().all()
+
+    def value(self, key: str, load):
+        """Get a plain value from the cache, loading and storing it on a miss"""
+        value = self.backend.get(key)
+        if value is None:
+            value = load()
+            self.backend.set(key, value, self.ttl)
+        return value
+
+    def invalidate(self, *tables) -> None:
+        """Invalidate the cached results read from any of the tables"""
+        for table in tables:
+            self.backend.incr(self._version_key(getattr(table, "name", table)))
+
+    def watch(self, session) -> None:
+        """Invalidate the cached results of the tables changed by a session once it commits
+
+        The session can be a Session class, a sessionmaker or a scoped_session.
+        """
+        event.listen(session, "after_flush", self._after_flush)
+        event.listen(session, "after_commit", self._after_commit)
+        event.listen(session, "after_soft_rollback", self._after_soft_rollback)
+
+    def _after_flush(self, session, flush_context) -> None:
+        tables = session.info.setdefault(DIRTY_TABLES, set())
+        for instance in list(session.new) + list(session.dirty) + list(session.deleted):
+            tables.update(table.name for table in inspect(instance).mapper.tables)
+
+    def _after_commit(self, session) -> None:
+        self.invalidate(*session.info.pop(DIRTY_TABLES, ()))
+
+    def _after_soft_rollback(self, session, previous_transaction) -> None:
+        session.info.pop(DIRTY_TABLES, None)
+
+    def _version_key(self, table: str) -> str:
+        return f"version:{table}"
+
+
+def has_changes(session) -> bool:
+    """Check whether the session has changes that are not flushed, or flushed changes that are not committed yet"""
+    return bool(session.new or session.dirty or session.deleted or session.info.get(DIRTY_TABLES))
+
+
+def _detach(frozen):
+    """Get a copy of a frozen result with instances that are not attached to the session that loaded them"""
+    detached = copy.copy(frozen)
+    detached.data = copy.deepcopy(frozen.data)
+    return detached
+
+
+def get_tables(model, include_paths=(), statement=None) -> set:
+    """Get the names of the tables results of the model can be read from
+
+    These are the tables of the included relationships, and every table the statement reads from,
+    including the tables joined or matched with EXISTS by filters, sorts and facets on relationship paths.
+    """
+    mapper = inspect(model)
+    tables = {table.name for table in mapper.tables}
+    if statement is not None:
+        tables.update(table.name for table in find_tables(statement, include_aliases=True) if isinstance(table, Table))
+    for path in include_paths:
+        current = mapper
+        for name in path.split("."):
+            relationship = current.relationships.get(name)
+            if relationship is None:
+                break
+            current = relationship.mapper
+            tables.update(table.name for table in current.tables)
+    return tables
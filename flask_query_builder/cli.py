@@ -0,0 +1,52 @@
+import importlib
+from collections import defaultdict
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import create_engine, inspect
+
+from flask_query_builder.advisor import recommend_indexes
+from flask_query_builder.specs import registry
+
+
+@click.group("query-builder")
+def query_builder():
+    """Commands of the flask query builder"""
+
+
+@query_builder.command("advise-indexes")
+@click.option("--import", "modules", multiple=True, help="Import a module declaring query specifications.")
+@click.option("--database-url", help="Reflect the indexes of this database instead of the session of the models.")
+@click.option("--alembic", is_flag=True, help="Write the missing indexes as Alembic operations.")
+@click.option("--check", is_flag=True, help="Exit with an error when any index is missing.")
+@with_appcontext
+def advise_indexes(modules, database_url, alembic, check):
+    """Report the indexes missing for the filters and sorts allowed on the declared query specifications"""
+    for module in modules:
+        importlib.import_module(module)
+
+    engine = create_engine(database_url) if database_url else None
+    specs_by_bind = defaultdict(list)
+    for spec in sorted(registry, key=lambda spec: spec.model.__table__.name):
+        specs_by_bind[engine or _get_bind(spec.model)].append(spec)
+
+    missing = 0
+    for bind, specs in specs_by_bind.items():
+        tables = {spec.model.__table__.name: spec.model.__table__ for spec in specs}
+        for recommendation in recommend_indexes(specs, bind):
+            missing += 1
+            click.echo(f"-- {recommendation.table}: missing index for {recommendation.reason}")
+            if alembic:
+                click.echo(recommendation.to_alembic())
+            else:
+                click.echo(recommendation.to_sql(tables[recommendation.table], bind.dialect) + ";")
+
+    if not missing:
+        click.echo("No missing indexes found.")
+    elif check:
+        click.get_current_context().exit(1)
+
+
+def _get_bind(model):
+    """Get the engine of the session the model is queried with"""
+    return model.query.session.get_bind(mapper=inspect(model))
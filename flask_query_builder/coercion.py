@@ -0,0 +1,131 @@
+import re
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal, InvalidOperation
+from typing import Callable, Optional
+
+import sqlalchemy as sqa
+
+from flask_query_builder.exceptions import InvalidFilterValueException
+
+TRUE_VALUES = frozenset(("1", "true", "yes", "on"))
+FALSE_VALUES = frozenset(("0", "false", "no", "off"))
+
+_ISO_DATE = r"(\d{4})-(\d{2})-(\d{2})"
+_ISO_TIME = r"(\d{2})(?::(\d{2})(?::(\d{2})(?:\.(\d{1,6}))?)?)?(?:([+-])(\d{2}):(\d{2}))?"
+_ISO_DATE_PATTERN = re.compile(_ISO_DATE + "$")
+_ISO_TIME_PATTERN = re.compile(_ISO_TIME + "$")
+_ISO_DATETIME_PATTERN = re.compile(_ISO_DATE + "(?:[T ]" + _ISO_TIME + ")?$")
+
+
+def get_coercer(column_type) -> Optional[Callable]:
+    """Get the function converting a request value into the python type of a column, or None for text columns"""
+    if column_type is None:
+        return None
+    if isinstance(column_type, sqa.Boolean):
+        return to_bool
+    if isinstance(column_type, sqa.Enum):
+        return _get_enum_coercer(column_type)
+    if isinstance(column_type, sqa.DateTime):
+        return parse_datetime
+    if isinstance(column_type, sqa.Date):
+        return parse_date
+    if isinstance(column_type, sqa.Time):
+        return parse_time
+    if isinstance(column_type, sqa.Integer):
+        return int
+    if isinstance(column_type, sqa.Float):
+        return float
+    if isinstance(column_type, sqa.Numeric):
+        return Decimal
+    if _Uuid is not None and isinstance(column_type, _Uuid):
+        return uuid.UUID
+    return None
+
+
+def coerce_values(coercer: Optional[Callable], filter_name: str, values):
+    """Convert the request values of a filter, rejecting values that do not match the type of the field"""
+    if coercer is None:
+        return values
+    try:
+        return [coercer(value) for value in values]
+    except (ValueError, TypeError, InvalidOperation):
+        raise InvalidFilterValueException(f"Applied filter '{filter_name}' has an invalid value")
+
+
+def to_bool(value: str) -> bool:
+    """Convert a request value into a boolean"""
+    lowered = value.lower()
+    if lowered in TRUE_VALUES:
+        return True
+    if lowered in FALSE_VALUES:
+        return False
+    raise ValueError(value)
+
+
+def parse_datetime(value: str) -> datetime:
+    """Convert an ISO 8601 value into a datetime, also on python 3.6 which has no `datetime.fromisoformat`"""
+    if hasattr(datetime, "fromisoformat"):
+        return datetime.fromisoformat(value)
+    match = _match_iso(_ISO_DATETIME_PATTERN, value)
+    return datetime.combine(_get_date(match.groups()[:3]), _get_time(match.groups()[3:]))
+
+
+def parse_date(value: str) -> date:
+    """Convert an ISO 8601 value into a date, also on python 3.6 which has no `date.fromisoformat`"""
+    if hasattr(date, "fromisoformat"):
+        return date.fromisoformat(value)
+    return _get_date(_match_iso(_ISO_DATE_PATTERN, value).groups())
+
+
+def parse_time(value: str) -> time:
+    """Convert an ISO 8601 value into a time, also on python 3.6 which has no `time.fromisoformat`"""
+    if hasattr(time, "fromisoformat"):
+        return time.fromisoformat(value)
+    return _get_time(_match_iso(_ISO_TIME_PATTERN, value).groups())
+
+
+def _match_iso(pattern, value: str):
+    match = pattern.match(value)
+    if match is None:
+        raise ValueError(f"Invalid isoformat string: '{value}'")
+    return match
+
+
+def _get_date(groups) -> date:
+    return date(*(int(group) for group in groups))
+
+
+def _get_time(groups) -> time:
+    hour, minute, second, fraction, sign, offset_hours, offset_minutes = groups
+    tzinfo = None
+    if sign is not None:
+        offset = timedelta(hours=int(offset_hours), minutes=int(offset_minutes))
+        tzinfo = timezone(-offset if sign == "-" else offset)
+    return time(
+        int(hour or 0), int(minute or 0), int(second or 0), int((fraction or "0").ljust(6, "0")), tzinfo=tzinfo
+    )
+
+
+def _get_enum_coercer(column_type) -> Callable:
+    enum_class = column_type.enum_class
+    if enum_class is None:
+        allowed = frozenset(column_type.enums)
+
+        def to_enum_value(value):
+            if value not in allowed:
+                raise ValueError(value)
+            return value
+
+        return to_enum_value
+
+    def to_enum(value):
+        try:
+            return enum_class[value]
+        except KeyError:
+            return enum_class(value)
+
+    return to_enum
+
+
+_Uuid = getattr(sqa, "Uuid", None)
@@ -0,0 +1,81 @@
+import json
+from typing import Optional
+
+from sqlalchemy import func, inspect, select, text
+
+
+def count_rows(session, statement, model, bind_arguments: dict = None) -> int:
+    """Count the rows of a select() statement without its ordering and eager loads"""
+    return session.scalar(count_statement(statement, model), bind_arguments=bind_arguments)
+
+
+def count_statement(statement, model):
+    """Get a statement counting the rows of a select() statement
+
+    The count is selected directly instead of wrapping the whole statement in a subquery,
+    unless DISTINCT, GROUP BY, LIMIT or OFFSET are present and the subquery is needed for a correct count.
+    """
+    statement = statement.order_by(None)
+    if _needs_subquery(statement):
+        return select(func.count()).select_from(statement.subquery())
+    primary_key = inspect(model).primary_key[0]
+    return statement.with_only_columns(func.count(primary_key), maintain_column_froms=True)
+
+
+def estimate_rows(session, statement, model, bind_arguments: dict = None) -> Optional[int]:
+    """Get the row estimate of the database planner for a statement, or None if the database has no estimate"""
+    bind_arguments = bind_arguments or {"mapper": inspect(model)}
+    bind = session.get_bind(**bind_arguments)
+    estimator = ESTIMATORS.get(bind.dialect.name)
+    if estimator is None:
+        return None
+    return estimator(session, statement.order_by(None), model, bind_arguments)
+
+
+def estimate_postgresql(session, statement, model, bind_arguments: dict) -> Optional[int]:
+    """Read the estimated rows of the top plan node from EXPLAIN"""
+    connection = session.connection(bind_arguments=bind_arguments)
+    compiled = statement.compile(
+        dialect=connection.dialect,
+        compile_kwargs={"render_postcompile": True},
+    )
+    plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def estimate_sqlite(session, statement, model, bind_arguments: dict) -> Optional[int]:
+    """Read the row count of the table gathered by ANALYZE
+
+    SQLite does not estimate the rows of a query, so the estimate ignores any filters
+    and is only meant as a stand-in for tests.
+    """
+    connection = session.connection(bind_arguments=bind_arguments)
+    has_stats = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+    ).scalar()
+    if not has_stats:
+        return None
+    stats = connection.execute(
+        text("SELECT stat FROM sqlite_stat1 WHERE tbl = :table"),
+        {"table": model.__table__.name},
+    ).scalars().all()
+    if not stats:
+        return None
+    return max(int(stat.split(" ")[0]) for stat in stats)
+
+
+def _needs_subquery(statement) -> bool:
+    return bool(
+        statement._distinct
+        or statement._group_by_clauses
+        or statement._limit_clause is not None
+        or statement._offset_clause is not None
+    )
+
+
+ESTIMATORS = {
+    "postgresql": estimate_postgresql,
+    "sqlite": estimate_sqlite,
+}
@@ -0,0 +1,169 @@
+import json
+import time
+from threading import Lock
+from typing import List, NamedTuple, Optional
+
+from flask import current_app, g, has_app_context
+from flask.signals import Namespace
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from flask_query_builder.parsing import ParsedRequest
+
+DIAGNOSTICS_OPTION = "query_builder_diagnostics"
+DIAGNOSTICS_HEADER = "X-Query-Builder-Diagnostics"
+
+_signals = Namespace()
+
+# Sent after every statement executed by a diagnosed builder, with the diagnostics and the executed statement
+statement_executed = _signals.signal("query-builder-statement-executed")
+
+_listening = False
+_listening_lock = Lock()
+
+
+class ExecutedStatement(NamedTuple):
+    """A statement executed by a diagnosed builder"""
+    sql: str
+    parameters: object
+    duration: float
+    plan: Optional[object] = None
+    warnings: tuple = ()
+
+
+class QueryDiagnostics:
+    """Records the applied filters and sorts of a builder, the time spent building and executing it,
+    and the statements it executed, optionally with their query plan
+    """
+
+    def __init__(self, model, parsed_request: ParsedRequest = None, explain=False, started: float = None):
+        self.model = model
+        self.filters = parsed_request.filters if parsed_request is not None else ()
+        self.sorts = parsed_request.sorts if parsed_request is not None else ()
+        self.explain = explain
+        self.started = started if started is not None else time.perf_counter()
+        self.build_time = None
+        self.statements: List[ExecutedStatement] = []
+        self._lock = Lock()
+
+    @property
+    def execute_time(self) -> float:
+        return sum(statement.duration for statement in self.statements)
+
+    @property
+    def warnings(self) -> List[str]:
+        """Get the full scans and sorts without a supporting index found in the query plans"""
+        return [warning for statement in self.statements for warning in statement.warnings]
+
+    def record(self, sql: str, parameters, duration: float, plan=None, warnings=()) -> ExecutedStatement:
+        """Record an executed statement, taking the time until the first statement as the time spent building"""
+        executed = ExecutedStatement(sql, parameters, duration, plan, tuple(warnings))
+        with self._lock:
+            if self.build_time is None:
+                self.build_time = time.perf_counter() - self.started - duration
+            self.statements.append(executed)
+        return executed
+
+    def summary(self) -> dict:
+        """Get a summary of the diagnostics that can be serialized as JSON"""
+        return {
+            "model": self.model.__name__,
+            "filters": [[applied.name, applied.operator, list(applied.values)] for applied in self.filters],
+            "sorts": [("-" if applied.descending else "") + applied.name for applied in self.sorts],
+            "build_ms": round((self.build_time or 0) * 1000, 3),
+            "execute_ms": round(self.execute_time * 1000, 3),
+            "statements": len(self.statements),
+            "warnings": self.warnings,
+        }
+
+    def __repr__(self):
+        return f"<QueryDiagnostics model={self.model.__name__} statements={len(self.statements)}>"
+
+
+def diagnose_statement(statement, diagnostics: QueryDiagnostics):
+    """Record every execution of the statement on the diagnostics"""
+    _listen()
+    return statement.execution_options(**{DIAGNOSTICS_OPTION: diagnostics})
+
+
+def get_request_diagnostics() -> List[QueryDiagnostics]:
+    """Get the diagnostics of every diagnosed builder used on the current request"""
+    return g.get("_query_builder_diagnostics", [])
+
+
+def add_diagnostics_header(response):
+    """Add a summary of the diagnostics of the request to the response, meant to be used with `app.after_request`
+
+    The name of the header can be changed with the `QUERY_BUILDER_DIAGNOSTICS_HEADER` config.
+    """
+    diagnostics = get_request_diagnostics()
+    if diagnostics:
+        header = current_app.config.get("QUERY_BUILDER_DIAGNOSTICS_HEADER", DIAGNOSTICS_HEADER)
+        response.headers[header] = json.dumps([item.summary() for item in diagnostics], separators=(",", ":"))
+    return response
+
+
+def explain_sqlite(connection, statement, parameters):
+    """Get the rows of EXPLAIN QUERY PLAN, flagging scans without an index and sorts in a temporary b-tree"""
+    plan = [row[3] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+    warnings = []
+    for detail in plan:
+        if detail.startswith("SCAN ") and "INDEX" not in detail:
+            warnings.append(f"Full scan: {detail}")
+        elif detail.startswith("USE TEMP B-TREE FOR"):
+            warnings.append(f"Sort without index: {detail}")
+    return plan, warnings
+
+
+def explain_postgresql(connection, statement, parameters):
+    """Get the plan of EXPLAIN (FORMAT JSON), flagging sequential scans and sort nodes"""
+    plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    warnings = []
+    nodes = [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if node["Node Type"] == "Seq Scan":
+            warnings.append(f"Full scan: {node.get('Relation Name')}")
+        elif node["Node Type"] in ("Sort", "Incremental Sort"):
+            warnings.append(f"Sort without index: {', '.join(node.get('Sort Key', ()))}")
+        nodes.extend(node.get("Plans", ()))
+    return plan, warnings
+
+
+EXPLAINERS = {
+    "postgresql": explain_postgresql,
+    "sqlite": explain_sqlite,
+}
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and context.execution_options.get(DIAGNOSTICS_OPTION) is not None:
+        context._query_builder_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    diagnostics = context.execution_options.get(DIAGNOSTICS_OPTION) if context is not None else None
+    if diagnostics is None:
+        return
+    duration = time.perf_counter() - getattr(context, "_query_builder_started", time.perf_counter())
+
+    plan, warnings = None, ()
+    explainer = EXPLAINERS.get(conn.dialect.name)
+    if diagnostics.explain and explainer is not None and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        plan, warnings = explainer(conn, statement, parameters)
+
+    executed = diagnostics.record(statement, parameters, duration, plan, warnings)
+    sender = current_app._get_current_object() if has_app_context() else None
+    statement_executed.send(sender, diagnostics=diagnostics, statement=executed)
+
+
+def _listen() -> None:
+    """Start listening on executed statements, only once the first builder has been diagnosed"""
+    global _listening
+    with _listening_lock:
+        if not _listening:
+            event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+            _listening = True
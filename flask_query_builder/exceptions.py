@@ -6,3 +6,38 @@ class InvalidFilterException(Exception):
 class InvalidSortException(Exception):
     """Exception for when a sort is present on request that was not allowed as part of the QueryBuilder"""
     pass
+
+
+class InvalidPageException(Exception):
+    """Exception for when the pagination parameters present on request are not valid"""
+    pass
+
+
+class InvalidRequestException(Exception):
+    """Exception for when the query parameters present on request exceed the allowed limits"""
+    pass
+
+
+class InvalidFieldException(Exception):
+    """Exception for when a field is present on request that was not allowed as part of the QueryBuilder"""
+    pass
+
+
+class InvalidIncludeException(Exception):
+    """Exception for when an include is present on request that was not allowed as part of the QueryBuilder"""
+    pass
+
+
+class InvalidFacetException(Exception):
+    """Exception for when a facet is present on request that was not allowed as part of the QueryBuilder"""
+    pass
+
+
+class QueryCostExceededException(InvalidRequestException):
+    """Exception for when the filters, sorts and includes applied on request exceed the cost budget of the QueryBuilder"""
+    pass
+
+
+class InvalidFilterValueException(InvalidFilterException):
+    """Exception for when a filter value present on request does not match the type of the filtered field"""
+    pass
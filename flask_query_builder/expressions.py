@@ -0,0 +1,99 @@
+import json
+
+from sqlalchemy import ARRAY, Boolean, String, any_, bindparam, func, literal
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy.sql.expression import ColumnElement
+from sqlalchemy.sql.visitors import InternalTraversal
+
+
+class Similar(ColumnElement):
+    """A trigram similarity match of a column against a value
+
+    Renders the `%` operator of pg_trgm on PostgreSQL, which can use a trigram index,
+    and falls back to a case-insensitive wildcard match on other databases.
+    """
+    type = Boolean()
+    inherit_cache = True
+    _is_implicitly_boolean = True
+    _traverse_internals = [
+        ("column", InternalTraversal.dp_clauseelement),
+        ("value", InternalTraversal.dp_clauseelement),
+    ]
+
+    def __init__(self, column, value):
+        self.column = column
+        self.value = bindparam(None, value, type_=String(), unique=True)
+
+
+@compiles(Similar)
+def _compile_similar(element, compiler, **kw):
+    pattern = literal("%").concat(func.lower(element.value)).concat("%")
+    return compiler.process(func.lower(element.column).like(pattern), **kw)
+
+
+@compiles(Similar, "postgresql")
+def _compile_similar_postgresql(element, compiler, **kw):
+    return compiler.process(element.column.op("%", is_comparison=True)(element.value), **kw)
+
+
+class ValueList(TypeDecorator):
+    """Bind a list of values as a single parameter, an array on PostgreSQL and a JSON array elsewhere"""
+    impl = String
+    cache_ok = True
+
+    def __init__(self, item_type):
+        super().__init__()
+        self.item_type = item_type
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(ARRAY(self.item_type))
+        return dialect.type_descriptor(String())
+
+    def process_bind_param(self, value, dialect):
+        if dialect.name == "postgresql":
+            return list(value)
+        process = self.item_type.dialect_impl(dialect).bind_processor(dialect)
+        if process is not None:
+            value = [process(item) for item in value]
+        return json.dumps(value)
+
+
+class LargeIn(ColumnElement):
+    """Match a column against a large list of values without a bound parameter per value
+
+    Renders `= ANY(:array)` on PostgreSQL and a `json_each()` subquery on SQLite, both with a single parameter.
+    Other databases render the values inline into a regular IN when the statement is executed.
+    """
+    type = Boolean()
+    inherit_cache = True
+    _is_implicitly_boolean = True
+    _traverse_internals = [
+        ("column", InternalTraversal.dp_clauseelement),
+        ("value_list", InternalTraversal.dp_clauseelement),
+        ("literal_values", InternalTraversal.dp_clauseelement),
+    ]
+
+    def __init__(self, column, values):
+        self.column = column
+        self.value_list = bindparam(None, values, type_=ValueList(column.type), unique=True)
+        self.literal_values = bindparam(
+            None, values, type_=column.type, unique=True, expanding=True, literal_execute=True
+        )
+
+
+@compiles(LargeIn)
+def _compile_large_in(element, compiler, **kw):
+    return compiler.process(element.column.in_(element.literal_values), **kw)
+
+
+@compiles(LargeIn, "postgresql")
+def _compile_large_in_postgresql(element, compiler, **kw):
+    return compiler.process(element.column == any_(element.value_list), **kw)
+
+
+@compiles(LargeIn, "sqlite")
+def _compile_large_in_sqlite(element, compiler, **kw):
+    column = compiler.process(element.column, **kw)
+    return f"{column} IN (SELECT value FROM json_each({compiler.process(element.value_list, **kw)}))"
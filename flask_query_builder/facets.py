@@ -0,0 +1,46 @@
+from typing import Dict, List, Tuple
+
+from sqlalchemy import cast, distinct, func, inspect, literal, null, union_all
+
+
+def facet_statement(facets: List[Tuple[str, object, object]], model):
+    """Get a single statement counting the rows of every facet per value
+
+    Every facet is given as its name, the statement with the filters it is counted on and the column it groups by.
+    The counts of all facets are combined with UNION ALL into one round-trip, where every facet selects its values
+    in a column of its own, so facets of different types can be combined on any database.
+    """
+    primary_key = inspect(model).primary_key[0]
+    selects = []
+    for index, (_, statement, column) in enumerate(facets):
+        values = [
+            column.label(f"value_{position}") if position == index
+            else cast(null(), other.type).label(f"value_{position}")
+            for position, (_, _, other) in enumerate(facets)
+        ]
+        selects.append(
+            statement
+            .order_by(None)
+            .with_only_columns(
+                literal(index).label("facet"),
+                *values,
+                func.count(distinct(primary_key)).label("count"),
+                maintain_column_froms=True,
+            )
+            .group_by(column)
+        )
+    if len(selects) == 1:
+        return selects[0]
+    return union_all(*selects)
+
+
+def get_facet_counts(names: List[str], rows) -> Dict[str, dict]:
+    """Get the counts of every facet per value from the rows of a facet statement, the most common value first"""
+    counts = {name: [] for name in names}
+    for row in rows:
+        index = row[0]
+        counts[names[index]].append((row[index + 1], row[-1]))
+    return {
+        name: dict(sorted(values, key=lambda value: -value[1]))
+        for name, values in counts.items()
+    }
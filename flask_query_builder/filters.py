@@ -1,28 +1,161 @@
 from abc import abstractmethod
 
+from sqlalchemy import and_, column, func, inspect, literal_column, select, table
+
+from flask_query_builder.exceptions import InvalidFilterValueException
+from flask_query_builder.expressions import LargeIn, Similar
+
 
 class Filter:
-    """Base class for custom filters"""
+    """Base class for custom filters
+
+    Filters that can be combined in filter groups return their predicate from `expression()`,
+    and apply it on the query with `filter()`.
+    """
+
+    # Convert the request values into the python type of the filtered field before filtering
+    coerce_values = False
+
     @abstractmethod
     def filter(self, query, model, filter_name, values):
         pass
 
+    def expression(self, model, filter_name, values):
+        """Get the predicate of the filter, needed to use the filter inside a filter group"""
+        raise NotImplementedError(f"{type(self).__name__} cannot be used inside a filter group")
 
-class ExactFilter(Filter):
-    """Perform an exact match filter on a model field"""
-    def filter(self, query, model, filter_name, values):
-        if len(values) == 1:
-            return query.filter_by(**{filter_name: values[0]})
-        return query.filter(getattr(model, filter_name).in_(values))
 
+class ExpressionFilter(Filter):
+    """Base class for filters applying the predicate of their expression on the query"""
+
+    def filter(self, query, model, filter_name, values, *args):
+        return query.where(self.expression(model, filter_name, values, *args))
+
+
+class ExactFilter(ExpressionFilter):
+    """Perform an exact match filter on a model field
+
+    A single expanding IN parameter is used for any number of values,
+    so the statement has the same shape and is compiled only once.
+    The values are de-duplicated and sorted, so the same values in any order are bound the same way.
+    Above the large IN threshold the values are bound as a single array or JSON parameter instead,
+    which keeps huge lists clear of the parameter limits of the database.
+    """
+    coerce_values = True
+    large_in_threshold = 500
+
+    def __init__(self, large_in_threshold: int = None):
+        if large_in_threshold is not None:
+            self.large_in_threshold = large_in_threshold
+
+    def expression(self, model, filter_name, values):
+        field = getattr(model, filter_name)
+        values = list(dict.fromkeys(values))
+        try:
+            values.sort()
+        except TypeError:
+            pass
+        if len(values) > self.large_in_threshold:
+            return LargeIn(field, values)
+        return field.in_(values)
+
+
+class ComparisonFilter(ExpressionFilter):
+    """Perform a comparison filter on a model field with the operator applied on the request
+
+    Every comparison is a plain range or equality predicate on the field, so it can be served by an index on it.
+    """
+    coerce_values = True
+    operators = ("eq", "ne", "gt", "gte", "lt", "lte", "between", "is_null")
+
+    def expression(self, model, filter_name, values, operator="eq"):
+        field = getattr(model, filter_name)
+        if operator == "eq":
+            return field.in_(values)
+        if operator == "ne":
+            return field.not_in(values)
+        if operator == "between":
+            if len(values) != 2:
+                raise InvalidFilterValueException(f"Operator 'between' of filter '{filter_name}' needs two values")
+            return field.between(*values)
+
+        if len(values) != 1:
+            raise InvalidFilterValueException(f"Operator '{operator}' of filter '{filter_name}' needs a single value")
+        value = values[0]
+        if operator == "is_null":
+            return field.is_(None) if value else field.is_not(None)
+        if operator == "gt":
+            return field > value
+        if operator == "gte":
+            return field >= value
+        if operator == "lt":
+            return field < value
+        if operator == "lte":
+            return field <= value
+        raise InvalidFilterValueException(f"Unknown operator '{operator}'")
 
-class PartialFilter(Filter):
+
+class PartialFilter(ExpressionFilter):
     """Perform a case-insensitive wildcard filter on a model field"""
-    def filter(self, query, model, filter_name, values):
-        if len(values) == 1:
-            return query.filter(getattr(model, filter_name).ilike(f"%{values[0]}%"))
-        else:
-            q = query
-            for value in values:
-                q = q.filter(getattr(model, filter_name).ilike(f"%{value}%"))
-            return q
+    def expression(self, model, filter_name, values):
+        field = getattr(model, filter_name)
+        return and_(*[field.ilike(f"%{value}%") for value in values])
+
+
+class StartsWithFilter(ExpressionFilter):
+    """Perform a case-insensitive prefix filter on a model field
+
+    The filter compares against `lower(field)` without a leading wildcard,
+    so it can be served by an index on the `lower(field)` expression.
+    """
+    def expression(self, model, filter_name, values):
+        field = func.lower(getattr(model, filter_name))
+        return and_(*[field.like(f"{self._escape(value.lower())}%", escape="\\") for value in values])
+
+    def _escape(self, value):
+        return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class SimilarFilter(ExpressionFilter):
+    """Perform a trigram similarity filter on a model field
+
+    On PostgreSQL the `%` operator of the pg_trgm extension is used, which can be served by a trigram index.
+    Other databases fall back to a case-insensitive wildcard filter.
+    """
+    def expression(self, model, filter_name, values):
+        field = getattr(model, filter_name)
+        return and_(*[Similar(field, value) for value in values])
+
+
+class FullTextFilter(ExpressionFilter):
+    """Perform a full-text search filter on a model field
+
+    With a config the field is matched as `to_tsvector(config, field) @@ plainto_tsquery(config, value)`
+    on PostgreSQL, so it can be served by an index on the same expression. With an fts_table the model
+    is matched through an SQLite FTS5 table whose rowid is the primary key of the model. Otherwise the
+    full-text match operator of the database is used.
+    """
+    def __init__(self, config: str = None, fts_table: str = None):
+        self.config = config
+        self.fts_table = fts_table
+
+    def expression(self, model, filter_name, values):
+        return and_(*[self._match(model, filter_name, value) for value in values])
+
+    def _match(self, model, filter_name, value):
+        if self.fts_table is not None:
+            fts_table = table(self.fts_table, column("rowid"))
+            phrase = '"{}"'.format(value.replace('"', '""'))
+            matches = select(fts_table.c.rowid).where(literal_column(self.fts_table).op("MATCH")(phrase))
+            # The model can be the aliased entity of a relationship path, so the key is looked up on its mapper
+            mapper = inspect(model).mapper
+            return getattr(model, mapper.get_property_by_column(mapper.primary_key[0]).key).in_(matches)
+
+        field = getattr(model, filter_name)
+        if self.config is not None:
+            return func.to_tsvector(self.config, field).op("@@")(func.plainto_tsquery(self.config, value))
+        return field.match(value)
+
+
+# The filters performed on a field of the model, whose names can be dotted paths through relationships
+FIELD_FILTERS = (ExactFilter, ComparisonFilter, PartialFilter, StartsWithFilter, SimilarFilter, FullTextFilter)
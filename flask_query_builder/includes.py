@@ -0,0 +1,55 @@
+from abc import abstractmethod
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, selectinload, subqueryload
+
+from flask_query_builder.exceptions import InvalidIncludeException
+
+LOADERS = {
+    "joined": joinedload,
+    "selectin": selectinload,
+    "subquery": subqueryload,
+}
+
+
+class Include:
+    """Base class for custom includes"""
+    @abstractmethod
+    def include(self, query, model, include_name):
+        pass
+
+
+class RelationshipInclude(Include):
+    """Eagerly load a relationship of a model, following dotted names through nested relationships
+
+    Unless a strategy is given, collections are loaded with a SELECT IN query and
+    many-to-one relationships with a JOIN, so the number of queries depends on the depth of the include only.
+    """
+    def __init__(self, strategy: str = None):
+        if strategy is not None and strategy not in LOADERS:
+            raise InvalidIncludeException(f"Unknown loading strategy '{strategy}'")
+        self.strategy = strategy
+
+    def include(self, query, model, include_name):
+        return query.options(self.get_loader(model, include_name))
+
+    def get_loader(self, model, include_name):
+        """Get the loader option for the relationship path"""
+        names = include_name.split(".")
+        loader = None
+        for index, name in enumerate(names):
+            relationship = inspect(model).relationships.get(name)
+            if relationship is None:
+                raise InvalidIncludeException(f"'{name}' is not a relationship of '{model.__name__}'")
+
+            strategy = self.strategy if index == len(names) - 1 else None
+            load = LOADERS[strategy or self._get_default_strategy(relationship)]
+            attribute = getattr(model, name)
+            loader = load(attribute) if loader is None else getattr(loader, load.__name__)(attribute)
+            model = relationship.mapper.class_
+        return loader
+
+    def _get_default_strategy(self, relationship) -> str:
+        if relationship.uselist:
+            return "selectin"
+        return "joined"
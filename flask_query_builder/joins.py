@@ -0,0 +1,97 @@
+from typing import List, Tuple
+
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import aliased
+
+
+def resolve_path(model, name: str) -> Tuple[list, str]:
+    """Resolve a dotted name like `address.road` into the relationships leading to the field and the field name
+
+    A `ValueError` is raised when a part of the path is not a relationship, or the field does not exist.
+    """
+    *relationship_names, field_name = name.split(".")
+    relationships = []
+    mapper = inspect(model)
+    for relationship_name in relationship_names:
+        relationship = mapper.relationships.get(relationship_name)
+        if relationship is None:
+            raise ValueError(f"'{relationship_name}' is not a relationship of '{mapper.class_.__name__}'")
+        relationships.append(relationship)
+        mapper = relationship.mapper
+    if field_name not in mapper.all_orm_descriptors:
+        raise ValueError(f"'{field_name}' is not a field of '{mapper.class_.__name__}'")
+    return relationships, field_name
+
+
+def get_path_attribute(model, name: str):
+    """Get the attribute on the mapped class a dotted name leads to"""
+    relationships, field_name = resolve_path(model, name)
+    target = relationships[-1].mapper.class_ if relationships else model
+    return getattr(target, field_name)
+
+
+def is_to_many(relationships) -> bool:
+    return any(relationship.uselist for relationship in relationships)
+
+
+def join_path(query, model, relationships: List):
+    """Outer join the relationships of a path, reusing the joins already present on the query
+
+    Every step of the path is joined once under an alias named after the path,
+    so filters and sorts on the same relationship share the join. Returns the query and the joined entity.
+    """
+    entity = model
+    names = [inspect(model).local_table.name]
+    for relationship in relationships:
+        names.append(relationship.key)
+        alias_name = "_".join(names)
+        target = find_join(query, alias_name)
+        if target is None:
+            target = aliased(relationship.mapper.class_, name=alias_name)
+            query = query.outerjoin(target, getattr(entity, relationship.key))
+        entity = target
+    return query, entity
+
+
+def find_join(query, alias_name: str):
+    """Get the aliased entity joined on the query under a name, or None if it is not joined"""
+    for setup_join in query._setup_joins:
+        parent_entity = getattr(setup_join[0], "_annotations", {}).get("parententity")
+        if parent_entity is not None and getattr(parent_entity, "name", None) == alias_name:
+            return parent_entity.entity
+    return None
+
+
+def exists_path(model, relationships: List, criterion_of):
+    """Get an EXISTS criterion matching the rows with a related row through the path
+
+    The criterion of the related entity is built by `criterion_of(entity)`. Filtering through
+    a to-many relationship this way does not multiply the rows, so no DISTINCT is needed.
+    """
+    entities = [model]
+    names = [inspect(model).local_table.name]
+    for relationship in relationships:
+        names.append(relationship.key)
+        entities.append(aliased(relationship.mapper.class_, name="_".join(names) + "_exists"))
+
+    criterion = criterion_of(entities[-1])
+    for index in range(len(relationships), 0, -1):
+        relationship = relationships[index - 1]
+        comparator = getattr(entities[index - 1], relationship.key).of_type(entities[index])
+        criterion = comparator.any(criterion) if relationship.uselist else comparator.has(criterion)
+    return criterion
+
+
+def apply_path_filter(query, model, filter_name: str, apply):
+    """Apply a filter on a field reached through a dotted path of relationships
+
+    `apply(query, entity, field_name)` filters the query on a field of an entity. To-one paths are joined once and
+    shared with the sorts, paths through a to-many relationship are matched with EXISTS instead.
+    """
+    relationships, field_name = resolve_path(model, filter_name)
+    if is_to_many(relationships):
+        def criterion_of(entity):
+            return apply(select(entity), entity, field_name).whereclause
+        return query.where(exists_path(model, relationships, criterion_of))
+    query, entity = join_path(query, model, relationships)
+    return apply(query, entity, field_name)
@@ -0,0 +1,193 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime, time
+from decimal import Decimal, InvalidOperation
+from typing import List, Optional
+from uuid import UUID
+
+import sqlalchemy as sqa
+from sqlalchemy import and_, false, or_
+
+from flask_query_builder.coercion import get_coercer, parse_date, parse_datetime, parse_time, to_bool
+from flask_query_builder.exceptions import InvalidPageException
+from flask_query_builder.sorts import order_by
+
+# Databases sorting NULL values as larger than any other value
+NULLS_LARGER = ("postgresql", "oracle")
+
+
+class CursorPage:
+    """A page of results returned by cursor pagination"""
+
+    def __init__(self, items: List, next_cursor: Optional[str] = None, prev_cursor: Optional[str] = None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self) -> bool:
+        return self.prev_cursor is not None
+
+
+class KeysetColumn:
+    """A column taking part in the keyset used to seek through the results
+
+    When the sort does not place the NULL values, `default_nulls` tells where the database places them
+    for a nullable column, so the seek predicate finds the NULL values in the same place.
+    """
+
+    def __init__(self, attribute, descending=False, path=(), nulls: str = None, default_nulls: str = None):
+        self.attribute = attribute
+        self.descending = descending
+        self.path = tuple(path)
+        self.nulls = nulls
+        self.default_nulls = default_nulls
+
+    def value_of(self, item):
+        """Get the value of this column from a loaded result, following the relationships of its path"""
+        for name in self.path:
+            item = getattr(item, name)
+            if item is None:
+                return None
+        return getattr(item, self.attribute.key)
+
+    def order_by(self, reverse=False):
+        """Get the ORDER BY clause of this column, optionally in reverse direction"""
+        return order_by(self.attribute, self.descending != reverse, self._get_nulls(self.nulls, reverse))
+
+    def after(self, value, reverse=False):
+        """Get the predicate for rows positioned after the value in the sort direction
+
+        When the NULL values are placed first or last, they are positioned before or after every other value.
+        """
+        nulls = self._get_nulls(self.nulls or self.default_nulls, reverse)
+        if value is None:
+            return self.attribute.is_not(None) if nulls == "first" else false()
+        if self.descending != reverse:
+            predicate = self.attribute < value
+        else:
+            predicate = self.attribute > value
+        if nulls == "last":
+            return or_(predicate, self.attribute.is_(None))
+        return predicate
+
+    def coerce(self, value):
+        """Convert a value decoded from a cursor into the python type of the column, rejecting values of another type
+
+        Cursors come from the request, so a value that cannot be compared with the column is not sent to the database.
+        """
+        if value is None:
+            return None
+        column_type = getattr(self.attribute, "type", None)
+        coercer = get_coercer(column_type)
+        if isinstance(value, dict):
+            (tag, raw), = value.items()
+            if not isinstance(raw, str):
+                raise ValueError("cursor value is not valid")
+            return coercer(raw) if coercer is not None else _DECODERS[tag](raw)
+        if isinstance(value, list):
+            raise ValueError("cursor value is not valid")
+        if coercer is None:
+            if isinstance(column_type, sqa.String) and not isinstance(value, str):
+                raise ValueError("cursor value is not a string")
+            return value
+        if isinstance(value, str):
+            return coercer(value)
+        if isinstance(value, bool) != (coercer is to_bool):
+            raise ValueError("cursor value does not match the column")
+        coerced = value if coercer is to_bool else coercer(value)
+        if coerced != value:
+            raise ValueError("cursor value does not match the column")
+        return coerced
+
+    def equals(self, value):
+        """Get the predicate for rows with the same value"""
+        if value is None:
+            return self.attribute.is_(None)
+        return self.attribute == value
+
+    @staticmethod
+    def _get_nulls(nulls: str, reverse: bool):
+        """Get where the NULL values are placed, which flips when the order is reversed"""
+        if nulls is None or not reverse:
+            return nulls
+        return "last" if nulls == "first" else "first"
+
+
+def get_default_nulls(dialect_name: str, descending=False) -> str:
+    """Get where a database places the NULL values of a sort without NULLS FIRST or NULLS LAST
+
+    PostgreSQL and Oracle sort NULL values as larger than any other value, the other databases as smaller.
+    """
+    larger = dialect_name in NULLS_LARGER
+    return "last" if larger != descending else "first"
+
+
+def is_nullable(attribute) -> bool:
+    """Check if the column of a mapped attribute can hold NULL values"""
+    columns = getattr(getattr(attribute, "property", None), "columns", None)
+    return not columns or getattr(columns[0], "nullable", True)
+
+
+def keyset_predicate(columns: List[KeysetColumn], values: List, reverse=False):
+    """Build the seek predicate for the rows that come after the given keyset values
+
+    For the keyset (a, b, c) this expands to
+    a > :a OR (a = :a AND b > :b) OR (a = :a AND b = :b AND c > :c)
+    with the comparison flipped for descending columns.
+    """
+    clauses = []
+    for index, column in enumerate(columns):
+        equalities = [
+            previous.equals(values[position])
+            for position, previous in enumerate(columns[:index])
+        ]
+        clauses.append(and_(*equalities, column.after(values[index], reverse)))
+    return or_(*clauses)
+
+
+def encode_cursor(values: List) -> str:
+    """Encode the keyset values of a result into an opaque cursor"""
+    payload = json.dumps([_encode_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: List[KeysetColumn]) -> List:
+    """Decode an opaque cursor back into keyset values, converted into the python types of the keyset columns"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor does not match the applied sorts")
+        return [column.coerce(value) for column, value in zip(columns, values)]
+    except (ValueError, TypeError, KeyError, InvalidOperation, binascii.Error) as e:
+        raise InvalidPageException(f"Invalid cursor '{cursor}'") from e
+
+
+_ENCODERS = (
+    (datetime, "dt", lambda value: value.isoformat()),
+    (date, "d", lambda value: value.isoformat()),
+    (time, "t", lambda value: value.isoformat()),
+    (Decimal, "dec", str),
+    (UUID, "uuid", str),
+)
+
+_DECODERS = {
+    "dt": parse_datetime,
+    "d": parse_date,
+    "t": parse_time,
+    "dec": Decimal,
+    "uuid": UUID,
+}
+
+
+def _encode_value(value):
+    for value_type, tag, encode in _ENCODERS:
+        if isinstance(value, value_type):
+            return {tag: encode(value)}
+    return value
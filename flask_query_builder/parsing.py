@@ -0,0 +1,204 @@
+from types import MappingProxyType
+from typing import Mapping, NamedTuple, Optional, Tuple, Union
+
+from flask import current_app, g, request
+
+from flask_query_builder.exceptions import InvalidRequestException
+
+MAX_FILTERS = 50
+MAX_FILTER_VALUES = 5000
+MAX_SORTS = 10
+MAX_FILTER_DEPTH = 3
+
+GROUP_OPERATORS = ("or", "and")
+
+
+class AppliedSort(NamedTuple):
+    """Helper class for sorts applied on the request"""
+    name: str
+    descending: bool = False
+
+
+class AppliedFilter(NamedTuple):
+    """Helper class for filters applied on the request"""
+    name: str
+    values: Tuple[str, ...]
+    operator: Optional[str] = None
+
+
+class FilterGroup(NamedTuple):
+    """Helper class for a group of filters applied on the request, `filter[or][0][name]=value`
+
+    Every member is a conjunction of the filters and nested groups sharing its index,
+    and the members are combined with the operator of the group.
+    """
+    operator: str
+    members: Tuple[Tuple[Union[AppliedFilter, "FilterGroup"], ...], ...]
+
+
+class ParsedRequest(NamedTuple):
+    """The query parameters of a request that are understood by the QueryBuilder"""
+    filters: Tuple[AppliedFilter, ...]
+    sorts: Tuple[AppliedSort, ...]
+    page: Mapping[str, str]
+    fields: Mapping[str, Tuple[str, ...]]
+    include: Tuple[str, ...]
+    groups: Tuple[FilterGroup, ...] = ()
+    facets: Tuple[str, ...] = ()
+
+
+def get_parsed_request() -> ParsedRequest:
+    """Get the parsed query parameters of the current request
+
+    The request is parsed once and stored on `flask.g`, so every builder used on the same request shares it.
+    """
+    cached = g.get("_query_builder_parsed_request")
+    if cached is not None and cached[0] is request.args:
+        return cached[1]
+
+    config = current_app.config
+    parsed = parse_args(
+        request.args,
+        max_filters=config.get("QUERY_BUILDER_MAX_FILTERS", MAX_FILTERS),
+        max_filter_values=config.get("QUERY_BUILDER_MAX_FILTER_VALUES", MAX_FILTER_VALUES),
+        max_sorts=config.get("QUERY_BUILDER_MAX_SORTS", MAX_SORTS),
+        max_filter_depth=config.get("QUERY_BUILDER_MAX_FILTER_DEPTH", MAX_FILTER_DEPTH),
+    )
+    g._query_builder_parsed_request = (request.args, parsed)
+    return parsed
+
+
+def parse_args(
+        args,
+        max_filters: int = MAX_FILTERS,
+        max_filter_values: int = MAX_FILTER_VALUES,
+        max_sorts: int = MAX_SORTS,
+        max_filter_depth: int = MAX_FILTER_DEPTH,
+) -> ParsedRequest:
+    """Parse the query parameters of a request in a single pass"""
+    filters = []
+    groups = {}
+    filter_count = 0
+    sorts = ()
+    page = {}
+    fields = {}
+    include = ()
+    facets = ()
+    for key, value in args.items():
+        if key == "sort":
+            sorts = _parse_sorts(value, max_sorts)
+        elif key == "include":
+            include = tuple(_split(value))
+        elif key == "facet":
+            facets = tuple(_split(value))
+        elif key.startswith("filter["):
+            name = _get_bracketed(key, 7)
+            if name is None:
+                continue
+            if filter_count == max_filters:
+                raise InvalidRequestException(f"No more than {max_filters} filters can be applied")
+            filter_count += 1
+            if name in GROUP_OPERATORS:
+                _add_grouped(groups, key, _get_segments(key, 7), value, max_filter_values, max_filter_depth)
+                continue
+            operator = _get_bracketed(key, 7 + len(name) + 2)
+            filters.append(AppliedFilter(name, _split_values(name, value, max_filter_values), operator))
+        elif key.startswith("page["):
+            name = _get_bracketed(key, 5)
+            if name is not None:
+                page[name] = value
+        elif key.startswith("fields["):
+            name = _get_bracketed(key, 7)
+            if name is not None:
+                fields[name] = tuple(_split(value))
+
+    return ParsedRequest(
+        filters=tuple(filters),
+        sorts=sorts,
+        page=MappingProxyType(page),
+        fields=MappingProxyType(fields),
+        include=include,
+        groups=_build_groups(groups),
+        facets=facets,
+    )
+
+
+def _get_bracketed(key: str, start: int):
+    """Get the name inside the pair of square brackets opened right before the start of a key"""
+    if key[start - 1:start] != "[":
+        return None
+    end = key.find("]", start)
+    if end <= start:
+        return None
+    return key[start:end]
+
+
+def _get_segments(key: str, start: int):
+    """Get the names inside every pair of square brackets following each other from the start of a key"""
+    segments = []
+    segment = _get_bracketed(key, start)
+    while segment is not None:
+        segments.append(segment)
+        start += len(segment) + 2
+        segment = _get_bracketed(key, start)
+    return segments
+
+
+def _add_grouped(groups: dict, key: str, segments, value: str, max_values: int, max_depth: int, depth: int = 1) -> None:
+    """Add a grouped filter, `[or][index][name][operator]`, to the members of its group"""
+    if depth > max_depth:
+        raise InvalidRequestException(f"Filter groups cannot be nested more than {max_depth} levels deep")
+    if len(segments) < 3 or not segments[1].isdigit():
+        raise InvalidRequestException(f"Filter group '{key}' must be of the form 'filter[or][index][name]'")
+
+    operator, index, rest = segments[0], int(segments[1]), segments[2:]
+    filters, nested = groups.setdefault(operator, {}).setdefault(index, ([], {}))
+    if rest[0] in GROUP_OPERATORS:
+        _add_grouped(nested, key, rest, value, max_values, max_depth, depth + 1)
+    elif len(rest) > 2:
+        raise InvalidRequestException(f"Filter group '{key}' must be of the form 'filter[or][index][name]'")
+    else:
+        filters.append(AppliedFilter(rest[0], _split_values(rest[0], value, max_values), rest[1] if len(rest) == 2 else None))
+
+
+def _build_groups(groups: dict) -> Tuple[FilterGroup, ...]:
+    return tuple(
+        FilterGroup(operator, tuple(
+            tuple(filters) + _build_groups(nested) for _, (filters, nested) in sorted(members.items())
+        ))
+        for operator, members in groups.items()
+    )
+
+
+def _split(value: str):
+    return [part for part in value.split(",") if part]
+
+
+def _split_values(name: str, value: str, max_values: int) -> Tuple[str, ...]:
+    values = value.split(",", max_values)
+    if len(values) > max_values:
+        raise InvalidRequestException(f"No more than {max_values} values can be applied on filter '{name}'")
+    return tuple(values)
+
+
+def parse_sorts(sorts) -> Tuple[AppliedSort, ...]:
+    """Parse sorts given the same way as on the request, like "-birth_date,last_name" or a list of names"""
+    if not isinstance(sorts, str):
+        sorts = ",".join(sorts)
+    return _parse_sorts(sorts, MAX_SORTS)
+
+
+def _parse_sorts(value: str, max_sorts: int) -> Tuple[AppliedSort, ...]:
+    raw_sorts = value.split(",", max_sorts)
+    if len(raw_sorts) > max_sorts:
+        raise InvalidRequestException(f"No more than {max_sorts} sorts can be applied")
+
+    sorts = []
+    for sort in raw_sorts:
+        if not sort:
+            continue
+        if sort[0] == "-":
+            sorts.append(AppliedSort(sort[1:], True))
+        else:
+            sorts.append(AppliedSort(sort))
+    return tuple(sorts)
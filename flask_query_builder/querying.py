@@ -1,43 +1,128 @@
-import re
-from typing import List
-
-from flask import request
-from sqlalchemy.orm import Query
-from sqlalchemy.orm import declarative_base
-
-from flask_query_builder.exceptions import InvalidFilterException, InvalidSortException
-from flask_query_builder.filters import Filter, ExactFilter, PartialFilter
-from flask_query_builder.sorts import Sort, FieldSort
+import time
+from typing import List, Optional, Tuple
+
+from flask import Response, current_app, g, has_app_context, has_request_context, stream_with_context
+from sqlalchemy import and_, inspect, or_, select
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.orm import declarative_base, load_only, undefer
+from sqlalchemy.sql import Select
+
+from flask_query_builder.exceptions import (
+    InvalidFilterException,
+    InvalidSortException,
+    InvalidPageException,
+    InvalidFieldException,
+    InvalidIncludeException,
+    InvalidFacetException,
+    QueryCostExceededException,
+)
+from flask_query_builder.budget import CostBudget, limit_statement
+from flask_query_builder.caching import ResultCache, get_tables
+from flask_query_builder.coercion import coerce_values, get_coercer, to_bool
+from flask_query_builder.counting import count_rows, estimate_rows
+from flask_query_builder.diagnostics import QueryDiagnostics, diagnose_statement
+from flask_query_builder.facets import facet_statement, get_facet_counts
+from flask_query_builder.filters import (
+    FIELD_FILTERS,
+    Filter,
+    ExactFilter,
+    ComparisonFilter,
+    PartialFilter,
+    StartsWithFilter,
+    SimilarFilter,
+    FullTextFilter,
+)
+from flask_query_builder.includes import Include, RelationshipInclude
+from flask_query_builder.joins import apply_path_filter, exists_path, get_path_attribute, join_path, resolve_path
+from flask_query_builder.pagination import (
+    CursorPage,
+    KeysetColumn,
+    decode_cursor,
+    encode_cursor,
+    get_default_nulls,
+    is_nullable,
+    keyset_predicate,
+)
+from flask_query_builder.parsing import (
+    AppliedFilter,
+    AppliedSort,
+    FilterGroup,
+    ParsedRequest,
+    get_parsed_request,
+    parse_sorts,
+)
+from flask_query_builder.routing import ReplicaRouter, has_writes
+from flask_query_builder.sorts import Sort, FieldSort, ExpressionSort
+from flask_query_builder.statements import StatementCacheStats, track_statement_cache
+from flask_query_builder.streaming import STREAM_FORMATS, get_stream_keys
 
 BaseModel = declarative_base()
 
 
-class AppliedSort:
-    """Helper class for sorts applied on the request"""
-
-    def __init__(self, name, descending=False):
-        self.name = name
-        self.descending = descending
-
-
 class AllowedFilter:
     """A class for specifying a filter that is allowed on the request"""
 
-    def __init__(self, name: str, filter_class: Filter, internal_name: str = None):
+    def __init__(self, name: str, filter_class: Filter, internal_name: str = None, operators=()):
         self.name = name
         self.internal_name = internal_name
         self.filter_class = filter_class
+        self.operators = tuple(operators)
+        self._coercers = {}
+
+    def coerce(self, model: BaseModel, values, operator: str = None):
+        """Convert the request values into the python type of the filtered field"""
+        if operator == "is_null":
+            return coerce_values(to_bool, self.name, values)
+        if not self.filter_class.coerce_values:
+            return values
+        return coerce_values(self.get_coercer(model), self.name, values)
+
+    def get_coercer(self, model: BaseModel):
+        """Get the function converting request values for the field on the model, resolving it only once"""
+        if model not in self._coercers:
+            try:
+                attribute = get_path_attribute(model, self.internal_name or self.name)
+            except ValueError:
+                attribute = None
+            self._coercers[model] = get_coercer(getattr(attribute, "type", None))
+        return self._coercers[model]
 
     @classmethod
     def exact(cls, name, internal_name: str = None):
         """Specify an exact match filter"""
         return cls(name, ExactFilter(), internal_name)
 
+    @classmethod
+    def comparison(cls, name, internal_name: str = None, operators=ComparisonFilter.operators):
+        """Specify a filter comparing with the operator applied on the request, `filter[name][gte]=value`
+
+        The operators can be any of eq, ne, gt, gte, lt, lte, between and is_null.
+        """
+        unknown = set(operators) - set(ComparisonFilter.operators)
+        if unknown:
+            raise InvalidFilterException(f"Unknown operators {sorted(unknown)} on filter '{name}'")
+        return cls(name, ComparisonFilter(), internal_name, operators)
+
     @classmethod
     def partial(cls, name, internal_name: str = None):
         """Specify a case-insensitive filter wildcard filter"""
         return cls(name, PartialFilter(), internal_name)
 
+    @classmethod
+    def starts_with(cls, name, internal_name: str = None):
+        """Specify a case-insensitive prefix filter that can be served by an index on lower(field)"""
+        return cls(name, StartsWithFilter(), internal_name)
+
+    @classmethod
+    def similar(cls, name, internal_name: str = None):
+        """Specify a trigram similarity filter, using pg_trgm on PostgreSQL"""
+        return cls(name, SimilarFilter(), internal_name)
+
+    @classmethod
+    def full_text(cls, name, internal_name: str = None, config: str = None, fts_table: str = None):
+        """Specify a full-text search filter, using a PostgreSQL text search config or an SQLite FTS5 table"""
+        return cls(name, FullTextFilter(config, fts_table), internal_name)
+
     @classmethod
     def custom(cls, name: str, filter_class: Filter):
         """Specify a custom filter by providing your own custom filter"""
@@ -53,9 +138,14 @@ class AllowedSort:
         self.sort_class = sort_class
 
     @classmethod
-    def field(cls, name: str, internal_name: str = None):
-        """Specify a field sort"""
-        return cls(name, FieldSort(), internal_name)
+    def field(cls, name: str, internal_name: str = None, nulls: str = None):
+        """Specify a field sort, placing the NULL values first or last with nulls set to 'first' or 'last'"""
+        return cls(name, FieldSort(nulls), internal_name)
+
+    @classmethod
+    def expression(cls, name: str, expression, nulls: str = None):
+        """Specify a sort on an SQL expression, or a function of the model returning one"""
+        return cls(name, ExpressionSort(expression, nulls))
 
     @classmethod
     def custom(cls, name: str, sort_class: Sort, internal_name: str = None):
@@ -63,31 +153,454 @@ class AllowedSort:
         return cls(name, sort_class, internal_name)
 
 
-class QueryBuilder:
-    """The base class for starting your query"""
+class AllowedInclude:
+    """A class for specifying an include that is allowed on the request"""
 
-    def __init__(self, model: BaseModel, query=None, raise_exceptions=True):
+    def __init__(self, name: str, include_class: Include, internal_name: str = None):
+        self.name = name
+        self.internal_name = internal_name
+        self.include_class = include_class
+
+    @classmethod
+    def relationship(cls, name: str, internal_name: str = None, strategy: str = None):
+        """Specify a relationship include, optionally choosing the loading strategy
+
+        The strategy can be one of "joined", "selectin" or "subquery".
+        """
+        return cls(name, RelationshipInclude(strategy), internal_name)
+
+    @classmethod
+    def custom(cls, name: str, include_class: Include, internal_name: str = None):
+        """Specify a custom include by providing your own custom include"""
+        return cls(name, include_class, internal_name)
+
+
+class AllowedFacet:
+    """A class for specifying a facet that can be counted on the request"""
+
+    def __init__(self, name: str, internal_name: str = None):
+        self.name = name
+        self.internal_name = internal_name
+
+    @classmethod
+    def field(cls, name: str, internal_name: str = None):
+        """Specify a facet counting the rows per value of a field, or of a dotted path to a related field"""
+        return cls(name, internal_name)
+
+
+def _is_equality(term) -> bool:
+    """Check if a filter term matches any of its values exactly"""
+    allowed_filter, operator, _ = term
+    if isinstance(allowed_filter.filter_class, ExactFilter):
+        return operator is None
+    return isinstance(allowed_filter.filter_class, ComparisonFilter) and operator in (None, "eq")
+
+
+def _term_key(term):
+    allowed_filter, operator, values = term
+    return allowed_filter.name, operator, tuple(values)
+
+
+def _intersect_terms(terms) -> list:
+    """Merge the equality terms of the same filter in a conjunction into the values they have in common,
+    leaving out repeated terms
+    """
+    merged = {}
+    for term in terms:
+        key = (term[0].name, "=") if _is_equality(term) else _term_key(term)
+        if key not in merged:
+            merged[key] = term
+        elif key[1] == "=":
+            allowed_filter, operator, values = merged[key]
+            other_values = set(term[2])
+            merged[key] = (allowed_filter, operator, [value for value in values if value in other_values])
+    return list(merged.values())
+
+
+def get_filter_map(filters):
+    """Get a dictionary of filter names with their corresponding filter"""
+    filter_map = {}
+    for filter in filters:
+        if isinstance(filter, AllowedFilter):
+            filter_map[filter.name] = filter
+        else:
+            filter_map[filter] = AllowedFilter.exact(filter)
+    return filter_map
+
+
+def get_sort_map(sorts):
+    """Get a dictionary of sort names with their corresponding sort"""
+    sort_map = {}
+    for sort in sorts:
+        if isinstance(sort, AllowedSort):
+            sort_map[sort.name] = sort
+        else:
+            sort_map[sort] = AllowedSort.field(sort)
+    return sort_map
+
+
+def get_facet_map(facets):
+    """Get a dictionary of facet names with their corresponding facet"""
+    facet_map = {}
+    for facet in facets:
+        if isinstance(facet, AllowedFacet):
+            facet_map[facet.name] = facet
+        else:
+            facet_map[facet] = AllowedFacet.field(facet)
+    return facet_map
+
+
+def get_include_map(includes):
+    """Get a dictionary of include names with their corresponding include"""
+    include_map = {}
+    for include in includes:
+        if isinstance(include, AllowedInclude):
+            include_map[include.name] = include
+        else:
+            include_map[include] = AllowedInclude.relationship(include)
+    return include_map
+
+
+class QueryBuilder:
+    """The base class for starting your query
+
+    The builder constructs a `select()` statement which is executed on the session directly.
+    A legacy `Query` is only built when it is asked for with `.query`.
+    """
+
+    page_size = 20
+    max_page_size = 100
+
+    def __init__(
+            self,
+            model: BaseModel,
+            query=None,
+            raise_exceptions=True,
+            statement_cache_stats: StatementCacheStats = None,
+            cache: ResultCache = None,
+            cache_namespace: str = None,
+            session: Session = None,
+            router: ReplicaRouter = None,
+            execution_options: dict = None,
+            budget: CostBudget = None,
+    ):
         self.model = model
-        self._query = query or model.query
+        self._started = time.perf_counter()
+        self._base_query = query if isinstance(query, Query) else None
+        self._from_select = query is not None and self._base_query is None
+        self._session = session if session is not None else getattr(self._base_query, "session", None)
         self._raise_exceptions = raise_exceptions
+        self._statement_cache_stats = statement_cache_stats
+        self._cache = cache
+        self._cache_namespace = cache_namespace
+        self._router = router
+        self._bind_arguments = None
+        execution_options = dict(execution_options or {})
+        self._isolation_level = execution_options.pop("isolation_level", None)
+        self._execution_options = execution_options
+        if budget is None and has_app_context():
+            budget = current_app.config.get("QUERY_BUILDER_COST_BUDGET")
+        self._budget = budget
+        self._cost = 0
+        self._degraded = []
+        self._operations = []
+        self._applied_sorts = []
+        self._applied_includes = []
+        self._applied_fields = []
+        self._applied_facets = []
+        self._tiebreaker = []
+        self._base_statement = self._get_base_statement(query)
+        if execution_options:
+            self._base_statement = self._base_statement.execution_options(**execution_options)
+        if statement_cache_stats is not None:
+            self._base_statement = track_statement_cache(self._base_statement, statement_cache_stats)
+        if budget is not None and budget.statement_timeout is not None:
+            self._base_statement = limit_statement(self._base_statement, budget.statement_timeout)
+        self._built_statement = None
+        self._diagnostics = None
+        if has_app_context() and current_app.config.get("QUERY_BUILDER_DIAGNOSTICS"):
+            self.diagnose(explain=current_app.config.get("QUERY_BUILDER_EXPLAIN", False))
+
+    @classmethod
+    def from_spec(cls, spec, query=None, session: Session = None):
+        """Start a query from a QuerySpec, applying its filters and sorts on the request"""
+        builder = cls(
+            spec.model,
+            query,
+            spec.raise_exceptions,
+            spec.statement_cache_stats,
+            spec.cache,
+            spec.cache_namespace,
+            session,
+            spec.router,
+            spec.execution_options,
+            spec.budget,
+        )
+        return builder._apply_spec(spec)
+
+    def _apply_spec(self, spec):
+        """Apply everything allowed by a QuerySpec on the request"""
+        self.page_size = spec.page_size
+        self.max_page_size = spec.max_page_size
+        self._apply_filters(spec.filters, spec.filter_groups) \
+            ._apply_sorts(spec.sorts, spec.default_sorts, spec.sort_tiebreaker) \
+            ._apply_includes(spec.includes)
+        if spec.fields:
+            self.allowed_fields(spec.fields, spec.resource_type)
+        return self._apply_facets(spec.facets)
+
+    def diagnose(self, explain=False):
+        """Record the applied filters and sorts, the time spent building and executing, and the executed statements
+
+        With explain the query plan of every statement is recorded as well, flagging full scans and sorts
+        without a supporting index. Every builder diagnosed on a request is kept for `add_diagnostics_header`.
+        """
+        parsed_request = self._parsed_request if has_request_context() else None
+        self._diagnostics = QueryDiagnostics(self.model, parsed_request, explain, self._started)
+        self._base_statement = diagnose_statement(self._base_statement, self._diagnostics)
+        self._built_statement = None
+        if has_app_context():
+            g.setdefault("_query_builder_diagnostics", []).append(self._diagnostics)
+        return self
+
+    @property
+    def diagnostics(self) -> QueryDiagnostics:
+        """Get the diagnostics of the builder, or None when it is not diagnosed"""
+        return self._diagnostics
+
+    @property
+    def cost(self) -> float:
+        """Get the cost of everything applied on the builder so far, as scored by its budget"""
+        return self._cost
+
+    @property
+    def degraded(self) -> List[str]:
+        """Get the sorts and includes on the request that were left out to stay within the budget"""
+        return list(self._degraded)
+
+    def _charge(self, cost: float, item: str, degradable=False) -> bool:
+        """Add the cost of an applied filter, sort or include to the budget
+
+        Returns False when a degradable item is left out to stay within the budget,
+        otherwise a QueryCostExceededException is thrown once the budget is spent.
+        """
+        if self._budget is None:
+            return True
+        if self._cost + cost > self._budget.max_cost:
+            if degradable and self._budget.degrade:
+                self._degraded.append(item)
+                return False
+            raise QueryCostExceededException(
+                f"Applied {item} exceeds the cost budget of {self._budget.max_cost} for the request"
+            )
+        self._cost += cost
+        return True
+
+    def allowed_filters(self, filters, groups=False):
+        """Provide a list of filters that can be applied on the request
+
+        With groups the filters can also be combined in filter groups, `filter[or][0][name]=value`.
+        """
+        return self._apply_filters(self._get_filter_map(filters), groups)
+
+    def allowed_sorts(self, sorts, default=None, tiebreaker=True):
+        """Provide a list of sorts that can be applied on the request
+
+        The default sorts, like "-birth_date,last_name", are applied when the request has no sort.
+        With the tiebreaker the results are finally ordered by the primary key, so the order is always the same.
+        The tiebreaker is only added once the builder executes or paginates the statement.
+        """
+        return self._apply_sorts(self._get_sort_map(sorts), default, tiebreaker)
+
+    def allowed_fields(self, fields, resource_type: str = None):
+        """Provide a list of fields that can be requested with `fields[resource_type]`
+
+        Only the requested fields and the primary key are loaded from the database.
+        The resource type defaults to the table name of the model.
+        """
+        resource_type = resource_type or self.model.__tablename__
+        requested_fields = self._parsed_request.fields.get(resource_type)
+        if not requested_fields:
+            return self
+
+        loaded_fields = []
+        for field in requested_fields:
+            if field not in fields:
+                if self._raise_exceptions:
+                    raise InvalidFieldException(f"Requested field '{field}' not allowed")
+                else:
+                    continue
+            loaded_fields.append(getattr(self.model, field))
+
+        if loaded_fields:
+            self._apply(lambda query: query.options(load_only(*loaded_fields)))
+            self._applied_fields.extend(field.key for field in loaded_fields)
+        return self
+
+    def allowed_includes(self, includes):
+        """Provide a list of relationships that can be included on the request"""
+        return self._apply_includes(get_include_map(includes))
 
-    def allowed_filters(self, filters):
-        """Provide a list of filters that can be applied on the request"""
-        applied_filters = self._get_applied_filters()
-        allowed_filter_map = self._get_filter_map(filters)
+    def allowed_facets(self, facets):
+        """Provide a list of facets that can be counted with `facets()` when requested with `facet`"""
+        return self._apply_facets(get_facet_map(facets))
+
+    def _apply_facets(self, allowed_facet_map):
+        """Keep the facets on the request that are present in the map of allowed facets"""
+        for applied_facet in self._parsed_request.facets:
+            allowed_facet = allowed_facet_map.get(applied_facet)
+            if allowed_facet is None:
+                if self._raise_exceptions:
+                    raise InvalidFacetException(f"Applied facet '{applied_facet}' not allowed")
+                else:
+                    continue
+            try:
+                resolve_path(self.model, allowed_facet.internal_name or allowed_facet.name)
+            except ValueError as error:
+                raise InvalidFacetException(f"Applied facet '{allowed_facet.name}' is not valid: {error}")
+            self._applied_facets.append(allowed_facet)
+        return self
+
+    def _apply_includes(self, allowed_include_map):
+        """Apply the includes on the request that are present in the map of allowed includes"""
+        for applied_include in self._parsed_request.include:
+            if applied_include not in allowed_include_map:
+                if self._raise_exceptions:
+                    raise InvalidIncludeException(f"Applied include '{applied_include}' not allowed")
+                else:
+                    continue
+            self._apply_include(allowed_include_map.get(applied_include))
+        return self
+
+    def _apply_filters(self, allowed_filter_map, groups=False):
+        """Apply the filters on the request that are present in the map of allowed filters
+
+        The filters are applied in the order of their names, so the same filters build the same statement
+        whatever their order on the request.
+        """
+        applied_filters = sorted(self._get_applied_filters(), key=lambda applied: (applied.name, applied.operator or ""))
         for applied_filter in applied_filters:
-            if applied_filter not in allowed_filter_map:
+            allowed_filter = self._get_allowed_filter(applied_filter, allowed_filter_map)
+            if allowed_filter is not None:
+                self._apply_filter(allowed_filter, applied_filter.values, applied_filter.operator)
+
+        for group in self._parsed_request.groups:
+            if not groups:
                 if self._raise_exceptions:
-                    raise InvalidFilterException(f"Applied filter '{applied_filter}' not allowed")
+                    raise InvalidFilterException("Filter groups not allowed")
                 else:
                     continue
-            self._apply_filter(allowed_filter_map.get(applied_filter))
+            expression = self._get_group_expression(group, allowed_filter_map)
+            if expression is not None:
+                self._apply_expression(expression)
         return self
 
-    def allowed_sorts(self, sorts):
-        """Provide a list of sorts that can be applied on the request"""
+    def _get_allowed_filter(self, applied_filter, allowed_filter_map):
+        """Get the allowed filter of an applied filter, or None when it is not allowed and exceptions are not raised"""
+        allowed_filter = allowed_filter_map.get(applied_filter.name)
+        if allowed_filter is None:
+            if self._raise_exceptions:
+                raise InvalidFilterException(f"Applied filter '{applied_filter.name}' not allowed")
+            return None
+        operator = applied_filter.operator
+        if operator is None and allowed_filter.operators:
+            # A filter with operators compares for equality when no operator is applied
+            operator = "eq"
+        if operator is not None and operator not in allowed_filter.operators:
+            if self._raise_exceptions:
+                raise InvalidFilterException(f"Applied operator '{operator}' not allowed on filter '{applied_filter.name}'")
+            return None
+        return allowed_filter
+
+    def _get_group_expression(self, group: FilterGroup, allowed_filter_map):
+        """Get the single predicate of a filter group
+
+        Members of an OR group filtering for equality on the same filter are merged into one IN,
+        and the members of an AND group are merged into one conjunction. Repeated members are left out.
+        """
+        members = [self._get_conjunction(member, allowed_filter_map) for member in group.members]
+        if group.operator == "and":
+            terms = [term for member_terms, _ in members for term in member_terms]
+            expressions = [expression for _, member_expressions in members for expression in member_expressions]
+            return self._combine(and_, self._get_term_expressions(_intersect_terms(terms)) + expressions)
+
+        merged = {}
+        expressions = []
+        seen = set()
+        for terms, member_expressions in members:
+            if len(terms) == 1 and not member_expressions and _is_equality(terms[0]):
+                allowed_filter, operator, values = terms[0]
+                if allowed_filter.name in merged:
+                    merged[allowed_filter.name][2].extend(values)
+                else:
+                    merged[allowed_filter.name] = (allowed_filter, operator, list(values))
+                continue
+            key = tuple(_term_key(term) for term in terms) if not member_expressions else None
+            if key is not None and key in seen:
+                continue
+            seen.add(key)
+            expressions.append(self._combine(and_, self._get_term_expressions(terms) + member_expressions))
+
+        expressions = self._get_term_expressions(list(merged.values())) + [e for e in expressions if e is not None]
+        return self._combine(or_, expressions)
+
+    def _get_conjunction(self, nodes, allowed_filter_map):
+        """Get the coerced filter terms and the nested group predicates of a member of a group"""
+        terms = []
+        expressions = []
+        for node in nodes:
+            if isinstance(node, FilterGroup):
+                expression = self._get_group_expression(node, allowed_filter_map)
+                if expression is not None:
+                    expressions.append(expression)
+                continue
+            allowed_filter = self._get_allowed_filter(node, allowed_filter_map)
+            if allowed_filter is not None:
+                self._charge_filter(allowed_filter, node.values)
+                values = allowed_filter.coerce(self.model, list(node.values), node.operator)
+                terms.append((allowed_filter, node.operator, values))
+        return _intersect_terms(terms), expressions
+
+    def _get_term_expressions(self, terms) -> list:
+        return [self._get_filter_expression(*term) for term in terms]
+
+    def _get_filter_expression(self, allowed_filter, operator, values):
+        """Get the predicate of a filter, matching dotted names through relationships with EXISTS"""
+        filter_name = allowed_filter.internal_name or allowed_filter.name
+        filter_class = allowed_filter.filter_class
+        extra = () if operator is None else (operator,)
+        try:
+            if "." in filter_name and isinstance(filter_class, FIELD_FILTERS):
+                try:
+                    relationships, field_name = resolve_path(self.model, filter_name)
+                except ValueError as error:
+                    raise InvalidFilterException(f"Applied filter '{allowed_filter.name}' is not valid: {error}")
+                return exists_path(
+                    self.model, relationships, lambda entity: filter_class.expression(entity, field_name, values, *extra)
+                )
+            return filter_class.expression(self.model, filter_name, values, *extra)
+        except NotImplementedError:
+            raise InvalidFilterException(f"Filter '{allowed_filter.name}' cannot be used inside a filter group")
+
+    def _combine(self, combine, expressions):
+        if not expressions:
+            return None
+        if len(expressions) == 1:
+            return expressions[0]
+        return combine(*expressions)
+
+    def _apply_expression(self, expression) -> None:
+        """Mutate the statement by applying a predicate"""
+        self._apply(lambda query: query.where(expression), counted=True)
+
+    def _apply_sorts(self, allowed_sort_map, default=None, tiebreaker=True):
+        """Apply the sorts on the request that are present in the map of allowed sorts, or else the default sorts"""
         applied_sorts = self._get_applied_sorts()
-        allowed_sort_map = self._get_sort_map(sorts)
+        if not applied_sorts and default:
+            applied_sorts = parse_sorts(default)
+            for applied_sort in applied_sorts:
+                if applied_sort.name not in allowed_sort_map:
+                    raise InvalidSortException(f"Default sort '{applied_sort.name}' not allowed")
         for applied_sort in applied_sorts:
             if applied_sort.name not in allowed_sort_map:
                 if self._raise_exceptions:
@@ -95,77 +608,409 @@ class QueryBuilder:
                 else:
                     continue
             self._apply_sort(allowed_sort_map.get(applied_sort.name), applied_sort.descending)
+        if tiebreaker:
+            self._apply_tiebreaker()
         return self
 
+    def _apply_tiebreaker(self) -> None:
+        """Order by the primary key columns that are not sorted on yet, so rows sorted the same keep their order
+
+        The columns are kept apart and only ordered by once the builder executes the statement,
+        so an ordering added on the `statement` or the `query` is not placed after them.
+        """
+        sorted_names = {
+            sort_name for allowed_sort, sort_name, _ in self._applied_sorts
+            if isinstance(allowed_sort.sort_class, FieldSort)
+        }
+        mapper = inspect(self.model)
+        primary_keys = [
+            getattr(self.model, mapper.get_property_by_column(column).key) for column in mapper.primary_key
+        ]
+        primary_keys = [primary_key for primary_key in primary_keys if primary_key.key not in sorted_names]
+        self._tiebreaker = primary_keys
+
     def _get_filter_map(self, filters):
         """Get a dictionary of filter names with their corresponding filter"""
-        filter_map = {}
-        for filter in filters:
-            if isinstance(filter, AllowedFilter):
-                filter_map[filter.name] = filter
-            else:
-                filter_map[filter] = AllowedFilter.exact(filter)
-        return filter_map
+        return get_filter_map(filters)
 
     def _get_sort_map(self, sorts):
         """Get a dictionary of sort names with their corresponding sort"""
-        sort_map = {}
-        for sort in sorts:
-            if isinstance(sort, AllowedSort):
-                sort_map[sort.name] = sort
-            else:
-                sort_map[sort] = AllowedSort.field(sort)
-        return sort_map
-
-    def _get_applied_sorts(self) -> List[AppliedSort]:
-        """Get the list of sorts applied on the request"""
-        raw_sorts = request.args.get("sort")
-        if raw_sorts is None:
-            return []
-
-        raw_sorts = raw_sorts.split(",")
-        formatted_sorts = []
-        for sort in raw_sorts:
-            if sort[0] == "-":
-                final_sort = AppliedSort(sort[1:], True)
-            else:
-                final_sort = AppliedSort(sort)
+        return get_sort_map(sorts)
 
-            formatted_sorts.append(final_sort)
+    @property
+    def _parsed_request(self) -> ParsedRequest:
+        """Get the query parameters of the request"""
+        return get_parsed_request()
 
-        return formatted_sorts
+    def _get_applied_sorts(self) -> Tuple[AppliedSort, ...]:
+        """Get the list of sorts applied on the request"""
+        return self._parsed_request.sorts
 
-    def _get_applied_filters(self) -> List[str]:
+    def _get_applied_filters(self) -> Tuple[AppliedFilter, ...]:
         """Get the list of filters applied on the request"""
-        applied_filters = []
-        for arg in request.args:
-            matches = re.findall(r"(?<=filter\[).[a-zA-Z._-]+", arg)
-            if len(matches) == 1:
-                applied_filters.append(matches[0])
-        return applied_filters
-
-    def _apply_filter(self, allowed_filter) -> None:
-        """Mutate the query by applying a filter"""
-        values = self._get_filter_values(allowed_filter.name)
+        return self._parsed_request.filters
+
+    def _charge_filter(self, allowed_filter, values) -> None:
+        if self._budget is not None:
+            self._charge(self._budget.get_filter_cost(allowed_filter, values), f"filter '{allowed_filter.name}'")
+
+    def _apply_filter(self, allowed_filter, values, operator=None) -> None:
+        """Mutate the statement by applying a filter"""
+        self._charge_filter(allowed_filter, values)
+        values = allowed_filter.coerce(self.model, list(values), operator)
         filter_name = allowed_filter.internal_name or allowed_filter.name
-        self._query = allowed_filter.filter_class.filter(self._query, self.model, filter_name, values)
+        filter_class = allowed_filter.filter_class
+        extra = () if operator is None else (operator,)
+        if "." in filter_name and isinstance(filter_class, FIELD_FILTERS):
+            try:
+                resolve_path(self.model, filter_name)
+            except ValueError as error:
+                raise InvalidFilterException(f"Applied filter '{allowed_filter.name}' is not valid: {error}")
+
+            def apply(query, entity, field_name):
+                return filter_class.filter(query, entity, field_name, values, *extra)
+
+            self._apply(
+                lambda query: apply_path_filter(query, self.model, filter_name, apply), counted=True, field=filter_name
+            )
+            return
+        self._apply(
+            lambda query: filter_class.filter(query, self.model, filter_name, values, *extra),
+            counted=True,
+            field=filter_name,
+        )
 
     def _apply_sort(self, allowed_sort, descending) -> None:
-        """Mutate the query by applying a sort"""
+        """Mutate the statement by applying a sort"""
+        if self._budget is not None:
+            cost = self._budget.get_sort_cost(self.model, allowed_sort)
+            if not self._charge(cost, f"sort '{allowed_sort.name}'", degradable=True):
+                return
         sort_name = allowed_sort.internal_name or allowed_sort.name
-        self._query = allowed_sort.sort_class.sort(self._query, self.model, sort_name, descending)
+        if "." in sort_name and isinstance(allowed_sort.sort_class, FieldSort):
+            allowed_sort.sort_class.resolve(self.model, sort_name)
+        self._apply(lambda query: allowed_sort.sort_class.sort(query, self.model, sort_name, descending))
+        self._applied_sorts.append((allowed_sort, sort_name, descending))
+
+    def _apply_include(self, allowed_include) -> None:
+        """Mutate the statement by applying an include"""
+        if self._budget is not None:
+            cost = self._budget.get_include_cost(allowed_include)
+            if not self._charge(cost, f"include '{allowed_include.name}'", degradable=True):
+                return
+        include_name = allowed_include.internal_name or allowed_include.name
+        if isinstance(allowed_include.include_class, RelationshipInclude):
+            allowed_include.include_class.get_loader(self.model, include_name)
+        self._apply(lambda query: allowed_include.include_class.include(query, self.model, include_name))
+        self._applied_includes.append(include_name)
+
+    def _apply(self, operation, counted=False, field: str = None) -> None:
+        """Record an operation to apply on the statement, a count or a legacy query once it is built
+
+        Only the operations that are counted, which are the filters, are replayed on the count.
+        The field filtered by an operation is kept so a facet can leave out its own filter.
+        """
+        self._operations.append((operation, counted, field))
+        self._built_statement = None
+
+    @property
+    def _statement(self) -> Select:
+        """Get the select() statement executed by the builder, ordered by the tiebreaker after everything else"""
+        if self._tiebreaker:
+            return self.statement.order_by(*self._tiebreaker)
+        return self.statement
+
+    def _replay(self, query, counted_only=False, excluded_field: str = None):
+        """Apply the operations applied so far on another select() statement or query"""
+        for operation, counted, field in self._operations:
+            if (counted or not counted_only) and (excluded_field is None or field != excluded_field):
+                query = operation(query)
+        return query
+
+    def _get_base_statement(self, query) -> Select:
+        """Get the select() statement the builder starts from"""
+        if query is None:
+            return select(self.model)
+        if isinstance(query, Query):
+            return query.statement
+        return query
+
+    @property
+    def session(self) -> Session:
+        """Get the session the statement is executed on, which defaults to the session of `model.query`"""
+        if self._session is None:
+            self._session = self.model.query.session
+        return self._session
+
+    def _get_bind_arguments(self) -> Optional[dict]:
+        """Get the bind the statements are executed on, or None to use the bind of the session
+
+        With a router the statements go to an available replica, chosen once for the builder,
+        unless the session has pending changes or has flushed changes in its transaction,
+        which can only be read back from the primary.
+        An isolation level is set on the chosen bind, so the statements run on a connection of its own.
+        """
+        if self._bind_arguments is None:
+            bind = None
+            session = getattr(self.session, "sync_session", self.session)
+            if self._router is not None and not has_writes(session):
+                bind = self._router.get_bind()
+            if bind is not None:
+                # An AsyncSession executes its statements on the sync engine of an AsyncEngine
+                bind = getattr(bind, "sync_engine", bind)
+            if self._isolation_level is not None:
+                bind = bind if bind is not None else session.get_bind(mapper=inspect(self.model))
+                bind = bind.execution_options(isolation_level=self._isolation_level)
+            self._bind_arguments = {"bind": bind} if bind is not None else {}
+        return self._bind_arguments or None
+
+    def _get_bind(self):
+        """Get the replica or primary the statements of the builder are executed on"""
+        bind_arguments = self._get_bind_arguments() or {"mapper": inspect(self.model)}
+        return getattr(self.session, "sync_session", self.session).get_bind(**bind_arguments)
+
+    def all(self) -> list:
+        """Get the results of the statement, served from the result cache when the builder has one"""
+        if self._cache is None:
+            return self.session.scalars(self._statement, bind_arguments=self._get_bind_arguments()).unique().all()
+        key = self._get_cache_key("all", self._statement)
+        return self._cache.all(key, self.session, self._statement, self._get_bind_arguments())
+
+    def execute(self):
+        """Execute the statement, returning the Result of the session"""
+        return self.session.execute(self._statement, bind_arguments=self._get_bind_arguments())
+
+    def scalars(self):
+        """Execute the statement, returning the ScalarResult of the model instances"""
+        return self.session.scalars(self._statement, bind_arguments=self._get_bind_arguments())
+
+    def yield_per(self, count: int):
+        """Execute the statement, fetching the model instances in batches of the given count while iterating"""
+        return self.session.scalars(
+            self._statement.execution_options(yield_per=count), bind_arguments=self._get_bind_arguments()
+        )
+
+    def count(self, estimate_threshold: int = None) -> int:
+        """Count the results of the applied filters, leaving out any sorts, includes and fields
+
+        When an estimate threshold is given the row estimate of the database planner is used first,
+        and the exact count is only performed when the estimate is below the threshold.
+        """
+        if self._cache is not None:
+            key = self._get_cache_key(f"count:{estimate_threshold}", self._get_count_statement())
+            return self._cache.value(key, lambda: self._count(estimate_threshold))
+        return self._count(estimate_threshold)
+
+    def _count(self, estimate_threshold) -> int:
+        statement = self._get_count_statement()
+        if estimate_threshold is not None:
+            estimate = estimate_rows(self.session, statement, self.model, self._get_bind_arguments())
+            if estimate is not None and estimate >= estimate_threshold:
+                return estimate
+        return count_rows(self.session, statement, self.model, self._get_bind_arguments())
+
+    def stream(self, format: str = "ndjson", chunk_size: int = 1000, columns_only=False, filename: str = None) -> Response:
+        """Get a streaming response of the results as NDJSON, CSV or a JSON array
+
+        The results are fetched through a server-side cursor in chunks of the given size, so the memory used
+        does not depend on the number of results. With columns_only the rows are selected as plain columns,
+        without building model instances. Only the requested fields are written when fields were applied.
+        """
+        if format not in STREAM_FORMATS:
+            raise ValueError(f"Unknown stream format '{format}', expected one of {sorted(STREAM_FORMATS)}")
+        mimetype, write = STREAM_FORMATS[format]
+        keys = get_stream_keys(self.model, self._applied_fields)
+        if columns_only:
+            statement = self._statement.with_only_columns(*[getattr(self.model, key) for key in keys])
+            result = self.session.execute(
+                statement.execution_options(yield_per=chunk_size), bind_arguments=self._get_bind_arguments()
+            )
+        else:
+            result = self.session.scalars(
+                self._statement.execution_options(yield_per=chunk_size), bind_arguments=self._get_bind_arguments()
+            )
+
+        def partitions():
+            for items in result.partitions():
+                if columns_only:
+                    yield items
+                else:
+                    yield [tuple(getattr(item, key) for key in keys) for item in items]
+
+        response = Response(stream_with_context(write(keys, partitions())), mimetype=mimetype)
+        if filename is not None:
+            response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    def facets(self) -> dict:
+        """Count the results of the applied filters per value of every facet applied on the request
+
+        The filter on the field of a facet is left out of its own counts, so every value can be drilled down into.
+        The counts of all facets are read in one round-trip, and served from the result cache when the builder has one.
+        """
+        statement = self._get_facet_statement()
+        if statement is None:
+            return {}
+        names = [allowed_facet.name for allowed_facet in self._applied_facets]
+
+        def load():
+            result = self.session.execute(statement, bind_arguments=self._get_bind_arguments())
+            return get_facet_counts(names, result.all())
+
+        if self._cache is None:
+            return load()
+        return self._cache.value(self._get_cache_key("facets", statement), load)
+
+    def _get_facet_statement(self):
+        """Get the statement counting every applied facet, or None when no facet is applied"""
+        if not self._applied_facets:
+            return None
+        facets = []
+        for allowed_facet in self._applied_facets:
+            facet_name = allowed_facet.internal_name or allowed_facet.name
+            statement = self._replay(self._base_statement, counted_only=True, excluded_field=facet_name)
+            relationships, field_name = resolve_path(self.model, facet_name)
+            statement, entity = join_path(statement, self.model, relationships)
+            facets.append((allowed_facet.name, statement, getattr(entity, field_name)))
+        statement = facet_statement(facets, self.model)
+        return statement.execution_options(**self._base_statement.get_execution_options())
+
+    def _get_count_statement(self) -> Select:
+        """Get the statement with only the filters applied, built once a count is asked for"""
+        return self._replay(self._base_statement, counted_only=True)
+
+    def _get_cache_key(self, kind: str, statement) -> str:
+        """Get the key of the results of a statement in the result cache"""
+        tables = get_tables(self.model, self._applied_includes, statement)
+        return self._cache.get_key(tables, statement, self._cache_namespace, kind)
+
+    def paginate_cursor(self, size: int = None, max_size: int = None) -> CursorPage:
+        """Get a page of results by seeking past the cursor applied on the request
+
+        The page is ordered by the applied field sorts followed by the primary key,
+        so the position of the cursor is found through the index instead of an offset.
+        Pages are always read from the database, also when the builder has a cache.
+        """
+        columns, page_size, cursor, reverse = self._get_page_arguments(size, max_size)
+        statement = self._get_page_statement(columns, page_size, cursor, reverse)
+        items = self.session.scalars(statement, bind_arguments=self._get_bind_arguments()).unique().all()
+        return self._get_page(columns, items, page_size, cursor, reverse)
+
+    def _get_page_arguments(self, size, max_size):
+        """Get the keyset columns, the page size, the cursor and its direction applied on the request"""
+        columns = self._get_keyset_columns()
+        page_size = self._get_page_size(size or self.page_size, max_size or self.max_page_size)
+        after = self._parsed_request.page.get("after")
+        before = self._parsed_request.page.get("before")
+        if after and before:
+            raise InvalidPageException("Only one of 'page[after]' and 'page[before]' can be applied")
+        return columns, page_size, after or before, bool(before)
+
+    def _get_page_statement(self, columns, page_size, cursor, reverse) -> Select:
+        """Get the statement seeking past the cursor, fetching one result more than the page size"""
+        statement = self.statement.order_by(None)
+        if self._applied_fields:
+            statement = statement.options(*[undefer(column.attribute) for column in columns if not column.path])
+        if cursor:
+            values = decode_cursor(cursor, columns)
+            statement = statement.where(keyset_predicate(columns, values, reverse))
+        return statement.order_by(*[column.order_by(reverse) for column in columns]).limit(page_size + 1)
+
+    def _get_page(self, columns, items, page_size, cursor, reverse) -> CursorPage:
+        """Get the page out of the results fetched past the cursor"""
+        has_more = len(items) > page_size
+        items = items[:page_size]
+        if reverse:
+            items.reverse()
+        if not items:
+            return CursorPage(items)
+
+        has_next = has_more if not reverse else True
+        has_prev = has_more if reverse else bool(cursor)
+        return CursorPage(
+            items,
+            next_cursor=self._get_cursor(columns, items[-1]) if has_next else None,
+            prev_cursor=self._get_cursor(columns, items[0]) if has_prev else None,
+        )
+
+    def _get_keyset_columns(self) -> List[KeysetColumn]:
+        """Get the columns used to seek through the results, ending with the primary key"""
+        columns = []
+        dialect_name = self._get_bind().dialect.name if self._applied_sorts else None
+        for allowed_sort, sort_name, descending in self._applied_sorts:
+            if not isinstance(allowed_sort.sort_class, FieldSort):
+                raise InvalidSortException(f"Applied sort '{allowed_sort.name}' cannot be used with cursor pagination")
+            path = ()
+            attribute = getattr(self.model, sort_name, None)
+            if "." in sort_name:
+                relationships, field_name = resolve_path(self.model, sort_name)
+                _, entity = join_path(self.statement, self.model, relationships)
+                path = tuple(relationship.key for relationship in relationships)
+                attribute = getattr(entity, field_name)
+            # Rows missing the related row of an outer joined path have NULL values as well
+            default_nulls = get_default_nulls(dialect_name, descending) if path or is_nullable(attribute) else None
+            columns.append(KeysetColumn(attribute, descending, path, allowed_sort.sort_class.nulls, default_nulls))
+
+        mapper = inspect(self.model)
+        sorted_keys = {column.attribute.key for column in columns if not column.path}
+        for primary_key in mapper.primary_key:
+            key = mapper.get_property_by_column(primary_key).key
+            if key not in sorted_keys:
+                columns.append(KeysetColumn(getattr(self.model, key)))
+        return columns
+
+    def _get_page_size(self, size, max_size) -> int:
+        """Get the page size applied on the request"""
+        raw_size = self._parsed_request.page.get("size")
+        if raw_size is None:
+            return size
+        try:
+            page_size = int(raw_size)
+        except ValueError:
+            raise InvalidPageException(f"Applied page size '{raw_size}' is not a number")
+        if page_size < 1 or page_size > max_size:
+            raise InvalidPageException(f"Applied page size '{raw_size}' must be between 1 and {max_size}")
+        return page_size
+
+    def _get_cursor(self, columns, item) -> str:
+        """Get the cursor pointing at a result"""
+        return encode_cursor([column.value_of(item) for column in columns])
+
+    @property
+    def statement(self) -> Select:
+        """Get the select() statement back from the QueryBuilder, built when it is first used
+
+        The primary key tiebreaker is not part of it, so the ordering added on it comes first.
+        """
+        if self._built_statement is None:
+            self._built_statement = self._replay(self._base_statement)
+        return self._built_statement
 
     @property
     def query(self) -> Query:
-        """Get the query object back from the QueryBuilder"""
-        return self._query
-
-    def _get_qualified_filter_name(self, value):
-        """Get the filter name as it was applied on the request"""
-        return f"filter[{value}]"
-
-    def _get_filter_values(self, filter_name) -> List[str]:
-        """Get a list of values that were applied on the request"""
-        name = self._get_qualified_filter_name(filter_name)
-        value = request.args.get(name)
-        return value.split(",")
+        """Get a legacy query object back from the QueryBuilder
+
+        The query is built by applying everything applied on the statement again,
+        starting from the query the builder was given, or `model.query`.
+        A builder started from a select() statement has no query to start from.
+        A legacy query is executed on the bind of its session, so it cannot be given an isolation level.
+        """
+        if self._from_select:
+            raise TypeError("A builder started from a select() statement has no legacy query, use `statement` instead")
+        if self._isolation_level is not None:
+            raise TypeError("An isolation level cannot be set on a legacy query, use `all()` or `statement` instead")
+        if self._base_query is not None:
+            query = self._base_query
+        elif self._session is not None:
+            query = self._session.query(self.model)
+        else:
+            query = self.model.query
+        if self._execution_options:
+            query = query.execution_options(**self._execution_options)
+        if self._statement_cache_stats is not None:
+            query = track_statement_cache(query, self._statement_cache_stats)
+        if self._diagnostics is not None:
+            query = diagnose_statement(query, self._diagnostics)
+        if self._budget is not None and self._budget.statement_timeout is not None:
+            query = limit_statement(query, self._budget.statement_timeout)
+        return self._replay(query)
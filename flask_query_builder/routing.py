@@ -0,0 +1,102 @@
+import itertools
+import time
+from threading import Lock
+from typing import Optional
+
+from sqlalchemy import event, exc, text
+from sqlalchemy.orm import Session
+
+FLUSHED = "query_builder_flushed"
+
+LAG_QUERIES = {
+    "postgresql": "SELECT EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())",
+}
+
+_listening = False
+_listening_lock = Lock()
+
+
+def has_writes(session) -> bool:
+    """Check if a session has changes that are only visible on the primary, pending or flushed but not committed
+
+    The flushed changes are only tracked once the first router is created or the first batch is executed.
+    """
+    return bool(session.new or session.dirty or session.deleted or session.info.get(FLUSHED))
+
+
+def _after_flush(session, flush_context) -> None:
+    session.info[FLUSHED] = True
+
+
+def _after_transaction_end(session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(FLUSHED, None)
+
+
+def track_writes() -> None:
+    """Start tracking the flushed changes of sessions, only once they are needed to route statements"""
+    global _listening
+    with _listening_lock:
+        if not _listening:
+            event.listen(Session, "after_flush", _after_flush)
+            event.listen(Session, "after_transaction_end", _after_transaction_end)
+            _listening = True
+
+
+def get_replica_lag(engine) -> Optional[float]:
+    """Get the seconds a replica is behind the primary, or None when the database does not report a lag
+
+    Connecting to the replica is part of the check, so an unreachable replica raises.
+    The replica of an async builder is checked through the sync engine of its AsyncEngine.
+    """
+    engine = getattr(engine, "sync_engine", engine)
+    query = LAG_QUERIES.get(engine.dialect.name, "SELECT NULL")
+    with engine.connect() as connection:
+        lag = connection.execute(text(query)).scalar()
+    return float(lag) if lag is not None else None
+
+
+class ReplicaRouter:
+    """Routes the read-only statements of builders to replica engines, taking turns between them
+
+    A replica that cannot be reached, or that is behind the primary by more than `max_lag` seconds,
+    is skipped until it is checked again after `check_interval` seconds. When no replica is available
+    the statements are executed on the primary, which is the bind of the session.
+    """
+
+    def __init__(self, replicas, max_lag: float = None, check_interval: float = 5.0, lag_check=get_replica_lag):
+        self.replicas = list(replicas)
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lag_check = lag_check
+        self._checked = {}
+        self._turns = itertools.count()
+        self._lock = Lock()
+        track_writes()
+
+    def get_bind(self):
+        """Get the next available replica, or None when the primary should be used"""
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[next(self._turns) % len(self.replicas)]
+            if self.is_available(replica):
+                return replica
+        return None
+
+    def is_available(self, engine) -> bool:
+        """Check if a replica can be reached and is not lagging behind, reusing the last check within the interval"""
+        now = time.monotonic()
+        with self._lock:
+            checked = self._checked.get(engine)
+        if checked is not None and now - checked[0] < self.check_interval:
+            return checked[1]
+        available = self._check(engine)
+        with self._lock:
+            self._checked[engine] = (now, available)
+        return available
+
+    def _check(self, engine) -> bool:
+        try:
+            lag = self.lag_check(engine)
+        except exc.SQLAlchemyError:
+            return False
+        return self.max_lag is None or lag is None or lag <= self.max_lag
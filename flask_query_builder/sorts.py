@@ -1,6 +1,9 @@
 from abc import abstractmethod
 
-from sqlalchemy import desc
+from flask_query_builder.exceptions import InvalidSortException
+from flask_query_builder.joins import is_to_many, join_path, resolve_path
+
+NULLS = (None, "first", "last")
 
 
 class Sort:
@@ -10,9 +13,61 @@ class Sort:
         pass
 
 
+def order_by(expression, descending=False, nulls: str = None):
+    """Get the ORDER BY clause of an expression, placing NULL values first or last when asked for"""
+    clause = expression.desc() if descending else expression.asc()
+    if nulls == "first":
+        return clause.nulls_first()
+    if nulls == "last":
+        return clause.nulls_last()
+    return clause
+
+
+def _check_nulls(nulls: str) -> str:
+    if nulls not in NULLS:
+        raise ValueError(f"Nulls should be one of {NULLS}, not '{nulls}'")
+    return nulls
+
+
 class FieldSort(Sort):
-    """Perform sorting on a model field"""
+    """Perform sorting on a model field, or on the field of a to-one relationship with a dotted name
+
+    With nulls set to "first" or "last" the NULL values are placed first or last whatever the direction.
+    """
+    def __init__(self, nulls: str = None):
+        self.nulls = _check_nulls(nulls)
+
+    def sort(self, query, model, sort_name, descending):
+        if "." in sort_name:
+            relationships, field_name = self.resolve(model, sort_name)
+            query, model = join_path(query, model, relationships)
+            sort_name = field_name
+        return query.order_by(order_by(getattr(model, sort_name), descending, self.nulls))
+
+    def resolve(self, model, sort_name):
+        """Get the relationships and the field of a dotted sort name, which can only go through to-one relationships"""
+        try:
+            relationships, field_name = resolve_path(model, sort_name)
+        except ValueError as error:
+            raise InvalidSortException(f"Sort '{sort_name}' is not valid: {error}")
+        if is_to_many(relationships):
+            raise InvalidSortException(f"Sort '{sort_name}' goes through a to-many relationship")
+        return relationships, field_name
+
+
+class ExpressionSort(Sort):
+    """Perform sorting on an SQL expression, like `func.lower(User.last_name)`
+
+    The expression can also be a function of the model returning the expression. Sorting on the same expression
+    an index is created on, like `lower(last_name)`, lets the database read the rows in order from the index.
+    """
+    def __init__(self, expression, nulls: str = None):
+        self.expression = expression
+        self.nulls = _check_nulls(nulls)
+
+    def get_expression(self, model):
+        """Get the expression sorted on for a model"""
+        return self.expression(model) if callable(self.expression) else self.expression
+
     def sort(self, query, model, sort_name, descending):
-        if descending:
-            return query.order_by(desc(sort_name))
-        return query.order_by(sort_name)
+        return query.order_by(order_by(self.get_expression(model), descending, self.nulls))
@@ -0,0 +1,136 @@
+from types import MappingProxyType
+from weakref import WeakSet
+
+from sqlalchemy import inspect
+
+from flask_query_builder.budget import CostBudget
+from flask_query_builder.caching import ResultCache
+from flask_query_builder.exceptions import (
+    InvalidFilterException,
+    InvalidSortException,
+    InvalidFieldException,
+    InvalidFacetException,
+)
+from flask_query_builder.filters import FIELD_FILTERS
+from flask_query_builder.joins import resolve_path
+from flask_query_builder.parsing import parse_sorts
+from flask_query_builder.querying import (
+    BaseModel,
+    QueryBuilder,
+    get_filter_map,
+    get_sort_map,
+    get_include_map,
+    get_facet_map,
+)
+from flask_query_builder.routing import ReplicaRouter
+from flask_query_builder.sorts import FieldSort
+from flask_query_builder.statements import StatementCacheStats
+
+# Every specification that has been declared, read by the index advisor
+registry = WeakSet()
+
+
+class QuerySpec:
+    """A reusable specification of the filters, sorts, includes and fields allowed on an endpoint
+
+    The specification is declared once, usually at module level, and validated against the model
+    when it is created. Applying it on a request does not rebuild any of the allowed filters or sorts.
+    """
+
+    def __init__(
+            self,
+            model: BaseModel,
+            filters=(),
+            sorts=(),
+            includes=(),
+            fields=(),
+            resource_type: str = None,
+            raise_exceptions=True,
+            page_size: int = QueryBuilder.page_size,
+            max_page_size: int = QueryBuilder.max_page_size,
+            track_statement_cache=False,
+            cache: ResultCache = None,
+            cache_namespace: str = None,
+            filter_groups=False,
+            facets=(),
+            router: ReplicaRouter = None,
+            execution_options: dict = None,
+            budget: CostBudget = None,
+            default_sorts=None,
+            sort_tiebreaker=True,
+    ):
+        self.model = model
+        self.filters = MappingProxyType(get_filter_map(filters))
+        self.sorts = MappingProxyType(get_sort_map(sorts))
+        self.includes = MappingProxyType(get_include_map(includes))
+        self.fields = frozenset(fields)
+        self.resource_type = resource_type
+        self.raise_exceptions = raise_exceptions
+        self.page_size = page_size
+        self.max_page_size = max_page_size
+        self.statement_cache_stats = StatementCacheStats() if track_statement_cache else None
+        self.cache = cache
+        self.cache_namespace = cache_namespace
+        self.filter_groups = filter_groups
+        self.facets = MappingProxyType(get_facet_map(facets))
+        self.router = router
+        self.execution_options = MappingProxyType(dict(execution_options or {}))
+        self.budget = budget
+        self.default_sorts = default_sorts
+        self.sort_tiebreaker = sort_tiebreaker
+        self._validate()
+        registry.add(self)
+
+    def builder(self, query=None, session=None) -> QueryBuilder:
+        """Start a query with everything allowed by the specification applied on the request"""
+        return QueryBuilder.from_spec(self, query, session)
+
+    def async_builder(self, session, statement=None):
+        """Start a select() statement executed on an AsyncSession with everything allowed by the specification"""
+        from flask_query_builder.async_querying import AsyncQueryBuilder
+
+        return AsyncQueryBuilder.from_spec(self, session, statement)
+
+    def _validate(self) -> None:
+        """Make sure the fields used by the filters and sorts exist on the model, resolving the filter value types"""
+        fields = inspect(self.model).all_orm_descriptors
+        for allowed_filter in self.filters.values():
+            if not isinstance(allowed_filter.filter_class, FIELD_FILTERS):
+                continue
+            filter_name = allowed_filter.internal_name or allowed_filter.name
+            if not self._has_field(filter_name, fields):
+                raise InvalidFilterException(
+                    f"Allowed filter '{allowed_filter.name}' does not match a field on '{self.model.__name__}'"
+                )
+            allowed_filter.get_coercer(self.model)
+        # Only the columns can be loaded with load_only, not the relationships
+        columns = inspect(self.model).column_attrs
+        for field in self.fields:
+            if field not in columns:
+                raise InvalidFieldException(f"Allowed field '{field}' does not match a field on '{self.model.__name__}'")
+        for allowed_sort in self.sorts.values():
+            if not isinstance(allowed_sort.sort_class, FieldSort):
+                continue
+            sort_name = allowed_sort.internal_name or allowed_sort.name
+            if not self._has_field(sort_name, fields):
+                raise InvalidSortException(
+                    f"Allowed sort '{allowed_sort.name}' does not match a field on '{self.model.__name__}'"
+                )
+        for applied_sort in parse_sorts(self.default_sorts or ()):
+            if applied_sort.name not in self.sorts:
+                raise InvalidSortException(f"Default sort '{applied_sort.name}' is not an allowed sort")
+        for allowed_facet in self.facets.values():
+            if not self._has_field(allowed_facet.internal_name or allowed_facet.name, fields):
+                raise InvalidFacetException(
+                    f"Allowed facet '{allowed_facet.name}' does not match a field on '{self.model.__name__}'"
+                )
+
+    def _has_field(self, name: str, fields) -> bool:
+        """Check if a field, or a dotted path through relationships to a field, exists on the model"""
+        if "." not in name:
+            return name in fields
+        try:
+            resolve_path(self.model, name)
+        except ValueError:
+            return False
+        return True
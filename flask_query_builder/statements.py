@@ -0,0 +1,66 @@
+from threading import Lock
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, default
+
+STATS_OPTION = "query_builder_statement_cache_stats"
+
+_listening = False
+_listening_lock = Lock()
+
+
+class StatementCacheStats:
+    """Counts how often the statements built by a QueryBuilder were found in the SQLAlchemy compiled cache"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+        _listen()
+
+    @property
+    def total(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_ratio(self) -> float:
+        """Get the share of executed statements that did not need to be compiled"""
+        if not self.total:
+            return 0.0
+        return self.hits / self.total
+
+    def record(self, cache_hit) -> None:
+        """Record the cache status of an executed statement"""
+        with self._lock:
+            if cache_hit == default.CACHE_HIT:
+                self.hits += 1
+            elif cache_hit == default.CACHE_MISS:
+                self.misses += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def __repr__(self):
+        return f"<StatementCacheStats hits={self.hits} misses={self.misses}>"
+
+
+def track_statement_cache(query, stats: StatementCacheStats):
+    """Record the compiled cache status of the query on the stats whenever it is executed"""
+    return query.execution_options(**{STATS_OPTION: stats})
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = context.execution_options.get(STATS_OPTION) if context is not None else None
+    if stats is not None:
+        stats.record(context.cache_hit)
+
+
+def _listen() -> None:
+    """Start listening on executed statements, only once the first stats have been created"""
+    global _listening
+    with _listening_lock:
+        if not _listening:
+            event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+            _listening = True
@@ -0,0 +1,75 @@
+import csv
+import io
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Iterable, List
+from uuid import UUID
+
+from sqlalchemy import inspect
+
+
+def get_stream_keys(model, applied_fields=()) -> List[str]:
+    """Get the names of the fields written for every result, which are the primary key and the applied fields
+
+    Without applied fields every column of the model is written.
+    """
+    mapper = inspect(model)
+    if not applied_fields:
+        return [attribute.key for attribute in mapper.column_attrs]
+    keys = [mapper.get_property_by_column(column).key for column in mapper.primary_key]
+    return keys + [key for key in applied_fields if key not in keys]
+
+
+def write_ndjson(keys, partitions: Iterable[List[tuple]]):
+    """Write every row as a JSON object on its own line"""
+    for rows in partitions:
+        yield "".join(_dumps(dict(zip(keys, row))) + "\n" for row in rows)
+
+
+def write_json(keys, partitions: Iterable[List[tuple]]):
+    """Write the rows as the JSON objects of a single array"""
+    yield "["
+    separator = ""
+    for rows in partitions:
+        if rows:
+            yield separator + ",".join(_dumps(dict(zip(keys, row))) for row in rows)
+            separator = ","
+    yield "]"
+
+
+def write_csv(keys, partitions: Iterable[List[tuple]]):
+    """Write the rows as CSV, starting with a header of the keys"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(keys)
+    for rows in partitions:
+        writer.writerows(rows)
+        yield _drain(buffer)
+    yield _drain(buffer)
+
+
+def _drain(buffer: io.StringIO) -> str:
+    value = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return value
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, default=_default, separators=(",", ":"))
+
+
+def _default(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+STREAM_FORMATS = {
+    "ndjson": ("application/x-ndjson", write_ndjson),
+    "json": ("application/json", write_json),
+    "csv": ("text/csv", write_csv),
+}
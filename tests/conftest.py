@@ -1,8 +1,9 @@
+from datetime import datetime
 from types import SimpleNamespace
 
 import flask
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import declarative_base, scoped_session, sessionmaker, relationship
 import sqlalchemy as sqa
 
@@ -67,3 +68,29 @@ def models(base_model, engine):
         Address=Address
     )
     base_model.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def sample_users(db_session, models):
+    birth_date = datetime.strptime("1970-01-01", "%Y-%m-%d")
+    address = models.Address(road="X road")
+    user1 = models.User(first_name='Frank', last_name='Elliot', username='frank', birth_date=birth_date, address=address)
+    user2 = models.User(first_name='Charlie', last_name='Joe', username='charlie', birth_date=birth_date)
+    user3 = models.User(first_name='Ann', last_name='Smith', username='ann', birth_date=birth_date)
+
+    db_session.add_all([user1, user2, user3])
+    db_session.commit()
+    return [user1, user2, user3]
+
+
+@pytest.fixture
+def statements(engine):
+    executed = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("SELECT"):
+            executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield executed
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
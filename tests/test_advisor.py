@@ -0,0 +1,133 @@
+import pytest
+from sqlalchemy import func, text
+from sqlalchemy.dialects import postgresql
+
+from flask_query_builder.advisor import recommend_indexes, get_spec_indexes
+from flask_query_builder.cli import query_builder
+from flask_query_builder.querying import AllowedFilter, AllowedSort
+from flask_query_builder.sorts import Sort
+from flask_query_builder.specs import QuerySpec, registry
+
+
+@pytest.fixture
+def specs():
+    registry.clear()
+    yield registry
+    registry.clear()
+
+
+def test_recommends_indexes_for_filters_and_sorts(engine, models, specs):
+    spec = QuerySpec(
+        models.User,
+        filters=["last_name", AllowedFilter.partial("name", "first_name")],
+        sorts=["birth_date"],
+    )
+
+    recommendations = recommend_indexes([spec], engine)
+
+    assert [recommendation.elements for recommendation in recommendations] == [
+        ("birth_date",),
+        ("last_name", "birth_date"),
+        ("lower(first_name)",),
+    ]
+
+
+def test_existing_indexes_are_left_out(engine, models, specs):
+    with engine.begin() as connection:
+        connection.execute(text("CREATE INDEX ix_users_last_name_first_name ON users (last_name, first_name)"))
+        connection.execute(text("CREATE INDEX ix_users_lower_first_name ON users (lower(first_name))"))
+    spec = QuerySpec(
+        models.User,
+        filters=["last_name", "username", "id", AllowedFilter.starts_with("name", "first_name")],
+        sorts=[AllowedSort.field("name", "first_name"), "id"],
+    )
+
+    recommendations = recommend_indexes([spec], engine)
+
+    # username is unique, id is the primary key and the composite on (last_name, first_name) exists
+    assert [recommendation.elements for recommendation in recommendations] == [
+        ("first_name",),
+        ("last_name", "id"),
+    ]
+
+
+def test_custom_filters_and_sorts_are_skipped(engine, models, specs):
+    class NameSort(Sort):
+        def sort(self, query, model, sort_name, descending):
+            return query
+
+    spec = QuerySpec(models.User, sorts=[AllowedSort.custom("name", NameSort())])
+
+    assert recommend_indexes([spec], engine) == []
+
+
+def test_postgresql_indexes(models, specs):
+    spec = QuerySpec(
+        models.User,
+        filters=[
+            AllowedFilter.similar("name", "first_name"),
+            AllowedFilter.partial("surname", "last_name"),
+            AllowedFilter.starts_with("username"),
+            AllowedFilter.full_text("bio", "last_name", config="english"),
+        ],
+    )
+
+    statements = [
+        recommendation.to_sql(models.User.__table__, postgresql.dialect())
+        for recommendation in get_spec_indexes(spec, "postgresql")
+    ]
+
+    assert statements == [
+        "CREATE INDEX ix_users_first_name_gin_trgm_ops ON users USING gin (first_name gin_trgm_ops)",
+        "CREATE INDEX ix_users_last_name_gin_trgm_ops ON users USING gin (last_name gin_trgm_ops)",
+        "CREATE INDEX ix_users_lower_username_text_pattern_ops ON users (lower(username) text_pattern_ops)",
+        "CREATE INDEX ix_users_to_tsvector_english_last_name ON users USING gin (to_tsvector('english', last_name))",
+    ]
+
+
+def test_alembic_operations(models, specs):
+    spec = QuerySpec(models.User, filters=[AllowedFilter.partial("name", "first_name")], sorts=["last_name"])
+
+    assert [recommendation.to_alembic() for recommendation in get_spec_indexes(spec)] == [
+        "op.create_index('ix_users_lower_first_name', 'users', [sa.text('lower(first_name)')])",
+        "op.create_index('ix_users_last_name', 'users', ['last_name'])",
+    ]
+
+
+def test_advise_indexes_command(app, models, specs):
+    spec = QuerySpec(models.User, filters=["last_name"])
+    runner = app.test_cli_runner()
+
+    result = runner.invoke(query_builder, ["advise-indexes", "--check"])
+
+    assert result.exit_code == 1
+    assert result.output == (
+        "-- users: missing index for filter 'last_name'\n"
+        "CREATE INDEX ix_users_last_name ON users (last_name);\n"
+    )
+
+    result = runner.invoke(query_builder, ["advise-indexes", "--alembic"])
+
+    assert result.exit_code == 0
+    assert "op.create_index('ix_users_last_name', 'users', ['last_name'])" in result.output
+    assert spec in specs
+
+
+def test_advise_indexes_command_without_missing_indexes(app, models, specs):
+    QuerySpec(models.User, filters=["username"])
+
+    result = app.test_cli_runner().invoke(query_builder, ["advise-indexes", "--check"])
+
+    assert result.exit_code == 0
+    assert result.output == "No missing indexes found.\n"
+
+
+def test_expression_sort_index(engine, models, specs):
+    spec = QuerySpec(models.User, sorts=[
+        AllowedSort.expression("last_name", lambda model: func.lower(model.last_name)),
+        AllowedSort.expression("road", func.lower(models.Address.road)),
+    ])
+
+    assert [recommendation.elements for recommendation in recommend_indexes([spec], engine)] == [
+        ("lower(last_name)",),
+    ]
@@ -0,0 +1,133 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from flask_query_builder.async_querying import AsyncQueryBuilder
+from flask_query_builder.exceptions import InvalidFilterException
+from flask_query_builder.querying import AllowedFilter, AllowedSort
+from flask_query_builder.routing import ReplicaRouter
+from flask_query_builder.specs import QuerySpec
+
+
+@pytest.fixture
+def async_engine():
+    return create_async_engine("sqlite+aiosqlite:////tmp/test.db")
+
+
+def run(async_engine, build):
+    """Run a coroutine using a fresh AsyncSession, disposing the engine afterwards"""
+    async def main():
+        async with AsyncSession(async_engine) as session:
+            result = await build(session)
+        await async_engine.dispose()
+        return result
+
+    return asyncio.run(main())
+
+
+def test_async_filters_and_sorts(sample_users, request_context, models, async_engine):
+    async def build(session):
+        return await AsyncQueryBuilder(models.User, session) \
+            .allowed_filters([AllowedFilter.partial("last_name")]) \
+            .allowed_sorts([AllowedSort.field("name", "first_name")]) \
+            .all()
+
+    with request_context("/?filter[last_name]=i&sort=-name"):
+        users = run(async_engine, build)
+
+    assert [user.username for user in users] == ["frank", "ann"]
+
+
+def test_async_count_leaves_out_sorts(sample_users, request_context, models, async_engine):
+    async def build(session):
+        return await AsyncQueryBuilder(models.User, session) \
+            .allowed_filters(["first_name"]) \
+            .allowed_sorts(["first_name"]) \
+            .count()
+
+    with request_context("/?filter[first_name]=Ann,Frank&sort=first_name"):
+        assert run(async_engine, build) == 2
+
+
+def test_async_paginate_cursor(sample_users, request_context, models, async_engine):
+    async def build(session):
+        return await AsyncQueryBuilder(models.User, session).allowed_sorts(["first_name"]).paginate_cursor()
+
+    with request_context("/?sort=first_name&page[size]=2"):
+        page = run(async_engine, build)
+
+    assert [user.username for user in page.items] == ["ann", "charlie"]
+
+    with request_context(f"/?sort=first_name&page[size]=2&page[after]={page.next_cursor}"):
+        page = run(async_engine, build)
+
+    assert [user.username for user in page.items] == ["frank"]
+    assert page.next_cursor is None
+
+
+def test_async_include_loads_relationship(sample_users, request_context, models, async_engine):
+    async def build(session):
+        return await AsyncQueryBuilder(models.User, session).allowed_includes(["address"]).all()
+
+    with request_context("/?include=address"):
+        users = run(async_engine, build)
+
+    assert [user.address.road for user in users if user.username == "frank"] == ["X road"]
+
+
+def test_async_builder_from_spec(sample_users, request_context, models, async_engine):
+    spec = QuerySpec(models.User, filters=["username"], sorts=["first_name"])
+
+    async def build(session):
+        return await spec.async_builder(session).all()
+
+    with request_context("/?filter[username]=ann,charlie&sort=-first_name"):
+        users = run(async_engine, build)
+
+    assert [user.username for user in users] == ["charlie", "ann"]
+
+
+def test_async_builder_routed_to_replica(sample_users, request_context, models, async_engine):
+    replica = create_engine("sqlite:////tmp/test_replica.db")
+    models.User.metadata.create_all(bind=replica)
+    with Session(replica) as session:
+        session.add(models.User(first_name="Bob", last_name="Stone", username="bob"))
+        session.commit()
+    async_replica = create_async_engine("sqlite+aiosqlite:////tmp/test_replica.db")
+    spec = QuerySpec(models.User, sorts=["first_name"], router=ReplicaRouter([async_replica]))
+
+    async def build(session):
+        builder = spec.async_builder(session)
+        users = await builder.all()
+        count = await builder.count()
+        await async_replica.dispose()
+        return users, count
+
+    try:
+        with request_context("/?sort=first_name"):
+            users, count = run(async_engine, build)
+    finally:
+        models.User.metadata.drop_all(bind=replica)
+        replica.dispose()
+
+    assert [user.username for user in users] == ["bob"]
+    assert count == 1
+
+
+def test_async_invalid_filter_raises(request_context, models, async_engine):
+    with request_context("/?filter[password]=secret"):
+        with pytest.raises(InvalidFilterException):
+            AsyncQueryBuilder(models.User, None).allowed_filters(["first_name"])
+
+
+def test_async_legacy_query_and_stream_rejected(request_context, models):
+    with request_context("/"):
+        builder = AsyncQueryBuilder(models.User, None)
+
+        with pytest.raises(TypeError):
+            builder.query
+        with pytest.raises(TypeError):
+            builder.stream()
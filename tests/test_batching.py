@@ -0,0 +1,131 @@
+import asyncio
+import threading
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from flask_query_builder.async_querying import AsyncQueryBuilder
+from flask_query_builder.batching import execute_batch, gather_batch
+from flask_query_builder.querying import QueryBuilder, AllowedFilter
+from flask_query_builder.routing import ReplicaRouter
+
+
+def test_batch_results_returned_in_order(sample_users, request_context, models):
+    with request_context("/?filter[first_name]=Ann,Frank&sort=-first_name"):
+        users = QueryBuilder(models.User).allowed_filters(["first_name"]).allowed_sorts(["first_name"])
+        addresses = QueryBuilder(models.Address)
+        results = execute_batch([users, addresses], counts=True)
+
+    assert [user.username for user in results[0].items] == ["frank", "ann"]
+    assert results[0].count == 2
+    assert [address.road for address in results[1].items] == ["X road"]
+    assert results[1].count == 1
+    assert all(result.duration >= 0 for result in results)
+
+
+def test_batch_executed_on_separate_connections(sample_users, request_context, models, engine):
+    threads = set()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        threads.add(threading.get_ident())
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        with request_context("/"):
+            results = execute_batch([QueryBuilder(models.User), QueryBuilder(models.Address)])
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    assert threading.get_ident() not in threads
+    assert [len(result.items) for result in results] == [3, 1]
+    assert results[0].count is None
+
+
+def test_batch_results_merged_into_builder_session(sample_users, request_context, models, engine):
+    with request_context("/?filter[username]=frank"):
+        builder = QueryBuilder(models.User).allowed_filters([AllowedFilter.exact("username")])
+        [result] = execute_batch([builder], session_factory=sessionmaker(bind=engine))
+
+    user = result.items[0]
+    assert user in builder.session
+    assert user.address.road == "X road"
+
+
+def test_batch_keeps_pending_changes_of_builder_session(db_session, sample_users, request_context, models):
+    ann = sample_users[2]
+    ann.first_name = "EDITED"
+
+    with request_context("/?filter[username]=ann"):
+        builder = QueryBuilder(models.User).allowed_filters([AllowedFilter.exact("username")])
+        users, addresses = execute_batch([builder, QueryBuilder(models.Address)], counts=True)
+
+    assert users.items == [ann]
+    assert users.count == 1
+    assert ann.first_name == "EDITED"
+    assert ann in db_session.dirty
+    assert [address.road for address in addresses.items] == ["X road"]
+
+
+def test_batch_keeps_flushed_changes_of_builder_session(db_session, sample_users, request_context, models):
+    ann = sample_users[2]
+    ann.first_name = "EDITED"
+    db_session.flush()
+
+    with request_context("/?filter[first_name]=EDITED"):
+        [users] = execute_batch([QueryBuilder(models.User).allowed_filters(["first_name"])])
+
+    assert users.items == [ann]
+    assert ann.first_name == "EDITED"
+    db_session.rollback()
+
+
+def test_empty_batch(request_context):
+    assert execute_batch([]) == []
+
+
+def test_gather_batch(sample_users, request_context, models):
+    async_engine = create_async_engine("sqlite+aiosqlite:////tmp/test.db")
+    session_factory = sessionmaker(async_engine, class_=AsyncSession)
+
+    async def main():
+        async with session_factory() as session:
+            users = AsyncQueryBuilder(models.User, session).allowed_filters(["last_name"])
+            addresses = AsyncQueryBuilder(models.Address, session)
+            results = await gather_batch([users, addresses], counts=True, session_factory=session_factory)
+        await async_engine.dispose()
+        return results
+
+    with request_context("/?filter[last_name]=Joe"):
+        results = asyncio.run(main())
+
+    assert [user.username for user in results[0].items] == ["charlie"]
+    assert results[0].count == 1
+    assert results[1].count == 1
+
+
+def test_gather_batch_routed_to_replica(sample_users, request_context, models):
+    replica = create_engine("sqlite:////tmp/test_replica.db")
+    models.User.metadata.create_all(bind=replica)
+    with Session(replica) as session:
+        session.add(models.User(first_name="Bob", last_name="Stone", username="bob"))
+        session.commit()
+    async_engine = create_async_engine("sqlite+aiosqlite:////tmp/test.db")
+    router = ReplicaRouter([create_async_engine("sqlite+aiosqlite:////tmp/test_replica.db")])
+
+    async def main():
+        async with AsyncSession(async_engine) as session:
+            results = await gather_batch([AsyncQueryBuilder(models.User, session, router=router)], counts=True)
+        await async_engine.dispose()
+        await router.replicas[0].dispose()
+        return results
+
+    try:
+        with request_context("/"):
+            results = asyncio.run(main())
+    finally:
+        models.User.metadata.drop_all(bind=replica)
+        replica.dispose()
+
+    assert [user.username for user in results[0].items] == ["bob"]
+    assert results[0].count == 1
@@ -0,0 +1,118 @@
+import time
+
+import pytest
+from sqlalchemy import case, exc, select, text
+
+from flask_query_builder.async_querying import AsyncQueryBuilder
+from flask_query_builder.budget import CostBudget
+from flask_query_builder.exceptions import InvalidRequestException, QueryCostExceededException
+from flask_query_builder.querying import QueryBuilder, AllowedFilter
+from flask_query_builder.specs import QuerySpec
+
+SLOW_CONDITION = text(
+    "(WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 100000000) SELECT count(*) FROM c) > 0"
+)
+
+
+def test_cost_of_applied_filters_sorts_and_includes(request_context, models):
+    with request_context("/?filter[first_name]=Ann,Frank&filter[last_name]=o&sort=username,last_name&include=address"):
+        builder = QueryBuilder(models.User, budget=CostBudget()) \
+            .allowed_filters(["first_name", AllowedFilter.partial("last_name")]) \
+            .allowed_sorts(["username", "last_name"]) \
+            .allowed_includes(["address"])
+
+    # exact filter 1.02, wildcard filter 11.01, indexed sort 1, unindexed sort 10, include 5
+    assert builder.cost == pytest.approx(28.03)
+
+
+def test_exception_raised_when_budget_exceeded(request_context, models):
+    url = "/?filter[first_name]=a,b,c&filter[last_name]=o"
+    with pytest.raises(QueryCostExceededException):
+        with request_context(url):
+            QueryBuilder(models.User, budget=CostBudget(max_cost=20)).allowed_filters([
+                AllowedFilter.partial("first_name"),
+                AllowedFilter.partial("last_name"),
+            ])
+
+    assert issubclass(QueryCostExceededException, InvalidRequestException)
+
+
+def test_sorts_and_includes_degraded_over_budget(sample_users, request_context, models):
+    budget = CostBudget(max_cost=12, degrade=True)
+
+    with request_context("/?filter[first_name]=Ann,Frank&sort=-username,last_name&include=address"):
+        builder = QueryBuilder(models.User, budget=budget) \
+            .allowed_filters(["first_name"]) \
+            .allowed_sorts(["username", "last_name"]) \
+            .allowed_includes(["address"])
+        users = builder.all()
+
+    assert [user.username for user in users] == ["frank", "ann"]
+    assert builder.degraded == ["sort 'last_name'"]
+    assert builder.cost == pytest.approx(7.02)
+
+
+def test_filters_never_degraded(request_context, models):
+    with pytest.raises(QueryCostExceededException):
+        with request_context("/?filter[or][0][first_name]=a&filter[or][1][first_name]=b"):
+            QueryBuilder(models.User, budget=CostBudget(max_cost=1.5, degrade=True)) \
+                .allowed_filters(["first_name"], groups=True)
+
+
+def test_budget_read_from_app_config_and_spec(app, request_context, models):
+    app.config["QUERY_BUILDER_COST_BUDGET"] = CostBudget(max_cost=5)
+
+    with pytest.raises(QueryCostExceededException):
+        with request_context("/?sort=last_name"):
+            QueryBuilder(models.User).allowed_sorts(["last_name"])
+
+    spec = QuerySpec(models.User, sorts=["last_name"], budget=CostBudget(max_cost=50))
+    with request_context("/?sort=last_name"):
+        assert spec.builder().cost == 10
+
+
+def test_budget_applied_on_async_builder(request_context, models):
+    spec = QuerySpec(models.User, filters=["first_name"], budget=CostBudget(max_cost=0.5))
+
+    with pytest.raises(QueryCostExceededException):
+        with request_context("/?filter[first_name]=Ann"):
+            spec.async_builder(None)
+
+    with pytest.raises(QueryCostExceededException):
+        with request_context("/?filter[first_name]=Ann"):
+            AsyncQueryBuilder(models.User, None, budget=CostBudget(max_cost=0.5)).allowed_filters(["first_name"])
+
+
+def test_statement_timeout_interrupts_slow_statement(db_session, sample_users, request_context, models):
+    budget = CostBudget(statement_timeout=0.05)
+
+    with request_context("/"):
+        builder = QueryBuilder(models.User, select(models.User).where(SLOW_CONDITION), budget=budget)
+        with pytest.raises(exc.OperationalError, match="interrupted"):
+            builder.all()
+        db_session.rollback()
+
+        assert len(QueryBuilder(models.User, budget=budget).all()) == 3
+        assert len(QueryBuilder(models.User).all()) == 3
+
+
+def test_statement_timeout_limits_rows_fetched_after_statement(db_session, sample_users, request_context, models):
+    budget = CostBudget(statement_timeout=0.05)
+    statement = select(models.User).where(case((models.User.username != "ann", True), else_=SLOW_CONDITION))
+
+    with request_context("/"):
+        users = QueryBuilder(models.User, statement, budget=budget).yield_per(1)
+        assert next(users).username == "frank"
+        with pytest.raises(exc.OperationalError, match="interrupted"):
+            list(users)
+        db_session.rollback()
+
+
+def test_statement_timeout_lifted_for_next_statement(db_session, sample_users, request_context, models):
+    budget = CostBudget(statement_timeout=0.05)
+
+    with request_context("/"):
+        assert len(QueryBuilder(models.User, budget=budget).all()) == 3
+        time.sleep(0.1)
+        count = text("WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 100000) SELECT count(*) FROM c")
+        assert db_session.execute(count).scalar() == 100000
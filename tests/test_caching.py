@@ -0,0 +1,197 @@
+from flask_query_builder.caching import LRUCache, RedisCache, ResultCache
+from flask_query_builder.querying import QueryBuilder, AllowedFilter
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def incr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+
+class InMemorySerializer:
+    """The models of the tests are local classes which can not be pickled"""
+    objects = {}
+
+    def dumps(self, value):
+        key = str(id(value)).encode()
+        self.objects[key] = value
+        return key
+
+    def loads(self, key):
+        return self.objects[key]
+
+
+def get_usernames(request_context, models, cache, query_string):
+    with request_context(query_string):
+        users = QueryBuilder(models.User, cache=cache) \
+            .allowed_filters(["first_name", AllowedFilter.partial("last_name")]) \
+            .allowed_sorts(["first_name"]) \
+            .all()
+        return [user.username for user in users]
+
+
+def test_identical_requests_served_from_cache(sample_users, request_context, models, statements):
+    cache = ResultCache()
+
+    first = get_usernames(request_context, models, cache, "/?filter[first_name]=Ann,Frank&filter[last_name]=t&sort=first_name")
+    second = get_usernames(request_context, models, cache, "/?filter[last_name]=t&filter[first_name]=Frank,Ann,Ann&sort=first_name")
+
+    assert first == second == ["ann", "frank"]
+    assert len(statements) == 1
+
+
+def test_different_requests_not_shared(sample_users, request_context, models, statements):
+    cache = ResultCache()
+
+    assert get_usernames(request_context, models, cache, "/?sort=first_name") == ["ann", "charlie", "frank"]
+    assert get_usernames(request_context, models, cache, "/?sort=-first_name") == ["frank", "charlie", "ann"]
+    assert len(statements) == 2
+
+
+def test_order_of_between_values_not_normalized(sample_users, request_context, models, statements):
+    cache = ResultCache()
+
+    for query_string, expected in [("1965-01-01,1985-01-01", 3), ("1985-01-01,1965-01-01", 0)]:
+        with request_context(f"/?filter[birth_date][between]={query_string}"):
+            builder = QueryBuilder(models.User, cache=cache).allowed_filters([AllowedFilter.comparison("birth_date")])
+            assert len(builder.all()) == expected
+
+    assert len(statements) == 2
+
+
+def test_builders_with_different_queries_not_shared(sample_users, request_context, models, statements):
+    cache = ResultCache()
+
+    with request_context("/?sort=first_name"):
+        everyone = QueryBuilder(models.User, cache=cache).allowed_sorts(["first_name"]).all()
+        ann = QueryBuilder(models.User, models.User.query.filter_by(username="ann"), cache=cache) \
+            .allowed_sorts(["first_name"]) \
+            .all()
+
+    assert [user.username for user in everyone] == ["ann", "charlie", "frank"]
+    assert [user.username for user in ann] == ["ann"]
+    assert len(statements) == 2
+
+
+def test_cached_results_merged_into_session(db_session, sample_users, request_context, models):
+    cache = ResultCache()
+
+    get_usernames(request_context, models, cache, "/?filter[first_name]=Ann")
+    db_session.remove()
+    with request_context("/?filter[first_name]=Ann"):
+        users = QueryBuilder(models.User, cache=cache).allowed_filters(["first_name"]).all()
+
+        assert users[0] in db_session
+        assert users[0].last_name == "Smith"
+
+
+def test_cached_results_do_not_overwrite_pending_changes(db_session, sample_users, request_context, models):
+    cache = ResultCache()
+    ann = sample_users[2]
+
+    get_usernames(request_context, models, cache, "/?filter[first_name]=Ann")
+    ann.first_name = "EDITED"
+    with request_context("/?filter[first_name]=Ann"):
+        users = QueryBuilder(models.User, cache=cache).allowed_filters(["first_name"]).all()
+
+        assert users == [ann]
+        assert ann.first_name == "EDITED"
+        assert ann in db_session.dirty
+
+
+def test_cached_results_detached_from_loading_session(db_session, sample_users, request_context, models, statements):
+    cache = ResultCache()
+    other_session = db_session.session_factory()
+
+    with request_context("/?sort=first_name"):
+        users = QueryBuilder(models.User, session=other_session, cache=cache).allowed_sorts(["first_name"]).all()
+    users[0].first_name = "EDITED"
+    db_session.remove()
+
+    assert get_usernames(request_context, models, cache, "/?sort=first_name") == ["ann", "charlie", "frank"]
+    other_session.commit()
+    db_session.remove()
+
+    assert get_usernames(request_context, models, cache, "/?sort=first_name") == ["ann", "charlie", "frank"]
+    assert len(statements) == 1
+    other_session.close()
+
+
+def test_results_invalidated_when_table_changes(db_session, sample_users, request_context, models, statements):
+    cache = ResultCache()
+    cache.watch(db_session)
+
+    assert get_usernames(request_context, models, cache, "/?sort=first_name") == ["ann", "charlie", "frank"]
+    db_session.add(models.User(first_name='Bob', last_name='Brown', username='bob'))
+    db_session.commit()
+
+    assert get_usernames(request_context, models, cache, "/?sort=first_name") == ["ann", "bob", "charlie", "frank"]
+    assert get_usernames(request_context, models, cache, "/?sort=first_name") == ["ann", "bob", "charlie", "frank"]
+    assert len(statements) == 2
+
+
+def test_results_invalidated_when_relationship_table_changes(db_session, sample_users, request_context, models):
+    address = sample_users[0].address
+    cache = ResultCache()
+    cache.watch(db_session)
+
+    def get_roads():
+        with request_context("/?filter[address.road]=X road"):
+            return len(QueryBuilder(models.User, cache=cache).allowed_filters(["address.road"]).all())
+
+    assert get_roads() == 1
+    address.road = "Y road"
+    db_session.commit()
+
+    assert get_roads() == 0
+
+
+def test_count_served_from_cache(sample_users, request_context, models, statements):
+    cache = ResultCache()
+
+    for _ in range(2):
+        with request_context("/?filter[first_name]=Ann,Frank"):
+            assert QueryBuilder(models.User, cache=cache).allowed_filters(["first_name"]).count() == 2
+
+    assert len(statements) == 1
+
+
+def test_redis_like_backend(sample_users, request_context, models, statements):
+    cache = ResultCache(RedisCache(FakeRedis(), serializer=InMemorySerializer()), ttl=30)
+
+    assert get_usernames(request_context, models, cache, "/?sort=first_name") == ["ann", "charlie", "frank"]
+    assert get_usernames(request_context, models, cache, "/?sort=first_name") == ["ann", "charlie", "frank"]
+    assert len(statements) == 1
+
+    cache.invalidate(models.User.__table__)
+    assert get_usernames(request_context, models, cache, "/?sort=first_name") == ["ann", "charlie", "frank"]
+    assert len(statements) == 2
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1, 60)
+    cache.set("b", 2, 60)
+    cache.get("a")
+    cache.set("c", 3, 60)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_lru_cache_expires_entries():
+    cache = LRUCache()
+    cache.set("a", 1, 0)
+
+    assert cache.get("a") is None
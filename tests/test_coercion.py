@@ -0,0 +1,112 @@
+import enum
+import uuid
+from datetime import datetime, date
+from decimal import Decimal
+
+import pytest
+import sqlalchemy as sqa
+
+from flask_query_builder.coercion import get_coercer
+from flask_query_builder.exceptions import InvalidFilterException, InvalidFilterValueException
+from flask_query_builder.filters import Filter
+from flask_query_builder.querying import QueryBuilder, AllowedFilter
+
+
+class Status(enum.Enum):
+    active = "A"
+    blocked = "B"
+
+
+def create_users(db_session, models):
+    user1 = models.User(first_name='Frank', last_name='Elliot', username='frank', birth_date=datetime(1970, 1, 1))
+    user2 = models.User(first_name='Charlie', last_name='Joe', username='charlie', birth_date=datetime(1980, 6, 25))
+    user3 = models.User(first_name='Ann', last_name='Smith', username='ann', birth_date=datetime(1970, 1, 1))
+
+    db_session.add_all([user1, user2, user3])
+    db_session.commit()
+    return user1, user2, user3
+
+
+def test_datetime_filter_binds_datetime_values(db_session, request_context, models):
+    create_users(db_session, models)
+
+    with request_context("/?filter[birth_date]=1970-01-01"):
+        users = QueryBuilder(models.User).allowed_filters(["birth_date"]).query.all()
+
+        assert [user.username for user in users] == ["frank", "ann"]
+
+
+def test_integer_filter_binds_integer_values(db_session, request_context, models):
+    user1, user2, user3 = create_users(db_session, models)
+
+    with request_context(f"/?filter[id]={user2.id},{user3.id}"):
+        query = QueryBuilder(models.User).allowed_filters(["id"]).query
+
+        assert query.statement.compile().params["id_1"] == [user2.id, user3.id]
+        assert [user.username for user in query.all()] == ["charlie", "ann"]
+
+
+def test_exception_raised_for_invalid_value(db_session, request_context, models):
+    create_users(db_session, models)
+
+    with pytest.raises(InvalidFilterValueException):
+        with request_context("/?filter[id]=1,two"):
+            QueryBuilder(models.User).allowed_filters(["id"])
+
+    with pytest.raises(InvalidFilterException):
+        with request_context("/?filter[birth_date]=yesterday"):
+            QueryBuilder(models.User).allowed_filters(["birth_date"])
+
+
+def test_custom_filter_values_not_coerced(db_session, request_context, models):
+    create_users(db_session, models)
+    received = []
+
+    class RecordingFilter(Filter):
+        def filter(self, query, model, filter_name, values):
+            received.extend(values)
+            return query
+
+    with request_context("/?filter[id]=1,two"):
+        QueryBuilder(models.User).allowed_filters([AllowedFilter.custom("id", RecordingFilter())]).all()
+
+    assert received == ["1", "two"]
+
+
+@pytest.mark.parametrize("column_type, value, expected", [
+    (sqa.Integer(), "42", 42),
+    (sqa.BigInteger(), "-7", -7),
+    (sqa.Numeric(), "1.10", Decimal("1.10")),
+    (sqa.Float(), "1.5", 1.5),
+    (sqa.Boolean(), "true", True),
+    (sqa.Boolean(), "0", False),
+    (sqa.Date(), "2020-02-29", date(2020, 2, 29)),
+    (sqa.DateTime(), "2020-02-29T10:30:00", datetime(2020, 2, 29, 10, 30)),
+    (sqa.Enum(Status), "active", Status.active),
+    (sqa.Enum(Status), "B", Status.blocked),
+    (sqa.Enum("draft", "published"), "draft", "draft"),
+])
+def test_coercer_for_column_type(column_type, value, expected):
+    assert get_coercer(column_type)(value) == expected
+
+
+@pytest.mark.skipif(not hasattr(sqa, "Uuid"), reason="Uuid columns were added in SQLAlchemy 2.0")
+def test_coercer_for_uuid_column():
+    expected = uuid.UUID("12345678-1234-5678-1234-567812345678")
+
+    assert get_coercer(sqa.Uuid())("12345678-1234-5678-1234-567812345678") == expected
+
+
+@pytest.mark.parametrize("column_type, value", [
+    (sqa.Integer(), "4.2"),
+    (sqa.Boolean(), "maybe"),
+    (sqa.Enum(Status), "deleted"),
+    (sqa.Enum("draft", "published"), "deleted"),
+])
+def test_coercer_rejects_invalid_value(column_type, value):
+    with pytest.raises(ValueError):
+        get_coercer(column_type)(value)
+
+
+def test_text_columns_not_coerced():
+    assert get_coercer(sqa.String()) is None
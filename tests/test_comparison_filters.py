@@ -0,0 +1,103 @@
+from datetime import datetime
+
+import pytest
+
+from flask_query_builder.exceptions import InvalidFilterException, InvalidFilterValueException
+from flask_query_builder.querying import QueryBuilder, AllowedFilter
+
+
+def create_users(db_session, models):
+    user1 = models.User(first_name='Frank', last_name='Elliot', username='frank', birth_date=datetime(1970, 1, 1))
+    user2 = models.User(first_name='Charlie', last_name='Joe', username='charlie', birth_date=datetime(1980, 6, 25))
+    user3 = models.User(first_name='Ann', last_name='Smith', username='ann', birth_date=datetime(1990, 3, 12))
+    user4 = models.User(first_name='Bob', last_name='Brown', username='bob')
+
+    db_session.add_all([user1, user2, user3, user4])
+    db_session.commit()
+
+
+@pytest.fixture
+def usernames(request_context, models):
+    def get_usernames(query_string, allowed_filter=None):
+        allowed_filter = allowed_filter or AllowedFilter.comparison("birth_date")
+        with request_context(query_string):
+            users = QueryBuilder(models.User).allowed_filters([allowed_filter]).query.all()
+            return [user.username for user in users]
+    return get_usernames
+
+
+def test_range_operators_applied_to_query(db_session, models, usernames):
+    create_users(db_session, models)
+
+    assert usernames("/?filter[birth_date][gte]=1980-06-25") == ["charlie", "ann"]
+    assert usernames("/?filter[birth_date][gt]=1980-06-25") == ["ann"]
+    assert usernames("/?filter[birth_date][lt]=1980-06-25") == ["frank"]
+    assert usernames("/?filter[birth_date][lte]=1980-06-25") == ["frank", "charlie"]
+    assert usernames("/?filter[birth_date][between]=1975-01-01,1985-01-01") == ["charlie"]
+
+
+def test_operators_on_the_same_field_combined(db_session, models, usernames):
+    create_users(db_session, models)
+
+    assert usernames("/?filter[birth_date][gte]=1975-01-01&filter[birth_date][lt]=1995-01-01") == ["charlie", "ann"]
+
+
+def test_equality_operators_applied_to_query(db_session, models, usernames):
+    create_users(db_session, models)
+
+    assert usernames("/?filter[birth_date]=1970-01-01") == ["frank"]
+    assert usernames("/?filter[birth_date][eq]=1970-01-01,1990-03-12") == ["frank", "ann"]
+    assert usernames("/?filter[birth_date][ne]=1970-01-01") == ["charlie", "ann"]
+
+
+def test_is_null_operator_applied_to_query(db_session, models, usernames):
+    create_users(db_session, models)
+
+    assert usernames("/?filter[birth_date][is_null]=true") == ["bob"]
+    assert usernames("/?filter[birth_date][is_null]=false") == ["frank", "charlie", "ann"]
+
+
+def test_comparison_with_internal_name(db_session, models, usernames):
+    create_users(db_session, models)
+
+    assert usernames("/?filter[born][lt]=1975-01-01", AllowedFilter.comparison("born", "birth_date")) == ["frank"]
+
+
+def test_comparison_binds_typed_values(db_session, request_context, models):
+    create_users(db_session, models)
+
+    with request_context("/?filter[birth_date][gte]=1980-06-25"):
+        query = QueryBuilder(models.User).allowed_filters([AllowedFilter.comparison("birth_date")]).query
+
+        assert list(query.statement.compile().params.values()) == [datetime(1980, 6, 25)]
+
+
+def test_exception_raised_when_operator_not_allowed(db_session, models, usernames):
+    create_users(db_session, models)
+
+    with pytest.raises(InvalidFilterException):
+        usernames("/?filter[birth_date][lt]=1980-01-01", AllowedFilter.comparison("birth_date", operators=["gte"]))
+
+    with pytest.raises(InvalidFilterException):
+        usernames("/?filter[birth_date][lt]=1980-01-01", AllowedFilter.exact("birth_date"))
+
+    with pytest.raises(InvalidFilterException):
+        usernames("/?filter[birth_date]=1980-01-01", AllowedFilter.comparison("birth_date", operators=["gte", "lt"]))
+
+    allowed_filter = AllowedFilter.comparison("birth_date", operators=["eq"])
+    assert usernames("/?filter[birth_date]=1970-01-01", allowed_filter) == ["frank"]
+
+
+def test_exception_raised_for_wrong_number_of_values(db_session, models, usernames):
+    create_users(db_session, models)
+
+    with pytest.raises(InvalidFilterValueException):
+        usernames("/?filter[birth_date][between]=1980-01-01")
+
+    with pytest.raises(InvalidFilterValueException):
+        usernames("/?filter[birth_date][gt]=1980-01-01,1990-01-01")
+
+
+def test_exception_raised_for_unknown_operator():
+    with pytest.raises(InvalidFilterException):
+        AllowedFilter.comparison("birth_date", operators=["like"])
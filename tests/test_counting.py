@@ -0,0 +1,58 @@
+from sqlalchemy import text
+
+from flask_query_builder.querying import QueryBuilder, AllowedFilter
+
+
+def test_count_of_applied_filters(sample_users, request_context, models):
+    with request_context("/?filter[first_name]=Ann,Frank"):
+        builder = QueryBuilder(models.User).allowed_filters(["first_name"])
+
+        assert builder.count() == 2
+
+
+def test_count_leaves_out_sorts_and_includes(sample_users, request_context, models, statements):
+    statements.clear()
+
+    with request_context("/?filter[last_name]=l&sort=-first_name&include=address"):
+        count = QueryBuilder(models.User) \
+            .allowed_filters([AllowedFilter.partial("last_name")]) \
+            .allowed_sorts(["first_name"]) \
+            .allowed_includes(["address"]) \
+            .count()
+
+    assert count == 1
+    assert len(statements) == 1
+    assert "ORDER BY" not in statements[0]
+    assert "JOIN" not in statements[0]
+    assert "FROM (" not in statements[0]
+
+
+def test_count_without_filters(sample_users, request_context, models):
+    with request_context("/"):
+        assert QueryBuilder(models.User).count() == 3
+
+
+def test_count_of_distinct_query(sample_users, request_context, models):
+    query = models.User.query.with_entities(models.User.birth_date).distinct()
+
+    with request_context("/"):
+        assert QueryBuilder(models.User, query).count() == 1
+
+
+def test_estimated_count_used_above_threshold(db_session, sample_users, request_context, models):
+    db_session.execute(text("ANALYZE"))
+    db_session.commit()
+
+    with request_context("/?filter[first_name]=Ann"):
+        builder = QueryBuilder(models.User).allowed_filters(["first_name"])
+
+        assert builder.count(estimate_threshold=3) == 3
+        assert builder.count(estimate_threshold=1000) == 1
+
+
+def test_exact_count_used_without_estimate(db_session, sample_users, request_context, models):
+    db_session.execute(text("DROP TABLE IF EXISTS sqlite_stat1"))
+    db_session.commit()
+
+    with request_context("/?filter[first_name]=Ann"):
+        assert QueryBuilder(models.User).allowed_filters(["first_name"]).count(estimate_threshold=1) == 1
@@ -0,0 +1,96 @@
+import json
+
+from sqlalchemy import text
+
+from flask_query_builder.diagnostics import add_diagnostics_header, get_request_diagnostics, statement_executed
+from flask_query_builder.querying import QueryBuilder, AllowedFilter
+
+
+def test_diagnostics_record_request_and_statements(sample_users, request_context, models):
+    with request_context("/?filter[first_name]=Ann,Frank&filter[birth_date][gte]=1960-01-01&sort=-last_name"):
+        builder = QueryBuilder(models.User) \
+            .diagnose() \
+            .allowed_filters(["first_name", AllowedFilter.comparison("birth_date")]) \
+            .allowed_sorts(["last_name"])
+        builder.all()
+        builder.count()
+
+    diagnostics = builder.diagnostics
+    assert [applied.name for applied in diagnostics.filters] == ["first_name", "birth_date"]
+    assert [applied.name for applied in diagnostics.sorts] == ["last_name"]
+    assert len(diagnostics.statements) == 2
+    assert "ORDER BY users.last_name DESC" in diagnostics.statements[0].sql
+    assert "count(" in diagnostics.statements[1].sql
+    assert diagnostics.build_time >= 0
+    assert diagnostics.execute_time > 0
+    assert diagnostics.warnings == []
+
+
+def test_explain_flags_full_scans_and_sorts_without_index(sample_users, request_context, models):
+    with request_context("/?filter[last_name]=Smith&sort=first_name"):
+        builder = QueryBuilder(models.User) \
+            .diagnose(explain=True) \
+            .allowed_filters(["last_name"]) \
+            .allowed_sorts(["first_name"])
+        builder.all()
+
+    statement = builder.diagnostics.statements[0]
+    assert statement.plan
+    assert any(warning.startswith("Full scan") for warning in statement.warnings)
+    assert any(warning.startswith("Sort without index") for warning in statement.warnings)
+
+
+def test_explain_does_not_flag_indexed_lookups(sample_users, request_context, models):
+    with request_context("/?filter[username]=ann"):
+        builder = QueryBuilder(models.User).diagnose(explain=True).allowed_filters(["username"])
+        builder.all()
+
+    assert builder.diagnostics.warnings == []
+
+
+def test_diagnostics_enabled_from_config(app, sample_users, request_context, models):
+    app.config["QUERY_BUILDER_DIAGNOSTICS"] = True
+
+    with request_context("/?filter[username]=ann"):
+        QueryBuilder(models.User).allowed_filters(["username"]).all()
+        QueryBuilder(models.Address).all()
+
+        assert [item.model for item in get_request_diagnostics()] == [models.User, models.Address]
+
+
+def test_statement_executed_signal(app, db_session, sample_users, request_context, models):
+    received = []
+
+    def receiver(sender, diagnostics, statement):
+        received.append((sender, diagnostics, statement))
+
+    with statement_executed.connected_to(receiver):
+        with request_context("/?filter[username]=ann"):
+            builder = QueryBuilder(models.User).diagnose().allowed_filters(["username"])
+            builder.all()
+            db_session.execute(text("SELECT 1"))
+
+    assert len(received) == 1
+    assert received[0][0] is app
+    assert received[0][1] is builder.diagnostics
+
+
+def test_diagnostics_header(app, sample_users, request_context, models):
+    app.config["QUERY_BUILDER_DIAGNOSTICS_HEADER"] = "X-Diagnostics"
+
+    with request_context("/?filter[username]=ann&sort=-username"):
+        QueryBuilder(models.User).diagnose().allowed_filters(["username"]).allowed_sorts(["username"]).all()
+        response = add_diagnostics_header(app.response_class())
+
+    summary = json.loads(response.headers["X-Diagnostics"])
+    assert summary[0]["model"] == "User"
+    assert summary[0]["filters"] == [["username", None, ["ann"]]]
+    assert summary[0]["sorts"] == ["-username"]
+    assert summary[0]["statements"] == 1
+
+
+def test_diagnostics_header_without_diagnosed_builders(app, request_context):
+    with request_context("/"):
+        response = add_diagnostics_header(app.response_class())
+
+    assert "X-Query-Builder-Diagnostics" not in response.headers
@@ -0,0 +1,124 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from flask_query_builder.async_querying import AsyncQueryBuilder
+from flask_query_builder.caching import LRUCache, ResultCache
+from flask_query_builder.exceptions import InvalidFacetException
+from flask_query_builder.querying import QueryBuilder, AllowedFacet, AllowedFilter
+from flask_query_builder.specs import QuerySpec
+
+
+def create_users(db_session, models):
+    x_road = models.Address(road="X road")
+    y_road = models.Address(road="Y road")
+    user1 = models.User(first_name='Frank', last_name='Elliot', username='frank',
+                        birth_date=datetime(1970, 1, 1), address=x_road)
+    user2 = models.User(first_name='Charlie', last_name='Joe', username='charlie',
+                        birth_date=datetime(1980, 1, 1), address=y_road)
+    user3 = models.User(first_name='Ann', last_name='Joe', username='ann',
+                        birth_date=datetime(1970, 1, 1))
+
+    db_session.add_all([user1, user2, user3])
+    db_session.commit()
+
+
+def test_facets_counted_in_one_statement(db_session, request_context, models, statements):
+    create_users(db_session, models)
+    statements.clear()
+
+    with request_context("/?facet=last_name,birth_date"):
+        facets = QueryBuilder(models.User).allowed_facets(["last_name", "birth_date"]).facets()
+
+    assert facets == {
+        "last_name": {"Joe": 2, "Elliot": 1},
+        "birth_date": {datetime(1970, 1, 1): 2, datetime(1980, 1, 1): 1},
+    }
+    assert list(facets["last_name"]) == ["Joe", "Elliot"]
+    assert len(statements) == 1
+    assert "UNION ALL" in statements[0]
+
+
+def test_facet_leaves_out_its_own_filter(db_session, request_context, models):
+    create_users(db_session, models)
+
+    with request_context("/?filter[last_name]=Joe&filter[birth_date]=1970-01-01&facet=last_name,birth_date"):
+        builder = QueryBuilder(models.User) \
+            .allowed_filters(["last_name", AllowedFilter.exact("birth_date")]) \
+            .allowed_facets(["last_name", "birth_date"])
+        users = builder.all()
+        facets = builder.facets()
+
+    assert [user.username for user in users] == ["ann"]
+    assert facets == {
+        "last_name": {"Joe": 1, "Elliot": 1},
+        "birth_date": {datetime(1970, 1, 1): 1, datetime(1980, 1, 1): 1},
+    }
+
+
+def test_facet_on_relationship_path(db_session, request_context, models):
+    create_users(db_session, models)
+
+    with request_context("/?filter[last_name]=Joe&facet=road"):
+        facets = QueryBuilder(models.User) \
+            .allowed_filters(["last_name"]) \
+            .allowed_facets([AllowedFacet.field("road", "address.road")]) \
+            .facets()
+
+    assert facets == {"road": {"Y road": 1, None: 1}}
+
+
+def test_no_facets_without_request(request_context, models, statements):
+    with request_context("/"):
+        assert QueryBuilder(models.User).allowed_facets(["last_name"]).facets() == {}
+
+    assert statements == []
+
+
+def test_exception_raised_when_facet_not_allowed(request_context, models):
+    with pytest.raises(InvalidFacetException):
+        with request_context("/?facet=password"):
+            QueryBuilder(models.User).allowed_facets(["last_name"])
+
+    with request_context("/?facet=password"):
+        assert QueryBuilder(models.User, raise_exceptions=False).allowed_facets(["last_name"]).facets() == {}
+
+
+def test_spec_facets_validated_and_applied(db_session, request_context, models):
+    create_users(db_session, models)
+
+    with pytest.raises(InvalidFacetException):
+        QuerySpec(models.User, facets=["password"])
+
+    spec = QuerySpec(models.User, filters=["first_name"], facets=["last_name"])
+    with request_context("/?filter[first_name]=Frank,Ann&facet=last_name"):
+        assert spec.builder().facets() == {"last_name": {"Elliot": 1, "Joe": 1}}
+
+
+def test_facets_served_from_result_cache(db_session, request_context, models, statements):
+    create_users(db_session, models)
+    cache = ResultCache(LRUCache())
+
+    with request_context("/?facet=last_name"):
+        first = QueryBuilder(models.User, cache=cache).allowed_facets(["last_name"]).facets()
+        statements.clear()
+        second = QueryBuilder(models.User, cache=cache).allowed_facets(["last_name"]).facets()
+
+    assert first == second == {"last_name": {"Joe": 2, "Elliot": 1}}
+    assert statements == []
+
+
+def test_async_facets(db_session, request_context, models):
+    create_users(db_session, models)
+    async_engine = create_async_engine("sqlite+aiosqlite:////tmp/test.db")
+
+    async def main():
+        async with AsyncSession(async_engine) as session:
+            facets = await AsyncQueryBuilder(models.User, session).allowed_facets(["last_name"]).facets()
+        await async_engine.dispose()
+        return facets
+
+    with request_context("/?facet=last_name"):
+        assert asyncio.run(main()) == {"last_name": {"Joe": 2, "Elliot": 1}}
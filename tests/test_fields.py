@@ -0,0 +1,67 @@
+import pytest
+from sqlalchemy import inspect
+
+from flask_query_builder.exceptions import InvalidFieldException
+from flask_query_builder.querying import QueryBuilder
+
+
+def test_only_requested_fields_are_loaded(sample_users, request_context, models):
+    with request_context("/?fields[users]=first_name,last_name"):
+        users = QueryBuilder(models.User) \
+            .allowed_fields(["first_name", "last_name", "username"]) \
+            .query \
+            .all()
+
+        assert len(users) == 3
+        unloaded = inspect(users[0]).unloaded
+        assert "first_name" not in unloaded
+        assert "last_name" not in unloaded
+        assert "id" not in unloaded
+        assert "username" in unloaded
+        assert "birth_date" in unloaded
+
+
+def test_all_fields_loaded_when_none_requested(sample_users, request_context, models):
+    with request_context("/"):
+        users = QueryBuilder(models.User).allowed_fields(["first_name"]).query.all()
+
+        assert "birth_date" not in inspect(users[0]).unloaded
+
+
+def test_fields_of_other_resource_types_ignored(sample_users, request_context, models):
+    with request_context("/?fields[addresses]=road"):
+        users = QueryBuilder(models.User).allowed_fields(["first_name"]).query.all()
+
+        assert "birth_date" not in inspect(users[0]).unloaded
+
+
+def test_custom_resource_type(sample_users, request_context, models):
+    with request_context("/?fields[people]=first_name"):
+        users = QueryBuilder(models.User).allowed_fields(["first_name"], "people").query.all()
+
+        assert "last_name" in inspect(users[0]).unloaded
+
+
+def test_exception_raised_when_field_not_allowed(sample_users, request_context, models):
+    with pytest.raises(InvalidFieldException):
+        with request_context("/?fields[users]=first_name,birth_date"):
+            QueryBuilder(models.User).allowed_fields(["first_name"])
+
+
+def test_field_not_allowed_ignored_when_raise_exceptions_is_disabled(sample_users, request_context, models):
+    with request_context("/?fields[users]=first_name,birth_date"):
+        users = QueryBuilder(models.User, raise_exceptions=False).allowed_fields(["first_name"]).query.all()
+
+        assert "birth_date" in inspect(users[0]).unloaded
+
+
+def test_sorted_fields_loaded_for_cursor_pagination(sample_users, request_context, models):
+    with request_context("/?fields[users]=first_name&sort=last_name&page[size]=2"):
+        page = QueryBuilder(models.User) \
+            .allowed_fields(["first_name"]) \
+            .allowed_sorts(["last_name"]) \
+            .paginate_cursor()
+
+        assert [user.first_name for user in page.items] == ["Frank", "Charlie"]
+        assert "last_name" not in inspect(page.items[0]).unloaded
+        assert "username" in inspect(page.items[0]).unloaded
@@ -0,0 +1,148 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy.dialects import sqlite
+
+from flask_query_builder.exceptions import InvalidFilterException
+from flask_query_builder.filters import Filter
+from flask_query_builder.querying import QueryBuilder, AllowedFilter
+from flask_query_builder.specs import QuerySpec
+
+
+def create_users(db_session, models):
+    birth_date = datetime.strptime("1970-01-01", "%Y-%m-%d")
+    x_road = models.Address(road="X road")
+    y_road = models.Address(road="Y road")
+    user1 = models.User(first_name='Frank', last_name='Elliot', username='frank', birth_date=birth_date, address=x_road)
+    user2 = models.User(first_name='Charlie', last_name='Joe', username='charlie', birth_date=birth_date, address=y_road)
+    user3 = models.User(first_name='Ann', last_name='Smith', username='ann', birth_date=birth_date)
+
+    db_session.add_all([user1, user2, user3])
+    db_session.commit()
+
+
+def get_sql(builder) -> str:
+    return str(builder.statement.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def test_or_group_matches_any_member(db_session, request_context, models):
+    create_users(db_session, models)
+
+    with request_context("/?filter[or][0][first_name]=Frank&filter[or][1][last_name]=ith"):
+        users = QueryBuilder(models.User) \
+            .allowed_filters(["first_name", AllowedFilter.partial("last_name")], groups=True) \
+            .all()
+
+    assert sorted(user.username for user in users) == ["ann", "frank"]
+
+
+def test_group_members_are_conjunctions_with_nested_groups(db_session, request_context, models):
+    create_users(db_session, models)
+    url = "/?filter[or][0][first_name]=Frank,Charlie&filter[or][0][and][0][last_name][ne]=Joe" \
+          "&filter[or][1][username]=ann&filter[birth_date][gte]=1960-01-01"
+
+    with request_context(url):
+        builder = QueryBuilder(models.User).allowed_filters([
+            "first_name",
+            "username",
+            AllowedFilter.comparison("last_name"),
+            AllowedFilter.comparison("birth_date"),
+        ], groups=True)
+        users = builder.all()
+        count = builder.count()
+
+    assert sorted(user.username for user in users) == ["ann", "frank"]
+    assert count == 2
+
+
+def test_or_equalities_merged_into_one_in(db_session, request_context, models):
+    create_users(db_session, models)
+
+    with request_context("/?filter[or][0][username]=ann&filter[or][1][username]=frank&filter[or][2][username]=ann"):
+        builder = QueryBuilder(models.User).allowed_filters(["username"], groups=True)
+        sql = get_sql(builder)
+        users = builder.all()
+
+    assert "users.username IN ('ann', 'frank')" in sql
+    assert " OR " not in sql
+    assert sorted(user.username for user in users) == ["ann", "frank"]
+
+
+def test_and_equalities_intersected(db_session, request_context, models):
+    create_users(db_session, models)
+
+    with request_context("/?filter[and][0][username]=ann,frank&filter[and][1][username]=frank,charlie"):
+        builder = QueryBuilder(models.User).allowed_filters(["username"], groups=True)
+        sql = get_sql(builder)
+        users = builder.all()
+
+    assert "users.username IN ('frank')" in sql
+    assert [user.username for user in users] == ["frank"]
+
+    with request_context("/?filter[and][0][username]=ann&filter[and][1][username]=frank"):
+        assert QueryBuilder(models.User).allowed_filters(["username"], groups=True).all() == []
+
+
+def test_repeated_members_left_out(db_session, request_context, models):
+    create_users(db_session, models)
+
+    with request_context("/?filter[or][0][last_name]=o&filter[or][1][last_name]=o&filter[or][2][first_name]=Ann"):
+        sql = get_sql(QueryBuilder(models.User).allowed_filters([
+            AllowedFilter.partial("last_name"),
+            "first_name",
+        ], groups=True))
+
+    assert sql.count("LIKE") == 1
+
+
+def test_group_on_relationship_path(db_session, request_context, models):
+    create_users(db_session, models)
+
+    with request_context("/?filter[or][0][address.road]=Y road&filter[or][1][first_name]=Ann"):
+        users = QueryBuilder(models.User) \
+            .allowed_filters(["first_name", AllowedFilter.exact("address.road")], groups=True) \
+            .all()
+
+    assert sorted(user.username for user in users) == ["ann", "charlie"]
+
+
+def test_exception_raised_when_groups_not_allowed(request_context, models):
+    with pytest.raises(InvalidFilterException):
+        with request_context("/?filter[or][0][first_name]=Frank"):
+            QueryBuilder(models.User).allowed_filters(["first_name"])
+
+
+def test_groups_ignored_when_not_allowed_and_raise_exceptions_is_disabled(db_session, request_context, models):
+    create_users(db_session, models)
+
+    with request_context("/?filter[or][0][first_name]=Frank&filter[or][1][password]=secret"):
+        assert len(QueryBuilder(models.User, raise_exceptions=False).allowed_filters(["first_name"]).all()) == 3
+        users = QueryBuilder(models.User, raise_exceptions=False).allowed_filters(["first_name"], groups=True).all()
+
+    assert [user.username for user in users] == ["frank"]
+
+
+def test_exception_raised_for_filter_not_allowed_in_group(request_context, models):
+    with pytest.raises(InvalidFilterException):
+        with request_context("/?filter[or][0][first_name]=Frank&filter[or][1][password]=secret"):
+            QueryBuilder(models.User).allowed_filters(["first_name"], groups=True)
+
+
+def test_exception_raised_for_custom_filter_without_expression_in_group(request_context, models):
+    class RoadFilter(Filter):
+        def filter(self, query, model, filter_name, values):
+            return query
+
+    with pytest.raises(InvalidFilterException):
+        with request_context("/?filter[or][0][road]=X road"):
+            QueryBuilder(models.User).allowed_filters([AllowedFilter.custom("road", RoadFilter())], groups=True)
+
+
+def test_spec_allows_filter_groups(db_session, request_context, models):
+    create_users(db_session, models)
+    spec = QuerySpec(models.User, filters=["first_name"], filter_groups=True)
+
+    with request_context("/?filter[or][0][first_name]=Ann&filter[or][1][first_name]=Charlie"):
+        users = spec.builder().all()
+
+    assert sorted(user.username for user in users) == ["ann", "charlie"]
@@ -1,10 +1,11 @@
 from datetime import datetime
 
 import pytest
-from sqlalchemy import extract
+from sqlalchemy import extract, select, text
+from sqlalchemy.dialects import postgresql
 
 from flask_query_builder.exceptions import InvalidFilterException
-from flask_query_builder.filters import Filter
+from flask_query_builder.filters import ExactFilter, Filter
 from flask_query_builder.querying import QueryBuilder, AllowedFilter
 
 def test_assert_no_exception_raised_when_sort_not_allowed_and_raise_exceptions_is_disabled(db_session, request_context, models):
@@ -225,3 +226,187 @@ def test_case_sensitive_filter_found(db_session, request_context, models):
             .all()
 
         assert len(users) == 2
+
+
+def test_starts_with_filter_applied_to_query(db_session, request_context, models):
+    birth_date = datetime.strptime("1970-01-01", "%Y-%m-%d")
+    user1 = models.User(first_name='Frank', last_name='Elliot', username='frank', birth_date=birth_date)
+    user2 = models.User(first_name='Alfred', last_name='Joe', username='alfred', birth_date=birth_date)
+    user3 = models.User(first_name='Fr_nk', last_name='Smith', username='fr_nk', birth_date=birth_date)
+
+    db_session.add_all([user1, user2, user3])
+    db_session.commit()
+
+    with request_context("/?filter[first_name]=fr"):
+        users = QueryBuilder(models.User) \
+            .allowed_filters([
+            AllowedFilter.starts_with("first_name")
+        ]) \
+            .query \
+            .all()
+
+        assert [user.first_name for user in users] == ["Frank", "Fr_nk"]
+
+    with request_context("/?filter[name]=FR_"):
+        users = QueryBuilder(models.User) \
+            .allowed_filters([
+            AllowedFilter.starts_with("name", "first_name")
+        ]) \
+            .query \
+            .all()
+
+        assert [user.first_name for user in users] == ["Fr_nk"]
+
+
+def test_starts_with_filter_compares_lower_expression(models):
+    statement = AllowedFilter.starts_with("first_name").filter_class.filter(
+        select(models.User), models.User, "first_name", ["Fr"]
+    )
+
+    assert "lower(users.first_name) LIKE" in str(statement)
+
+
+def test_similar_filter_applied_to_query(db_session, request_context, models):
+    birth_date = datetime.strptime("1970-01-01", "%Y-%m-%d")
+    user1 = models.User(first_name='Frank', last_name='Elliot', username='frank', birth_date=birth_date)
+    user2 = models.User(first_name='Alfred', last_name='Joe', username='alfred', birth_date=birth_date)
+    user3 = models.User(first_name='Ann', last_name='Smith', username='ann', birth_date=birth_date)
+
+    db_session.add_all([user1, user2, user3])
+    db_session.commit()
+
+    with request_context("/?filter[first_name]=FR"):
+        users = QueryBuilder(models.User) \
+            .allowed_filters([
+            AllowedFilter.similar("first_name")
+        ]) \
+            .query \
+            .all()
+
+        assert [user.first_name for user in users] == ["Frank", "Alfred"]
+
+
+def test_similar_filter_uses_trigram_operator_on_postgresql(models):
+    statement = AllowedFilter.similar("first_name").filter_class.filter(
+        select(models.User), models.User, "first_name", ["Fr"]
+    )
+
+    assert "users.first_name %% " in str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_full_text_filter_applied_through_fts_table(db_session, request_context, models):
+    birth_date = datetime.strptime("1970-01-01", "%Y-%m-%d")
+    user1 = models.User(first_name='Frank Walter', last_name='Elliot', username='frank', birth_date=birth_date)
+    user2 = models.User(first_name='Walter', last_name='Joe', username='walter', birth_date=birth_date)
+    user3 = models.User(first_name='Ann', last_name='Smith', username='ann', birth_date=birth_date)
+
+    db_session.add_all([user1, user2, user3])
+    db_session.flush()
+    db_session.execute(text(
+        "CREATE VIRTUAL TABLE users_fts USING fts5(first_name, content='users', content_rowid='id')"
+    ))
+    db_session.execute(text("INSERT INTO users_fts(users_fts) VALUES ('rebuild')"))
+    db_session.commit()
+
+    try:
+        with request_context("/?filter[name]=walter AND"):
+            users = QueryBuilder(models.User) \
+                .allowed_filters([
+                AllowedFilter.full_text("name", "first_name", fts_table="users_fts")
+            ]) \
+                .query \
+                .all()
+
+            assert users == []
+
+        with request_context("/?filter[name]=walter"):
+            users = QueryBuilder(models.User) \
+                .allowed_filters([
+                AllowedFilter.full_text("name", "first_name", fts_table="users_fts")
+            ]) \
+                .query \
+                .all()
+
+            assert [user.username for user in users] == ["frank", "walter"]
+    finally:
+        db_session.rollback()
+        db_session.execute(text("DROP TABLE users_fts"))
+        db_session.commit()
+
+
+def test_full_text_filter_applied_through_fts_table_on_relationship_path(db_session, request_context, models):
+    birth_date = datetime.strptime("1970-01-01", "%Y-%m-%d")
+    user1 = models.User(first_name='Walter', last_name='Joe', username='walter', birth_date=birth_date)
+    user2 = models.User(first_name='Ann', last_name='Smith', username='ann', birth_date=birth_date)
+    user1.address = models.Address(road="X road")
+    user2.address = models.Address(road="Y road")
+
+    db_session.add_all([user1, user2])
+    db_session.flush()
+    db_session.execute(text(
+        "CREATE VIRTUAL TABLE users_fts USING fts5(first_name, content='users', content_rowid='id')"
+    ))
+    db_session.execute(text("INSERT INTO users_fts(users_fts) VALUES ('rebuild')"))
+    db_session.commit()
+
+    try:
+        with request_context("/?filter[name]=walter"):
+            addresses = QueryBuilder(models.Address) \
+                .allowed_filters([
+                AllowedFilter.full_text("name", "user.first_name", fts_table="users_fts")
+            ]) \
+                .all()
+
+            assert [address.road for address in addresses] == ["X road"]
+    finally:
+        db_session.rollback()
+        db_session.execute(text("DROP TABLE users_fts"))
+        db_session.commit()
+
+
+def test_full_text_filter_uses_text_search_config_on_postgresql(models):
+    statement = AllowedFilter.full_text("first_name", config="english").filter_class.filter(
+        select(models.User), models.User, "first_name", ["walter"]
+    )
+
+    compiled = str(statement.compile(dialect=postgresql.dialect()))
+    assert "users.first_name) @@ plainto_tsquery(" in compiled
+
+
+def test_exact_filter_with_duplicate_values_deduplicated(models):
+    statement = AllowedFilter.exact("first_name").filter_class.filter(
+        select(models.User), models.User, "first_name", ["Ann", "Ann", "Frank"]
+    )
+
+    assert statement.compile().params["first_name_1"] == ["Ann", "Frank"]
+
+
+def test_exact_filter_above_large_in_threshold_applied_to_query(app, db_session, request_context, models):
+    app.config["QUERY_BUILDER_MAX_FILTER_VALUES"] = 20000
+    birth_date = datetime.strptime("1970-01-01", "%Y-%m-%d")
+    users = [
+        models.User(first_name=f'User {index}', last_name='Elliot', username=f'user{index}', birth_date=birth_date)
+        for index in range(50)
+    ]
+
+    db_session.add_all(users)
+    db_session.commit()
+
+    ids = ",".join(str(index) for index in range(2, 40000, 2))
+    with request_context(f"/?filter[id]={ids}"):
+        users = QueryBuilder(models.User) \
+            .allowed_filters([
+            AllowedFilter("id", ExactFilter(large_in_threshold=100))
+        ]) \
+            .query \
+            .all()
+
+        assert len(users) == 25
+
+
+def test_exact_filter_above_large_in_threshold_uses_array_on_postgresql(models):
+    statement = AllowedFilter("id", ExactFilter(large_in_threshold=2)).filter_class.filter(
+        select(models.User), models.User, "id", ["1", "2", "3"]
+    )
+
+    assert "users.id = ANY (" in str(statement.compile(dialect=postgresql.dialect()))
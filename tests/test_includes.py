@@ -0,0 +1,113 @@
+from datetime import datetime
+
+import pytest
+
+from flask_query_builder.exceptions import InvalidFieldException, InvalidIncludeException
+from flask_query_builder.querying import QueryBuilder, AllowedInclude
+from flask_query_builder.specs import QuerySpec
+
+
+def create_users(db_session, models):
+    birth_date = datetime.strptime("1970-01-01", "%Y-%m-%d")
+    address1 = models.Address(road="X road")
+    address2 = models.Address(road="A road")
+    user1 = models.User(first_name='Frank', last_name='Elliot', username='frank', birth_date=birth_date, address=address1)
+    user2 = models.User(first_name='Charlie', last_name='Joe', username='charlie', birth_date=birth_date, address=address2)
+    user3 = models.User(first_name='Ann', last_name='Smith', username='ann', birth_date=birth_date, address=address2)
+
+    db_session.add_all([user1, user2, user3])
+    db_session.commit()
+    db_session.expunge_all()
+
+
+def test_many_to_one_include_loaded_with_join(db_session, request_context, models, statements):
+    create_users(db_session, models)
+    statements.clear()
+
+    with request_context("/?include=address"):
+        users = QueryBuilder(models.User).allowed_includes(["address"]).query.all()
+        roads = [user.address.road for user in users]
+
+    assert roads == ["X road", "A road", "A road"]
+    assert len(statements) == 1
+    assert "JOIN addresses" in statements[0]
+
+
+def test_collection_include_loaded_with_select_in(db_session, request_context, models, statements):
+    create_users(db_session, models)
+    statements.clear()
+
+    with request_context("/?include=user"):
+        addresses = QueryBuilder(models.Address).allowed_includes(["user"]).query.all()
+        usernames = [[user.username for user in address.user] for address in addresses]
+
+    assert usernames == [["frank"], ["charlie", "ann"]]
+    assert len(statements) == 2
+    assert " IN (" in statements[1]
+
+
+def test_nested_include_bounded_by_depth(db_session, request_context, models, statements):
+    create_users(db_session, models)
+    statements.clear()
+
+    with request_context("/?include=address.user"):
+        users = QueryBuilder(models.User).allowed_includes(["address.user"]).query.all()
+        neighbours = [len(user.address.user) for user in users]
+
+    assert neighbours == [1, 2, 2]
+    assert len(statements) == 2
+
+
+def test_include_strategy_and_internal_name(db_session, request_context, models, statements):
+    create_users(db_session, models)
+    statements.clear()
+
+    with request_context("/?include=home"):
+        users = QueryBuilder(models.User) \
+            .allowed_includes([AllowedInclude.relationship("home", "address", strategy="selectin")]) \
+            .query \
+            .all()
+        roads = [user.address.road for user in users]
+
+    assert roads == ["X road", "A road", "A road"]
+    assert len(statements) == 2
+
+
+def test_spec_applies_includes(db_session, request_context, models, statements):
+    create_users(db_session, models)
+    spec = QuerySpec(models.User, includes=["address"])
+    statements.clear()
+
+    with request_context("/?include=address"):
+        users = spec.builder().query.all()
+        roads = [user.address.road for user in users]
+
+    assert len(roads) == 3
+    assert len(statements) == 1
+
+
+def test_exception_raised_when_spec_field_is_a_relationship(models):
+    with pytest.raises(InvalidFieldException):
+        QuerySpec(models.User, fields=["first_name", "address"], includes=["address"])
+
+
+def test_exception_raised_when_include_not_allowed(db_session, request_context, models):
+    with pytest.raises(InvalidIncludeException):
+        with request_context("/?include=address.user"):
+            QueryBuilder(models.User).allowed_includes(["address"])
+
+
+def test_include_not_allowed_ignored_when_raise_exceptions_is_disabled(db_session, request_context, models, statements):
+    create_users(db_session, models)
+    statements.clear()
+
+    with request_context("/?include=address"):
+        users = QueryBuilder(models.User, raise_exceptions=False).allowed_includes([]).query.all()
+
+    assert len(users) == 3
+    assert "JOIN" not in statements[0]
+
+
+def test_exception_raised_for_unknown_strategy():
+    with pytest.raises(InvalidIncludeException):
+        AllowedInclude.relationship("address", strategy="lazy")
@@ -0,0 +1,195 @@
+from datetime import datetime
+
+import pytest
+
+from flask_query_builder.exceptions import InvalidPageException, InvalidSortException
+from flask_query_builder.pagination import encode_cursor, get_default_nulls
+from flask_query_builder.querying import QueryBuilder, AllowedSort
+from flask_query_builder.sorts import Sort
+
+
+def create_users(db_session, models):
+    birth_date = datetime.strptime("1970-01-01", "%Y-%m-%d")
+    users = [
+        models.User(first_name='Frank', last_name='Elliot', username='frank', birth_date=birth_date),
+        models.User(first_name='Charlie', last_name='Joe', username='charlie', birth_date=birth_date),
+        models.User(first_name='Ann', last_name='Smith', username='ann', birth_date=birth_date),
+        models.User(first_name='Ann', last_name='Brown', username='annb', birth_date=birth_date),
+        models.User(first_name='Bob', last_name='Elliot', username='bob', birth_date=birth_date),
+    ]
+    db_session.add_all(users)
+    db_session.commit()
+    return users
+
+
+def test_first_page_is_ordered_by_primary_key_without_sorts(db_session, request_context, models):
+    create_users(db_session, models)
+
+    with request_context("/?page[size]=2"):
+        page = QueryBuilder(models.User).paginate_cursor()
+
+        assert [user.username for user in page.items] == ["frank", "charlie"]
+        assert page.next_cursor is not None
+        assert page.prev_cursor is None
+
+
+def test_pages_follow_the_next_cursor(db_session, request_context, models):
+    create_users(db_session, models)
+
+    usernames = []
+    cursor = ""
+    while cursor is not None:
+        with request_context(f"/?sort=first_name&page[size]=2&page[after]={cursor}"):
+            page = QueryBuilder(models.User).allowed_sorts(["first_name"]).paginate_cursor()
+            usernames.extend(user.username for user in page.items)
+            cursor = page.next_cursor
+
+    assert usernames == ["ann", "annb", "bob", "charlie", "frank"]
+
+
+def test_descending_sort_seeks_in_reverse(db_session, request_context, models):
+    create_users(db_session, models)
+
+    with request_context("/?sort=-first_name&page[size]=3"):
+        page = QueryBuilder(models.User).allowed_sorts(["first_name"]).paginate_cursor()
+        assert [user.username for user in page.items] == ["frank", "charlie", "bob"]
+
+    with request_context(f"/?sort=-first_name&page[size]=3&page[after]={page.next_cursor}"):
+        page = QueryBuilder(models.User).allowed_sorts(["first_name"]).paginate_cursor()
+        assert [user.username for user in page.items] == ["ann", "annb"]
+        assert page.next_cursor is None
+        assert page.prev_cursor is not None
+
+
+def test_previous_cursor_returns_previous_page(db_session, request_context, models):
+    create_users(db_session, models)
+
+    with request_context("/?sort=last_name,-first_name&page[size]=2"):
+        first_page = QueryBuilder(models.User).allowed_sorts(["last_name", "first_name"]).paginate_cursor()
+
+    with request_context(f"/?sort=last_name,-first_name&page[size]=2&page[after]={first_page.next_cursor}"):
+        second_page = QueryBuilder(models.User).allowed_sorts(["last_name", "first_name"]).paginate_cursor()
+        assert [user.username for user in second_page.items] == ["bob", "charlie"]
+
+    with request_context(f"/?sort=last_name,-first_name&page[size]=2&page[before]={second_page.prev_cursor}"):
+        page = QueryBuilder(models.User).allowed_sorts(["last_name", "first_name"]).paginate_cursor()
+        assert [user.username for user in page.items] == ["annb", "frank"]
+        assert page.prev_cursor is None
+        assert page.next_cursor is not None
+
+
+def test_cursor_of_datetime_sort_is_decoded(db_session, request_context, models):
+    users = create_users(db_session, models)
+    users[0].birth_date = datetime(1980, 5, 17, 10, 30)
+    db_session.commit()
+
+    with request_context("/?sort=birth_date&page[size]=4"):
+        page = QueryBuilder(models.User).allowed_sorts(["birth_date"]).paginate_cursor()
+
+    with request_context(f"/?sort=birth_date&page[size]=4&page[after]={page.next_cursor}"):
+        page = QueryBuilder(models.User).allowed_sorts(["birth_date"]).paginate_cursor()
+        assert [user.username for user in page.items] == ["frank"]
+
+
+def test_exception_raised_for_invalid_cursor(db_session, request_context, models):
+    create_users(db_session, models)
+
+    with pytest.raises(InvalidPageException):
+        with request_context("/?page[after]=not-a-cursor"):
+            QueryBuilder(models.User).paginate_cursor()
+
+
+@pytest.mark.parametrize("sort, values", [
+    ("id", [[1, 2]]),
+    ("id", [True]),
+    ("id", ["abc"]),
+    ("id", [1.5]),
+    ("first_name", [{"dt": "a", "d": "b"}, 1]),
+    ("first_name", [True, 1]),
+    ("birth_date", ["yesterday", 1]),
+    ("birth_date", [{"dt": 1}, 1]),
+])
+def test_exception_raised_for_forged_cursor_values(db_session, request_context, models, sort, values):
+    create_users(db_session, models)
+
+    with pytest.raises(InvalidPageException):
+        with request_context(f"/?sort={sort}&page[after]={encode_cursor(values)}"):
+            QueryBuilder(models.User).allowed_sorts([sort]).paginate_cursor()
+
+
+def test_exception_raised_for_page_size_above_maximum(db_session, request_context, models):
+    create_users(db_session, models)
+
+    with pytest.raises(InvalidPageException):
+        with request_context("/?page[size]=500"):
+            QueryBuilder(models.User).paginate_cursor(max_size=100)
+
+
+def test_exception_raised_for_custom_sort(db_session, request_context, models):
+    create_users(db_session, models)
+
+    class NameLengthSort(Sort):
+        def sort(self, query, model, sort_name, descending):
+            return query.order_by(model.first_name)
+
+    with pytest.raises(InvalidSortException):
+        with request_context("/?sort=length"):
+            QueryBuilder(models.User).allowed_sorts([
+                AllowedSort.custom("length", NameLengthSort()),
+            ]).paginate_cursor()
+
+
+def test_pages_follow_the_cursor_through_null_values(db_session, request_context, models):
+    users = create_users(db_session, models)
+    users[1].birth_date = None
+    users[3].birth_date = None
+    users[4].birth_date = datetime(1960, 1, 1)
+    db_session.commit()
+    sorts = [AllowedSort.field("birth_date", nulls="last")]
+
+    usernames = []
+    with request_context("/?sort=birth_date&page[size]=2"):
+        page = QueryBuilder(models.User).allowed_sorts(sorts).paginate_cursor()
+    usernames.extend(user.username for user in page.items)
+    while page.next_cursor:
+        with request_context(f"/?sort=birth_date&page[size]=2&page[after]={page.next_cursor}"):
+            page = QueryBuilder(models.User).allowed_sorts(sorts).paginate_cursor()
+        usernames.extend(user.username for user in page.items)
+
+    assert usernames == ["bob", "frank", "ann", "charlie", "annb"]
+
+    with request_context(f"/?sort=birth_date&page[size]=2&page[before]={page.prev_cursor}"):
+        page = QueryBuilder(models.User).allowed_sorts(sorts).paginate_cursor()
+
+    assert [user.username for user in page.items] == ["ann", "charlie"]
+
+
+@pytest.mark.parametrize("sort, expected", [
+    ("birth_date", ["charlie", "annb", "bob", "frank", "ann"]),
+    ("-birth_date", ["frank", "ann", "bob", "charlie", "annb"]),
+])
+def test_pages_follow_the_cursor_through_null_values_in_default_place(db_session, request_context, models, sort, expected):
+    users = create_users(db_session, models)
+    users[1].birth_date = None
+    users[3].birth_date = None
+    users[4].birth_date = datetime(1960, 1, 1)
+    db_session.commit()
+
+    usernames = []
+    cursor = ""
+    while True:
+        with request_context(f"/?sort={sort}&page[size]=2{cursor}"):
+            page = QueryBuilder(models.User).allowed_sorts(["birth_date"]).paginate_cursor()
+        usernames.extend(user.username for user in page.items)
+        if not page.next_cursor:
+            break
+        cursor = f"&page[after]={page.next_cursor}"
+
+    assert usernames == expected
+
+
+def test_default_place_of_null_values():
+    assert get_default_nulls("postgresql") == "last"
+    assert get_default_nulls("postgresql", descending=True) == "first"
+    assert get_default_nulls("sqlite") == "first"
+    assert get_default_nulls("mysql", descending=True) == "last"
@@ -0,0 +1,109 @@
+import pytest
+from werkzeug.datastructures import MultiDict
+
+from flask_query_builder.exceptions import InvalidRequestException
+from flask_query_builder.parsing import AppliedFilter, AppliedSort, FilterGroup, get_parsed_request, parse_args
+
+
+def test_all_parameters_parsed_in_one_pass():
+    parsed = parse_args(MultiDict([
+        ("filter[first_name]", "Ann,Charlie"),
+        ("filter[FirstName]", "Ann"),
+        ("sort", "-last_name,first_name"),
+        ("page[size]", "10"),
+        ("fields[users]", "id,first_name"),
+        ("include", "address"),
+        ("unrelated", "value"),
+    ]))
+
+    assert parsed.filters == (
+        AppliedFilter("first_name", ("Ann", "Charlie")),
+        AppliedFilter("FirstName", ("Ann",)),
+    )
+    assert parsed.sorts == (AppliedSort("last_name", True), AppliedSort("first_name"))
+    assert parsed.page == {"size": "10"}
+    assert parsed.fields == {"users": ("id", "first_name")}
+    assert parsed.include == ("address",)
+
+
+def test_parsed_request_is_immutable():
+    parsed = parse_args(MultiDict([("page[size]", "10")]))
+
+    with pytest.raises(AttributeError):
+        parsed.sorts = ()
+    with pytest.raises(TypeError):
+        parsed.page["size"] = "20"
+
+
+def test_empty_sorts_and_unnamed_filters_ignored():
+    parsed = parse_args(MultiDict([("sort", "first_name,,"), ("filter[]", "Ann")]))
+
+    assert parsed.sorts == (AppliedSort("first_name"),)
+    assert parsed.filters == ()
+
+
+def test_exception_raised_when_too_many_filters_applied():
+    args = MultiDict([(f"filter[field{index}]", "value") for index in range(3)])
+
+    with pytest.raises(InvalidRequestException):
+        parse_args(args, max_filters=2)
+
+
+def test_exception_raised_when_too_many_filter_values_applied():
+    with pytest.raises(InvalidRequestException):
+        parse_args(MultiDict([("filter[id]", ",".join(str(index) for index in range(11)))]), max_filter_values=10)
+
+
+def test_exception_raised_when_too_many_sorts_applied():
+    with pytest.raises(InvalidRequestException):
+        parse_args(MultiDict([("sort", "a,b,c")]), max_sorts=2)
+
+
+def test_parsed_request_shared_on_the_same_request(request_context):
+    with request_context("/?sort=first_name"):
+        assert get_parsed_request() is get_parsed_request()
+
+    with request_context("/?sort=last_name"):
+        assert get_parsed_request().sorts == (AppliedSort("last_name"),)
+
+
+def test_limits_read_from_app_config(app, request_context):
+    app.config["QUERY_BUILDER_MAX_SORTS"] = 1
+
+    with pytest.raises(InvalidRequestException):
+        with request_context("/?sort=first_name,last_name"):
+            get_parsed_request()
+
+
+def test_filter_operator_parsed():
+    parsed = parse_args(MultiDict([("filter[birth_date][gte]", "1970-01-01"), ("filter[birth_date][]", "x")]))
+
+    assert parsed.filters == (
+        AppliedFilter("birth_date", ("1970-01-01",), "gte"),
+        AppliedFilter("birth_date", ("x",)),
+    )
+
+
+def test_filter_groups_parsed():
+    parsed = parse_args(MultiDict([
+        ("filter[or][1][username]", "ann"),
+        ("filter[or][0][first_name]", "Frank"),
+        ("filter[or][0][and][0][last_name][ne]", "Joe"),
+        ("filter[first_name]", "Ann"),
+    ]))
+
+    assert parsed.filters == (AppliedFilter("first_name", ("Ann",)),)
+    assert parsed.groups == (
+        FilterGroup("or", (
+            (AppliedFilter("first_name", ("Frank",)), FilterGroup("and", ((AppliedFilter("last_name", ("Joe",), "ne"),),))),
+            (AppliedFilter("username", ("ann",)),),
+        )),
+    )
+
+
+def test_exception_raised_when_filter_groups_nested_too_deep():
+    with pytest.raises(InvalidRequestException):
+        parse_args(MultiDict([("filter[or][0][and][0][or][0][and][0][username]", "ann")]))
+
+    with pytest.raises(InvalidRequestException):
+        parse_args(MultiDict([("filter[or][first][username]", "ann")]))
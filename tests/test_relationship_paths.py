@@ -0,0 +1,152 @@
+from datetime import datetime
+
+import pytest
+
+from flask_query_builder.exceptions import InvalidFilterException, InvalidSortException
+from flask_query_builder.filters import Filter
+from flask_query_builder.joins import join_path, resolve_path
+from flask_query_builder.querying import QueryBuilder, AllowedFilter, AllowedSort
+from flask_query_builder.specs import QuerySpec
+
+
+def create_users(db_session, models):
+    birth_date = datetime.strptime("1970-01-01", "%Y-%m-%d")
+    x_road = models.Address(road="X road")
+    y_road = models.Address(road="Y road")
+    user1 = models.User(first_name='Frank', last_name='Elliot', username='frank', birth_date=birth_date, address=x_road)
+    user2 = models.User(first_name='Charlie', last_name='Joe', username='charlie', birth_date=birth_date, address=y_road)
+    user3 = models.User(first_name='Ann', last_name='Smith', username='ann', birth_date=birth_date, address=x_road)
+
+    db_session.add_all([user1, user2, user3])
+    db_session.commit()
+
+
+def test_filter_and_sort_share_the_join(db_session, request_context, models, statements):
+    create_users(db_session, models)
+    statements.clear()
+
+    with request_context("/?filter[road]=X road,Y road&sort=-road,first_name"):
+        users = QueryBuilder(models.User) \
+            .allowed_filters([AllowedFilter.exact("road", "address.road")]) \
+            .allowed_sorts([AllowedSort.field("road", "address.road"), "first_name"]) \
+            .all()
+
+    assert [user.username for user in users] == ["charlie", "ann", "frank"]
+    assert statements[0].count("JOIN") == 1
+    assert "DISTINCT" not in statements[0]
+
+
+def test_partial_filter_on_relationship_field(db_session, request_context, models):
+    create_users(db_session, models)
+
+    with request_context("/?filter[road]=y&sort=id"):
+        users = QueryBuilder(models.User).allowed_filters([AllowedFilter.partial("road", "address.road")]).all()
+
+    assert [user.username for user in users] == ["charlie"]
+
+
+def test_to_many_filter_uses_exists(db_session, request_context, models, statements):
+    create_users(db_session, models)
+    statements.clear()
+
+    with request_context("/?filter[resident]=frank,ann"):
+        builder = QueryBuilder(models.Address).allowed_filters([AllowedFilter.exact("resident", "user.username")])
+        addresses = builder.all()
+        count = builder.count()
+
+    assert [address.road for address in addresses] == ["X road"]
+    assert count == 1
+    assert "EXISTS" in statements[0]
+    assert "JOIN" not in statements[0]
+
+
+def test_nested_path_through_to_many(db_session, request_context, models):
+    create_users(db_session, models)
+
+    with request_context("/?filter[neighbour]=ann"):
+        users = QueryBuilder(models.User) \
+            .allowed_filters([AllowedFilter.exact("neighbour", "address.user.username")]) \
+            .allowed_sorts(["id"]) \
+            .all()
+
+    assert sorted(user.username for user in users) == ["ann", "frank"]
+
+
+def test_count_joins_for_filters_only(db_session, request_context, models, statements):
+    create_users(db_session, models)
+    statements.clear()
+
+    with request_context("/?filter[first_name]=Ann,Frank&sort=address.road"):
+        count = QueryBuilder(models.User) \
+            .allowed_filters(["first_name"]) \
+            .allowed_sorts(["address.road"]) \
+            .count()
+
+    assert count == 2
+    assert "JOIN" not in statements[0]
+
+
+def test_relationship_filter_values_are_coerced(db_session, request_context, models):
+    with pytest.raises(InvalidFilterException):
+        with request_context("/?filter[address]=one"):
+            QueryBuilder(models.User).allowed_filters([AllowedFilter.exact("address", "address.id")])
+
+
+def test_invalid_relationship_path(request_context, models):
+    with pytest.raises(InvalidFilterException):
+        with request_context("/?filter[road]=x"):
+            QueryBuilder(models.User).allowed_filters([AllowedFilter.exact("road", "home.road")])
+
+    with pytest.raises(InvalidSortException):
+        with request_context("/?sort=road"):
+            QueryBuilder(models.User).allowed_sorts([AllowedSort.field("road", "address.street")])
+
+
+def test_sort_through_to_many_relationship_raises(request_context, models):
+    with pytest.raises(InvalidSortException):
+        with request_context("/?sort=resident"):
+            QueryBuilder(models.Address).allowed_sorts([AllowedSort.field("resident", "user.username")])
+
+
+def test_spec_validates_relationship_paths(models):
+    QuerySpec(models.User, filters=[AllowedFilter.exact("road", "address.road")], sorts=["address.road"])
+
+    with pytest.raises(InvalidFilterException):
+        QuerySpec(models.User, filters=[AllowedFilter.exact("road", "address.street")])
+
+    with pytest.raises(InvalidSortException):
+        QuerySpec(models.User, sorts=["home.road"])
+
+
+def test_cursor_pagination_on_relationship_sort(db_session, request_context, models):
+    create_users(db_session, models)
+
+    with request_context("/?sort=-address.road&page[size]=2"):
+        page = QueryBuilder(models.User).allowed_sorts(["address.road"]).paginate_cursor()
+
+    assert [user.username for user in page.items] == ["charlie", "frank"]
+
+    with request_context(f"/?sort=-address.road&page[size]=2&page[after]={page.next_cursor}"):
+        page = QueryBuilder(models.User).allowed_sorts(["address.road"]).paginate_cursor()
+
+    assert [user.username for user in page.items] == ["ann"]
+
+
+def test_custom_filter_reuses_the_join(db_session, request_context, models, statements):
+    create_users(db_session, models)
+    statements.clear()
+
+    class RoadFilter(Filter):
+        def filter(self, query, model, filter_name, values):
+            relationships, _ = resolve_path(model, "address.road")
+            query, address = join_path(query, model, relationships)
+            return query.where(address.road.in_(values))
+
+    with request_context("/?sort=address.road&filter[road]=X road"):
+        users = QueryBuilder(models.User) \
+            .allowed_sorts(["address.road", "id"]) \
+            .allowed_filters([AllowedFilter.custom("road", RoadFilter())]) \
+            .all()
+
+    assert sorted(user.username for user in users) == ["ann", "frank"]
+    assert statements[0].count("JOIN") == 1
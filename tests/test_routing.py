@@ -0,0 +1,134 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, exc, event
+from sqlalchemy.orm import Session
+
+from flask_query_builder.querying import QueryBuilder
+from flask_query_builder.routing import ReplicaRouter
+from flask_query_builder.specs import QuerySpec
+
+
+@pytest.fixture
+def replica(models):
+    """A second SQLite database standing in for a replica, holding only Ann"""
+    engine = create_engine("sqlite:////tmp/test_replica.db")
+    models.User.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        session.add(models.User(first_name="Ann", last_name="Smith", username="ann", birth_date=datetime(1970, 1, 1)))
+        session.commit()
+    yield engine
+    models.User.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+def create_users(db_session, models):
+    birth_date = datetime.strptime("1970-01-01", "%Y-%m-%d")
+    user1 = models.User(first_name='Frank', last_name='Elliot', username='frank', birth_date=birth_date)
+    user2 = models.User(first_name='Charlie', last_name='Joe', username='charlie', birth_date=birth_date)
+
+    db_session.add_all([user1, user2])
+    db_session.commit()
+
+
+def test_statements_routed_to_replica(db_session, request_context, models, replica):
+    create_users(db_session, models)
+    router = ReplicaRouter([replica])
+
+    with request_context("/?sort=first_name"):
+        builder = QueryBuilder(models.User, router=router).allowed_sorts(["first_name"])
+        users = builder.all()
+        count = builder.count()
+
+    assert [user.username for user in users] == ["ann"]
+    assert count == 1
+
+
+def test_primary_used_when_replica_lags(db_session, request_context, models, replica):
+    create_users(db_session, models)
+    router = ReplicaRouter([replica], max_lag=5, lag_check=lambda engine: 30.0)
+
+    with request_context("/"):
+        users = QueryBuilder(models.User, router=router).all()
+
+    assert sorted(user.username for user in users) == ["charlie", "frank"]
+
+
+def test_primary_used_when_replica_unreachable(db_session, request_context, models):
+    create_users(db_session, models)
+    checks = []
+
+    def lag_check(engine):
+        checks.append(engine)
+        raise exc.OperationalError("SELECT 1", {}, Exception("unreachable"))
+
+    router = ReplicaRouter([create_engine("sqlite:////nonexistent/replica.db")], lag_check=lag_check)
+
+    with request_context("/"):
+        assert len(QueryBuilder(models.User, router=router).all()) == 2
+        assert len(QueryBuilder(models.User, router=router).all()) == 2
+
+    assert len(checks) == 1
+
+
+def test_primary_used_with_pending_changes(db_session, request_context, models, replica):
+    create_users(db_session, models)
+    router = ReplicaRouter([replica])
+    db_session.add(models.User(first_name="Bob", last_name="Stone", username="bob"))
+
+    with request_context("/"):
+        users = QueryBuilder(models.User, router=router).all()
+
+    assert sorted(user.username for user in users) == ["charlie", "frank"]
+    db_session.rollback()
+
+
+def test_primary_used_with_flushed_changes(db_session, request_context, models, replica):
+    create_users(db_session, models)
+    router = ReplicaRouter([replica])
+    db_session.add(models.User(first_name="Bob", last_name="Stone", username="bob"))
+    db_session.flush()
+
+    with request_context("/"):
+        users = QueryBuilder(models.User, router=router).all()
+
+    assert sorted(user.username for user in users) == ["bob", "charlie", "frank"]
+    db_session.rollback()
+
+    with request_context("/"):
+        users = QueryBuilder(models.User, router=router).all()
+
+    assert [user.username for user in users] == ["ann"]
+
+
+def test_execution_options_on_legacy_query(request_context, models):
+    with request_context("/"):
+        query = QueryBuilder(models.User, execution_options={"marker": "users"}).query
+
+        assert query.get_execution_options()["marker"] == "users"
+
+        with pytest.raises(TypeError):
+            QueryBuilder(models.User, execution_options={"isolation_level": "SERIALIZABLE"}).query
+
+
+def test_execution_options_from_spec(db_session, request_context, models, engine):
+    create_users(db_session, models)
+    options = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        options.append((context.execution_options.get("marker"), conn.get_isolation_level()))
+
+    spec = QuerySpec(
+        models.User,
+        sorts=["first_name"],
+        execution_options={"marker": "users", "isolation_level": "SERIALIZABLE"},
+    )
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        with request_context("/?sort=first_name"):
+            users = spec.builder().all()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    assert [user.username for user in users] == ["charlie", "frank"]
+    assert options == [("users", "SERIALIZABLE")]
@@ -0,0 +1,98 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Query
+from sqlalchemy.sql import Select
+
+from flask_query_builder.filters import Filter
+from flask_query_builder.querying import QueryBuilder, AllowedFilter, AllowedSort
+from flask_query_builder.sorts import Sort
+
+
+def test_builder_constructs_select_statement(db_session, sample_users, request_context, models):
+    with request_context("/?filter[first_name]=Ann,Frank&sort=-first_name"):
+        builder = QueryBuilder(models.User).allowed_filters(["first_name"]).allowed_sorts(["first_name"])
+
+        assert isinstance(builder.statement, Select)
+        assert [user.username for user in db_session.scalars(builder.statement)] == ["frank", "ann"]
+        assert [user.username for user in builder.all()] == ["frank", "ann"]
+
+
+def test_legacy_query_has_everything_applied(sample_users, request_context, models):
+    with request_context("/?filter[last_name]=i&sort=first_name"):
+        query = QueryBuilder(models.User) \
+            .allowed_filters([AllowedFilter.partial("last_name")]) \
+            .allowed_sorts(["first_name"]) \
+            .query
+
+        assert isinstance(query, Query)
+        assert [user.username for user in query.all()] == ["ann", "frank"]
+        assert [user.username for user in query.filter(models.User.username == "ann")] == ["ann"]
+
+
+def test_builder_starts_from_existing_query(sample_users, request_context, models):
+    existing = models.User.query.filter(models.User.username != "frank")
+
+    with request_context("/?sort=-first_name"):
+        builder = QueryBuilder(models.User, existing).allowed_sorts(["first_name"])
+
+        assert [user.username for user in builder.all()] == ["charlie", "ann"]
+        assert [user.username for user in builder.query.all()] == ["charlie", "ann"]
+
+
+def test_builder_starts_from_existing_select_on_session(db_session, sample_users, request_context, models):
+    existing = select(models.User).where(models.User.username != "ann")
+
+    with request_context("/?sort=first_name"):
+        builder = QueryBuilder(models.User, existing, session=db_session()).allowed_sorts(["first_name"])
+
+        assert [user.username for user in builder.scalars()] == ["charlie", "frank"]
+        assert [row[0].username for row in builder.execute()] == ["charlie", "frank"]
+        with pytest.raises(TypeError):
+            builder.query
+
+
+def test_legacy_query_does_not_build_the_statement(sample_users, request_context, models):
+    filtered = []
+
+    class RecordingFilter(Filter):
+        def filter(self, query, model, filter_name, values):
+            filtered.append(values)
+            return query.filter(model.first_name.in_(values))
+
+    with request_context("/?filter[name]=Ann,Frank"):
+        query = QueryBuilder(models.User).allowed_filters([AllowedFilter.custom("name", RecordingFilter())]).query
+
+        assert sorted(user.username for user in query.all()) == ["ann", "frank"]
+        assert len(filtered) == 1
+
+
+def test_yield_per_fetches_all_results(sample_users, request_context, models):
+    with request_context("/?sort=first_name"):
+        users = QueryBuilder(models.User).allowed_sorts(["first_name"]).yield_per(2)
+
+        assert [user.username for user in users] == ["ann", "charlie", "frank"]
+
+
+def test_count_replays_filters_only(sample_users, request_context, models, statements):
+    statements.clear()
+    filtered = []
+
+    class RecordingFilter(Filter):
+        def filter(self, query, model, filter_name, values):
+            filtered.append(values)
+            return query.where(model.first_name.in_(values))
+
+    class AddressSort(Sort):
+        def sort(self, query, model, sort_name, descending):
+            return query.outerjoin(model.address).order_by(models.Address.road)
+
+    with request_context("/?filter[name]=Ann,Frank&sort=road"):
+        builder = QueryBuilder(models.User) \
+            .allowed_filters([AllowedFilter.custom("name", RecordingFilter())]) \
+            .allowed_sorts([AllowedSort.custom("road", AddressSort())])
+
+        assert len(filtered) == 0
+        assert builder.count() == 2
+
+    assert len(filtered) == 1
+    assert "JOIN" not in statements[0]
@@ -1,6 +1,7 @@
 from datetime import datetime
 
 import pytest
+from sqlalchemy import func
 
 from flask_query_builder.exceptions import InvalidSortException
 from flask_query_builder.querying import QueryBuilder, AllowedSort
@@ -217,3 +218,94 @@ def test_custom_sort(db_session, request_context, models):
         assert users[1].address.road == "D road"
         assert users[2].first_name == "Frank"
         assert users[2].address.road == "X road"
+
+
+def create_users(db_session, models):
+    birth_date = datetime.strptime("1970-01-01", "%Y-%m-%d")
+    user1 = models.User(first_name='Frank', last_name='elliot', username='frank', birth_date=birth_date)
+    user2 = models.User(first_name='Charlie', last_name='Joe', username='charlie')
+    user3 = models.User(first_name='Ann', last_name='Joe', username='ann', birth_date=birth_date)
+
+    db_session.add_all([user1, user2, user3])
+    db_session.commit()
+
+
+def test_default_sorts_applied_without_sort_on_request(db_session, request_context, models):
+    create_users(db_session, models)
+
+    with request_context("/"):
+        users = QueryBuilder(models.User).allowed_sorts(["first_name", "last_name"], default="-last_name,first_name").all()
+
+    assert [user.username for user in users] == ["frank", "ann", "charlie"]
+
+    with request_context("/?sort=first_name"):
+        users = QueryBuilder(models.User).allowed_sorts(["first_name", "last_name"], default="-last_name").all()
+
+    assert [user.username for user in users] == ["ann", "charlie", "frank"]
+
+
+def test_exception_raised_when_default_sort_not_allowed(request_context, models):
+    with pytest.raises(InvalidSortException):
+        with request_context("/"):
+            QueryBuilder(models.User).allowed_sorts(["first_name"], default=["-birth_date"])
+
+
+def test_primary_key_tiebreaker(request_context, models, statements):
+    with request_context("/?sort=last_name"):
+        QueryBuilder(models.User).allowed_sorts(["last_name"]).all()
+        QueryBuilder(models.User).allowed_sorts(["last_name"], tiebreaker=False).all()
+
+    with request_context("/?sort=-id"):
+        QueryBuilder(models.User).allowed_sorts(["id"]).all()
+
+    assert statements[0].endswith("ORDER BY users.last_name ASC, users.id")
+    assert statements[1].endswith("ORDER BY users.last_name ASC")
+    assert statements[2].endswith("ORDER BY users.id DESC")
+
+
+def test_primary_key_tiebreaker_placed_after_added_ordering(request_context, models):
+    with request_context("/?sort=last_name"):
+        builder = QueryBuilder(models.User).allowed_sorts(["last_name"])
+        sql = str(builder.query.order_by(models.User.first_name.desc()))
+        assert sql.endswith("ORDER BY users.last_name ASC, users.first_name DESC")
+
+        sql = str(builder.statement.order_by(models.User.first_name.desc()))
+        assert sql.endswith("ORDER BY users.last_name ASC, users.first_name DESC")
+
+
+def test_nulls_placed_first_or_last(db_session, request_context, models):
+    create_users(db_session, models)
+    sorts = [
+        AllowedSort.field("birth_date", nulls="last"),
+        AllowedSort.field("born", "birth_date", nulls="first"),
+    ]
+
+    with request_context("/?sort=birth_date"):
+        users = QueryBuilder(models.User).allowed_sorts(sorts).all()
+    assert [user.username for user in users] == ["frank", "ann", "charlie"]
+
+    with request_context("/?sort=-born"):
+        users = QueryBuilder(models.User).allowed_sorts(sorts).all()
+    assert [user.username for user in users] == ["charlie", "frank", "ann"]
+
+    with pytest.raises(ValueError):
+        AllowedSort.field("birth_date", nulls="middle")
+
+
+def test_expression_sort(db_session, request_context, models, statements):
+    create_users(db_session, models)
+    sorts = [
+        AllowedSort.expression("last_name", lambda model: func.lower(model.last_name)),
+        AllowedSort.expression("name_length", func.length(models.User.first_name)),
+    ]
+
+    with request_context("/?sort=last_name"):
+        users = QueryBuilder(models.User).allowed_sorts(sorts).all()
+
+    assert "ORDER BY lower(users.last_name) ASC, users.id" in statements[-1]
+    assert [user.username for user in users] == ["frank", "charlie", "ann"]
+
+    with request_context("/?sort=-name_length,last_name"):
+        users = QueryBuilder(models.User).allowed_sorts(sorts).all()
+
+    assert [user.username for user in users] == ["charlie", "frank", "ann"]
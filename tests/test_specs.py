@@ -0,0 +1,82 @@
+import pytest
+
+from flask_query_builder.exceptions import InvalidFilterException, InvalidSortException
+from flask_query_builder.querying import AllowedFilter, AllowedSort
+from flask_query_builder.specs import QuerySpec
+
+
+def test_spec_applies_filters_and_sorts(sample_users, request_context, models):
+    spec = QuerySpec(
+        models.User,
+        filters=["last_name", AllowedFilter.partial("name", "first_name")],
+        sorts=[AllowedSort.field("name", "first_name")],
+    )
+
+    with request_context("/?filter[name]=a&sort=-name"):
+        users = spec.builder().query.all()
+
+        assert [user.first_name for user in users] == ["Frank", "Charlie", "Ann"]
+
+    with request_context("/?filter[last_name]=Joe"):
+        users = spec.builder().query.all()
+
+        assert len(users) == 1
+        assert users[0].first_name == "Charlie"
+
+
+def test_spec_lookup_tables_are_frozen(models):
+    spec = QuerySpec(models.User, filters=["first_name"], sorts=["first_name"])
+
+    with pytest.raises(TypeError):
+        spec.filters["last_name"] = AllowedFilter.exact("last_name")
+    with pytest.raises(TypeError):
+        spec.sorts["last_name"] = AllowedSort.field("last_name")
+
+
+def test_spec_starts_from_existing_query(sample_users, request_context, models):
+    spec = QuerySpec(models.User, sorts=["first_name"])
+
+    with request_context("/?sort=first_name"):
+        users = spec.builder(models.User.query.filter(models.User.last_name != "Joe")).query.all()
+
+        assert [user.first_name for user in users] == ["Ann", "Frank"]
+
+
+def test_spec_page_size_used_for_pagination(sample_users, request_context, models):
+    spec = QuerySpec(models.User, sorts=["first_name"], page_size=2)
+
+    with request_context("/?sort=first_name"):
+        page = spec.builder().paginate_cursor()
+
+        assert [user.first_name for user in page.items] == ["Ann", "Charlie"]
+
+
+def test_exception_raised_when_spec_filter_does_not_match_field(models):
+    with pytest.raises(InvalidFilterException):
+        QuerySpec(models.User, filters=[AllowedFilter.exact("name", "full_name")])
+
+
+def test_exception_raised_when_spec_sort_does_not_match_field(models):
+    with pytest.raises(InvalidSortException):
+        QuerySpec(models.User, sorts=["full_name"])
+
+
+def test_spec_respects_raise_exceptions(sample_users, request_context, models):
+    spec = QuerySpec(models.User, filters=["first_name"], raise_exceptions=False)
+
+    with request_context("/?filter[last_name]=Joe"):
+        users = spec.builder().query.all()
+
+        assert len(users) == 3
+
+
+def test_spec_default_sorts(sample_users, request_context, models):
+    spec = QuerySpec(models.User, sorts=[AllowedSort.field("name", "first_name")], default_sorts="-name")
+
+    with request_context("/"):
+        users = spec.builder().all()
+
+    assert [user.first_name for user in users] == ["Frank", "Charlie", "Ann"]
+
+    with pytest.raises(InvalidSortException):
+        QuerySpec(models.User, sorts=["first_name"], default_sorts=["last_name"])
@@ -0,0 +1,42 @@
+from flask_query_builder.querying import QueryBuilder, AllowedFilter
+from flask_query_builder.specs import QuerySpec
+from flask_query_builder.statements import StatementCacheStats
+
+
+def test_exact_filter_with_any_number_of_values_compiled_once(sample_users, request_context, models):
+    spec = QuerySpec(models.User, filters=["first_name"], sorts=["last_name"], track_statement_cache=True)
+
+    for query_string in ("Ann", "Ann,Charlie", "Ann,Charlie,Frank"):
+        with request_context(f"/?filter[first_name]={query_string}&sort=-last_name"):
+            users = spec.builder().query.all()
+
+            assert len(users) == len(query_string.split(","))
+
+    assert spec.statement_cache_stats.misses == 1
+    assert spec.statement_cache_stats.hits == 2
+
+
+def test_partial_filter_with_different_values_compiled_once(sample_users, request_context, models):
+    spec = QuerySpec(models.User, filters=[AllowedFilter.partial("first_name")], track_statement_cache=True)
+
+    for value in ("fr", "nn", "ch"):
+        with request_context(f"/?filter[first_name]={value}"):
+            users = spec.builder().query.all()
+
+            assert len(users) == 1
+
+    assert spec.statement_cache_stats.misses == 1
+    assert spec.statement_cache_stats.hits == 2
+    assert spec.statement_cache_stats.hit_ratio == 2 / 3
+
+
+def test_stats_only_count_queries_of_their_builder(sample_users, request_context, models):
+    stats = StatementCacheStats()
+
+    with request_context("/?filter[first_name]=Ann"):
+        QueryBuilder(models.User, statement_cache_stats=stats).allowed_filters(["first_name"]).query.all()
+        QueryBuilder(models.User).allowed_filters(["first_name"]).query.all()
+
+    assert stats.total == 1
+    stats.reset()
+    assert stats.total == 0
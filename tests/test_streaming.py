@@ -0,0 +1,79 @@
+import csv
+import io
+import json
+
+import pytest
+
+from flask_query_builder.querying import QueryBuilder, AllowedFilter
+
+
+def test_stream_ndjson_applies_filters_and_sorts(sample_users, request_context, models):
+    with request_context("/?filter[last_name]=i&sort=-first_name"):
+        response = QueryBuilder(models.User) \
+            .allowed_filters([AllowedFilter.partial("last_name")]) \
+            .allowed_sorts(["first_name"]) \
+            .stream()
+
+        assert response.mimetype == "application/x-ndjson"
+        rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    assert [row["username"] for row in rows] == ["frank", "ann"]
+    assert rows[0]["birth_date"] == "1970-01-01T00:00:00"
+
+
+def test_stream_is_written_in_chunks(sample_users, request_context, models):
+    with request_context("/?sort=first_name"):
+        response = QueryBuilder(models.User).allowed_sorts(["first_name"]).stream(chunk_size=2)
+        chunks = list(response.response)
+
+    assert len(chunks) == 2
+    assert [json.loads(line)["username"] for line in chunks[0].splitlines()] == ["ann", "charlie"]
+
+
+def test_stream_json_array(sample_users, request_context, models):
+    with request_context("/?sort=first_name"):
+        response = QueryBuilder(models.User).allowed_sorts(["first_name"]).stream("json", chunk_size=2)
+
+        assert response.mimetype == "application/json"
+        rows = json.loads(response.get_data(as_text=True))
+
+    assert [row["username"] for row in rows] == ["ann", "charlie", "frank"]
+
+
+def test_stream_json_array_without_results(db_session, request_context, models):
+    with request_context("/?filter[username]=nobody"):
+        response = QueryBuilder(models.User).allowed_filters(["username"]).stream("json")
+
+        assert json.loads(response.get_data(as_text=True)) == []
+
+
+def test_stream_csv_of_requested_fields(sample_users, request_context, models):
+    with request_context("/?fields[users]=first_name,last_name&sort=first_name"):
+        response = QueryBuilder(models.User) \
+            .allowed_fields(["first_name", "last_name"]) \
+            .allowed_sorts(["first_name"]) \
+            .stream("csv", filename="users.csv")
+
+        assert response.mimetype == "text/csv"
+        assert response.headers["Content-Disposition"] == 'attachment; filename="users.csv"'
+        rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+
+    assert rows[0] == ["id", "first_name", "last_name"]
+    assert [row[1:] for row in rows[1:]] == [["Ann", "Smith"], ["Charlie", "Joe"], ["Frank", "Elliot"]]
+
+
+def test_stream_columns_only_skips_the_identity_map(db_session, sample_users, request_context, models):
+    db_session.expunge_all()
+
+    with request_context("/?sort=first_name"):
+        response = QueryBuilder(models.User).allowed_sorts(["first_name"]).stream(columns_only=True)
+        rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    assert [row["username"] for row in rows] == ["ann", "charlie", "frank"]
+    assert len(db_session().identity_map) == 0
+
+
+def test_stream_unknown_format(request_context, models):
+    with request_context("/"):
+        with pytest.raises(ValueError):
+            QueryBuilder(models.User).stream("xml")